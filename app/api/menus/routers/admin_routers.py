@@ -0,0 +1,52 @@
+"""
+Модуль для служебных операций API.
+
+Атрибуты:
+    admin_router (APIRouter): Экземпляр APIRouter FastAPI для служебных маршрутов.
+"""
+
+from fastapi import APIRouter, Depends, Query
+
+from app.api.menus.services.cache_warmup_service import warm_up_cache
+from app.api.menus.services.menu_service import AsyncMenuService
+from app.config import CACHE_WARMUP_CONCURRENCY
+from app.db.database_connect import get_pool_stats
+
+admin_router = APIRouter(
+    prefix='/api/v1/admin',
+    tags=['Администрирование']
+)
+
+
+@admin_router.post('/cache/warmup',
+                   summary='Прогреть кеш')
+async def warm_up(concurrency: int = Query(CACHE_WARMUP_CONCURRENCY, ge=1)) -> dict[str, int]:
+    """
+    Загружает в кеш список меню, каждое меню, списки подменю и блюд и полное меню ресторана.
+
+    Если прогрев уже выполняется другим воркером, возвращает 0 прогретых представлений.
+    """
+    return {'warmed': await warm_up_cache(concurrency)}
+
+
+@admin_router.get('/pools',
+                  summary='Состояние пулов соединений')
+async def read_pool_stats() -> dict[str, dict[str, int]]:
+    """
+    Возвращает выданные, свободные и ожидающие соединения пулов БД и Redis.
+
+    Пулы свои у каждого воркера, ответ относится к воркеру, обработавшему запрос.
+    """
+    return get_pool_stats()
+
+
+@admin_router.post('/menu_snapshots/rebuild',
+                   summary='Пересобрать снимки меню')
+async def rebuild_menu_snapshots(menu_service: AsyncMenuService = Depends()) -> dict[str, int]:
+    """
+    Пересобирает снимки всех меню, из которых читается полное меню ресторана.
+
+    Снимки обновляются при каждом изменении меню, подменю и блюд, пересборка нужна
+    после изменений в обход API (например, массовой загрузки данных).
+    """
+    return {'rebuilt': await menu_service.rebuild_menu_snapshots()}
@@ -1,8 +1,20 @@
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from typing import Sequence
+
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Body,
+    Depends,
+    HTTPException,
+    Query,
+    Response,
+)
 from sqlalchemy.orm.exc import FlushError, NoResultFound
 from starlette import status
 
 from app.api.menus.services.dish_service import AsyncDishService
+from app.config import BATCH_MAX_SIZE, PAGE_MAX_LIMIT
+from app.db.repositories.dish_repository import DishRow
 from app.models.schemas.menus.dish_schemas import DishResponse, DishSchema
 
 dish_router = APIRouter(
@@ -19,7 +31,7 @@ async def create_dish(background_tasks: BackgroundTasks,
                       dish: DishSchema,
                       menu_id: str,
                       submenu_id: str,
-                      dish_service: AsyncDishService = Depends()) -> DishResponse:
+                      dish_service: AsyncDishService = Depends()) -> DishRow:
     try:
         return await dish_service.create_dish(
             menu_id=menu_id,
@@ -36,18 +48,51 @@ async def create_dish(background_tasks: BackgroundTasks,
         )
 
 
+@dish_router.post('/batch',
+                  response_model=list[DishResponse],
+                  summary='Создать или изменить несколько блюд в подменю')
+async def upsert_dishes(background_tasks: BackgroundTasks,
+                        menu_id: str,
+                        submenu_id: str,
+                        dishes: list[DishSchema] = Body(..., min_length=1, max_length=BATCH_MAX_SIZE),
+                        dish_service: AsyncDishService = Depends()) -> Sequence[DishRow]:
+    """
+    Создает блюда без ID и изменяет блюда этого подменю с переданными ID одним запросом в БД.
+
+    Блюда другого подменю с тем же ID не изменяются и не попадают в ответ.
+    Кеш инвалидируется один раз на весь пакет.
+    """
+    return await dish_service.upsert_dishes(
+        menu_id=menu_id,
+        submenu_id=submenu_id,
+        dishes=dishes,
+        background_tasks=background_tasks
+    )
+
+
 @dish_router.get('/',
                  response_model=list[DishResponse],
                  summary='Получить список блюд из подменю')
 async def read_all_dishes(background_tasks: BackgroundTasks,
                           menu_id: str,
                           submenu_id: str,
+                          response: Response,
+                          limit: int | None = Query(None, ge=1, le=PAGE_MAX_LIMIT),
+                          cursor: str | None = None,
                           dish_service: AsyncDishService = Depends()) -> list[DishResponse]:
-    """Получение всех блюд конкретного подменю в конкретном меню."""
+    """
+    Получение всех блюд конкретного подменю в конкретном меню.
+
+    С параметрами limit и cursor возвращает страницу блюд в порядке ID, курсор следующей
+    страницы передается в заголовке X-Next-Cursor (нет заголовка - страница последняя).
+    """
     return await dish_service.read_all_dishes(
         menu_id=menu_id,
         submenu_id=submenu_id,
-        background_tasks=background_tasks
+        background_tasks=background_tasks,
+        response=response,
+        limit=limit,
+        cursor=cursor
     )
 
 
@@ -75,7 +120,7 @@ async def update_dish(background_tasks: BackgroundTasks,
                       submenu_id: str,
                       dish_id: str,
                       updated_dish: DishSchema,
-                      dish_service: AsyncDishService = Depends()) -> DishResponse:
+                      dish_service: AsyncDishService = Depends()) -> DishRow:
     return await dish_service.update_dish(
         menu_id=menu_id,
         submenu_id=submenu_id,
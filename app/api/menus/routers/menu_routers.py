@@ -7,10 +7,16 @@
     menu_router (APIRouter): Экземпляр APIRouter FastAPI для маршрутов, связанных с меню.
 """
 
-from fastapi import APIRouter, BackgroundTasks, Depends
+from typing import Sequence
+
+from fastapi import APIRouter, BackgroundTasks, Body, Depends, Query, Response
+from fastapi.responses import StreamingResponse
 from starlette import status
 
 from app.api.menus.services.menu_service import AsyncMenuService
+from app.config import BATCH_MAX_SIZE, PAGE_MAX_LIMIT
+from app.db.repositories.menu_repository import MenuRow
+from app.models.domain.menus_models import Menu
 from app.models.schemas.menus.menu_schemas import (
     MenuCountResponse,
     MenuFullResponse,
@@ -30,18 +36,40 @@ menu_router = APIRouter(
                   summary='Создать меню')
 async def create_menus(menu: MenuSchema,
                        background_tasks: BackgroundTasks,
-                       menu_service: AsyncMenuService = Depends()) -> MenuResponse:
+                       menu_service: AsyncMenuService = Depends()) -> MenuRow:
     """Создает новое меню."""
     return await menu_service.create_menu(menu, background_tasks)
 
 
+@menu_router.post('/batch',
+                  response_model=list[MenuResponse],
+                  summary='Создать или изменить несколько меню')
+async def upsert_menus(background_tasks: BackgroundTasks,
+                       menus: list[MenuSchema] = Body(..., min_length=1, max_length=BATCH_MAX_SIZE),
+                       menu_service: AsyncMenuService = Depends()) -> Sequence[MenuRow]:
+    """
+    Создает меню без ID и изменяет существующие меню с переданными ID одним запросом в БД.
+
+    Кеш инвалидируется один раз на весь пакет.
+    """
+    return await menu_service.upsert_menus(menus, background_tasks)
+
+
 @menu_router.get('/',
                  response_model=list[MenuResponse],
                  summary='Получить список всех меню')
 async def read_all_menus(background_tasks: BackgroundTasks,
+                         response: Response,
+                         limit: int | None = Query(None, ge=1, le=PAGE_MAX_LIMIT),
+                         cursor: str | None = None,
                          menu_service: AsyncMenuService = Depends()) -> list[MenuResponse]:
-    """Получает список всех меню."""
-    return await menu_service.read_all_menus(background_tasks)
+    """
+    Получает список всех меню.
+
+    С параметрами limit и cursor возвращает страницу меню в порядке ID, курсор следующей
+    страницы передается в заголовке X-Next-Cursor (нет заголовка - страница последняя).
+    """
+    return await menu_service.read_all_menus(background_tasks, response, limit, cursor)
 
 
 @menu_router.get('/{menu_id}/',
@@ -60,7 +88,7 @@ async def read_menu(menu_id: str,
 async def update_menu(menu_id: str,
                       updated_menu: MenuSchema,
                       background_tasks: BackgroundTasks,
-                      menu_service: AsyncMenuService = Depends()) -> MenuResponse:
+                      menu_service: AsyncMenuService = Depends()) -> MenuRow:
     """Изменяет определенное меню по ID"""
     return await menu_service.update_menu(menu_id, updated_menu, background_tasks)
 
@@ -79,6 +107,15 @@ async def delete_menu(menu_id: str,
                  response_model=list[MenuFullResponse],
                  summary='Полная структура всего меню ресторана')
 async def get_full_restaurant_menu(background_tasks: BackgroundTasks,
-                                   menu_service: AsyncMenuService = Depends()) -> list[MenuFullResponse]:
-    """Получение полного списка всех меню, соответствующих подменю и соответствующих блюд"""
+                                   stream: bool = False,
+                                   menu_service: AsyncMenuService = Depends()) -> list[Menu] | Response:
+    """
+    Получение полного списка всех меню, соответствующих подменю и соответствующих блюд
+
+    С параметром stream=true меню отдаются потоком в формате NDJSON (одно меню на строку)
+    по мере чтения из БД, что ограничивает память на запрос при большом меню.
+    """
+    if stream:
+        return StreamingResponse(menu_service.stream_full_restaurant_menu(),
+                                 media_type='application/x-ndjson')
     return await menu_service.get_full_restaurant_menu(background_tasks)
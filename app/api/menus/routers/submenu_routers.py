@@ -7,10 +7,14 @@
     submenu_router (APIRouter): Экземпляр APIRouter FastAPI для маршрутов, связанных с меню.
 """
 
-from fastapi import APIRouter, BackgroundTasks, Depends
+from typing import Sequence
+
+from fastapi import APIRouter, BackgroundTasks, Body, Depends, Query, Response
 from starlette import status
 
 from app.api.menus.services.submenu_service import AsyncSubmenuService
+from app.config import BATCH_MAX_SIZE, PAGE_MAX_LIMIT
+from app.db.repositories.submenu_repository import SubmenuRow
 from app.models.schemas.menus.submenu_schemas import (
     SubmenuCountResponse,
     SubmenuResponse,
@@ -30,7 +34,7 @@ submenu_router = APIRouter(
 async def create_submenus(submenu: SubmenuSchema,
                           menu_id: str,
                           background_tasks: BackgroundTasks,
-                          submenu_service: AsyncSubmenuService = Depends()) -> SubmenuResponse:
+                          submenu_service: AsyncSubmenuService = Depends()) -> SubmenuRow:
     """Создает новое подменю."""
     return await submenu_service.create_submenu(
         menu_id=menu_id,
@@ -39,16 +43,47 @@ async def create_submenus(submenu: SubmenuSchema,
     )
 
 
+@submenu_router.post('/batch',
+                     response_model=list[SubmenuResponse],
+                     summary='Создать или изменить несколько подменю в основном меню')
+async def upsert_submenus(menu_id: str,
+                          background_tasks: BackgroundTasks,
+                          submenus: list[SubmenuSchema] = Body(..., min_length=1, max_length=BATCH_MAX_SIZE),
+                          submenu_service: AsyncSubmenuService = Depends()) -> Sequence[SubmenuRow]:
+    """
+    Создает подменю без ID и изменяет подменю этого меню с переданными ID одним запросом в БД.
+
+    Подменю другого меню с тем же ID не изменяются и не попадают в ответ.
+    Кеш инвалидируется один раз на весь пакет.
+    """
+    return await submenu_service.upsert_submenus(
+        menu_id=menu_id,
+        submenus=submenus,
+        background_tasks=background_tasks
+    )
+
+
 @submenu_router.get('/',
                     response_model=list[SubmenuResponse],
                     summary='Получить список подменю из меню')
 async def read_all_submenus(menu_id: str,
                             background_tasks: BackgroundTasks,
+                            response: Response,
+                            limit: int | None = Query(None, ge=1, le=PAGE_MAX_LIMIT),
+                            cursor: str | None = None,
                             submenu_service: AsyncSubmenuService = Depends()) -> list[SubmenuResponse]:
-    """Получает список всех подменю, хранящихся в одном конкретном меню."""
+    """
+    Получает список всех подменю, хранящихся в одном конкретном меню.
+
+    С параметрами limit и cursor возвращает страницу подменю в порядке ID, курсор следующей
+    страницы передается в заголовке X-Next-Cursor (нет заголовка - страница последняя).
+    """
     return await submenu_service.read_all_submenus(
         menu_id=menu_id,
-        background_tasks=background_tasks
+        background_tasks=background_tasks,
+        response=response,
+        limit=limit,
+        cursor=cursor
     )
 
 
@@ -74,7 +109,7 @@ async def update_submenu(menu_id: str,
                          submenu_id: str,
                          background_tasks: BackgroundTasks,
                          updated_submenu: SubmenuSchema,
-                         submenu_service: AsyncSubmenuService = Depends()) -> SubmenuResponse:
+                         submenu_service: AsyncSubmenuService = Depends()) -> SubmenuRow:
     """Изменяет конкретное подменю в конкретном основном меню"""
     return await submenu_service.update_submenu(
         menu_id=menu_id,
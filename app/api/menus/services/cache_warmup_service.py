@@ -0,0 +1,108 @@
+"""
+Прогрев кеша.
+
+Заново загружает из БД в кеш часто запрашиваемые представления: список меню,
+каждое меню, списки подменю, списки блюд и полное меню ресторана. Загрузки
+выполняются загрузчиками сервисов, поэтому записи в кеше совпадают с теми,
+что делают эндпоинты при промахе. Прогрев выполняется под блокировкой Redis,
+поэтому воркеры, запущенные одновременно, не загружают весь каталог каждый.
+"""
+import asyncio
+import uuid
+from contextlib import nullcontext
+from typing import Any, Awaitable, Callable
+
+from fastapi import HTTPException
+from starlette import status
+
+from app.api.menus.services.dish_service import AsyncDishService
+from app.api.menus.services.menu_service import AsyncMenuService
+from app.api.menus.services.submenu_service import AsyncSubmenuService
+from app.config import CACHE_WARMUP_CONCURRENCY, CACHE_WARMUP_LOCK_TIMEOUT
+from app.db.cache import RESPONSE_ADAPTERS, CacheRepository
+from app.db.cache_keys import full_menu_link
+from app.db.database_connect import LazySession, get_redis, primary_reads
+from app.db.repositories.dish_repository import AsyncDishRepository
+from app.db.repositories.menu_repository import AsyncMenuRepository
+from app.db.repositories.submenu_repository import AsyncSubmenuRepository
+from app.db.single_flight import LOCK_PREFIX, RELEASE_LOCK_SCRIPT
+
+# Сервис -> репозиторий БД, с которым он создается
+SERVICE_REPOSITORIES: dict[type, type] = {
+    AsyncMenuService: AsyncMenuRepository,
+    AsyncSubmenuService: AsyncSubmenuRepository,
+    AsyncDishService: AsyncDishRepository,
+}
+
+WARMUP_LOCK_KEY = f'{LOCK_PREFIX}warmup'
+
+
+async def warm_up_cache(concurrency: int = CACHE_WARMUP_CONCURRENCY) -> int:
+    """
+    Прогрев кеша, если его не выполняет другой воркер.
+
+    :param concurrency: Максимальное число одновременных загрузок из БД.
+    :return: Количество успешно прогретых представлений, 0 - если прогрев уже выполняется.
+    """
+    redis = get_redis()
+    token = uuid.uuid4().hex
+    if not await redis.set(WARMUP_LOCK_KEY, token, nx=True, ex=CACHE_WARMUP_LOCK_TIMEOUT):
+        return 0
+    try:
+        return await warm_up_hot_views(CacheRepository(redis_cacher=redis), concurrency)
+    finally:
+        await redis.register_script(RELEASE_LOCK_SCRIPT)(keys=[WARMUP_LOCK_KEY], args=[token])
+
+
+async def warm_up_hot_views(cache_repo: CacheRepository,
+                            concurrency: int) -> int:
+    """
+    Прогрев кеша часто запрашиваемых представлений.
+
+    Сначала загружается полное меню, по нему определяются остальные представления,
+    которые загружаются параллельно, не более concurrency одновременно.
+    Каждая загрузка выполняется в своей сессии БД. Данные читаются с реплики, а если
+    данные недавно изменялись (например, сразу после синхронизации) - с основной БД,
+    чтобы отставание реплики не попало в кеш. Меню или подменю, удаленное после загрузки полного меню,
+    пропускается (ответ 404), не прерывая остальные загрузки.
+
+    :param cache_repo: Репозиторий кеша.
+    :param concurrency: Максимальное число одновременных загрузок из БД.
+    :return: Количество успешно прогретых представлений.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(service_class: type,
+                  load: Callable[..., Awaitable[Any]],
+                  *args: str) -> Any:
+        async with semaphore, LazySession() as lazy_session:
+            service = service_class(SERVICE_REPOSITORIES[service_class](lazy_session), cache_repo)
+            return await load(service, *args)
+
+    async def try_run(service_class: type,
+                      load: Callable[..., Awaitable[Any]],
+                      *args: str) -> bool:
+        try:
+            await run(service_class, load, *args)
+        except HTTPException as error:
+            if error.status_code != status.HTTP_404_NOT_FOUND:
+                raise
+            return False
+        return True
+
+    # Полное меню инвалидируется любым изменением, поэтому его отметка означает, что реплика
+    # может еще не содержать недавние изменения (например, сразу после синхронизации)
+    recently_written = await cache_repo.recently_written(full_menu_link())
+    with primary_reads() if recently_written else nullcontext():
+        full_menu = await run(AsyncMenuService, AsyncMenuService.load_full_restaurant_menu)
+        if isinstance(full_menu, bytes):
+            # JSON-документ, собранный БД (app.config.FULL_MENU_JSON_FROM_DB)
+            full_menu = RESPONSE_ADAPTERS['full_menu'].validate_json(full_menu)
+        loads = [try_run(AsyncMenuService, AsyncMenuService.load_all_menus)]
+        for menu in full_menu:
+            loads.append(try_run(AsyncMenuService, AsyncMenuService.load_menu, menu.id))
+            loads.append(try_run(AsyncSubmenuService, AsyncSubmenuService.load_all_submenus, menu.id))
+            for submenu in menu.submenus:
+                loads.append(try_run(AsyncDishService, AsyncDishService.load_all_dishes, menu.id, submenu.id))
+        loaded = await asyncio.gather(*loads)
+    return sum(loaded) + 1
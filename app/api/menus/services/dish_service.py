@@ -1,7 +1,12 @@
-from fastapi import BackgroundTasks, Depends
+from functools import partial
+from typing import Sequence
 
+from fastapi import BackgroundTasks, Depends, Response
+
+from app.config import PAGE_DEFAULT_LIMIT
 from app.db.cache import CacheRepository
-from app.db.repositories.dish_repository import AsyncDishRepository
+from app.db.cache_keys import dish_link, dishes_link, page_link
+from app.db.repositories.dish_repository import AsyncDishRepository, DishRow
 from app.models.domain.menus_models import Dish
 from app.models.schemas.menus.dish_schemas import DishSchema
 
@@ -19,7 +24,7 @@ class AsyncDishService:
                           menu_id: str,
                           submenu_id: str,
                           dish: DishSchema,
-                          background_tasks: BackgroundTasks) -> Dish:
+                          background_tasks: BackgroundTasks) -> DishRow:
         """
         Исправить
 
@@ -30,6 +35,7 @@ class AsyncDishService:
         данного блюда и инвалидацию списка всех блюд
         """
         dish_info = await self.dish_repo.create_dish(menu_id, submenu_id, dish)
+        await self.cache_repo.delete_not_found_cache(dish_link(menu_id, submenu_id, dish_info.id))
         background_tasks.add_task(
             self.cache_repo.create_new_dish_cache,
             dish_info=dish_info,
@@ -38,51 +44,103 @@ class AsyncDishService:
         )
         return dish_info
 
+    async def upsert_dishes(self,
+                            menu_id: str,
+                            submenu_id: str,
+                            dishes: list[DishSchema],
+                            background_tasks: BackgroundTasks) -> Sequence[DishRow]:
+        """Пакетное создание и изменение блюд с инвалидацией кеша один раз на пакет"""
+        items = await self.dish_repo.upsert_dishes(submenu_id, dishes)
+        dish_ids = [item.id for item in items]
+        await self.cache_repo.delete_not_found_cache(
+            *[dish_link(menu_id, submenu_id, dish_id) for dish_id in dish_ids]
+        )
+        background_tasks.add_task(
+            self.cache_repo.upsert_dishes_cache,
+            menu_id=menu_id,
+            submenu_id=submenu_id,
+            dish_ids=dish_ids
+        )
+        return items
+
     async def read_all_dishes(self,
                               menu_id: str,
                               submenu_id: str,
-                              background_tasks: BackgroundTasks) -> list[Dish]:
+                              background_tasks: BackgroundTasks,
+                              response: Response,
+                              limit: int | None = None,
+                              cursor: str | None = None) -> list[Dish]:
         """
         Получение всех блюд
 
         Возвращает данные из кеша, если данные в кеше присутствуют.
 
-        Если кеша нет, то совершает запрос в БД. Создает фоновую задачу
-        на создание кеша для данного запроса
+        Если кеша нет, то совершает запрос в БД и записывает результат в кеш.
+        Одновременные запросы за тем же списком ожидают результат первого запроса.
+
+        Если передан limit или cursor, возвращается страница блюд, а курсор
+        следующей страницы записывается в заголовок ответа.
         """
-        cache = await self.cache_repo.get_all_dishes_cache(
-            menu_id=menu_id,
-            submenu_id=submenu_id
+        if limit is not None or cursor is not None:
+            limit = limit or PAGE_DEFAULT_LIMIT
+            return await self.cache_repo.read_page(
+                link=page_link(dishes_link(menu_id, submenu_id), limit, cursor),
+                limit=limit,
+                load=partial(self.load_dishes_page, menu_id, submenu_id, limit, cursor),
+                response=response,
+                background_tasks=background_tasks
+            )
+        return await self.cache_repo.read_through(
+            link=dishes_link(menu_id, submenu_id),
+            get_cache=partial(self.cache_repo.get_all_dishes_cache, menu_id, submenu_id),
+            load=partial(self.load_all_dishes, menu_id, submenu_id),
+            background_tasks=background_tasks
         )
-        if cache:
-            return cache
+
+    async def load_all_dishes(self,
+                              menu_id: str,
+                              submenu_id: str) -> Sequence[DishRow]:
+        """Загрузка всех блюд из БД с записью в кеш"""
         dish_list = await self.dish_repo.read_all_dishes(
             submenu_id=submenu_id
         )
-        background_tasks.add_task(
-            self.cache_repo.set_all_dishes_cache,
+        await self.cache_repo.set_all_dishes_cache(
             menu_id=menu_id,
             submenu_id=submenu_id,
             dish_list=dish_list
         )
         return dish_list
 
+    async def load_dishes_page(self,
+                               menu_id: str,
+                               submenu_id: str,
+                               limit: int,
+                               cursor: str | None) -> Sequence[DishRow]:
+        """Загрузка страницы блюд из БД с записью в кеш"""
+        dish_list = await self.dish_repo.read_all_dishes(submenu_id, limit, cursor)
+        await self.cache_repo.set_cache(page_link(dishes_link(menu_id, submenu_id), limit, cursor), dish_list)
+        return dish_list
+
     async def read_dish(self,
                         menu_id: str,
                         submenu_id: str,
                         dish_id: str,
                         background_tasks: BackgroundTasks) -> Dish:
         """Получение блюд по id"""
-        cache = await self.cache_repo.get_dish_cache(
-            menu_id=menu_id,
-            submenu_id=submenu_id,
-            dish_id=dish_id
+        return await self.cache_repo.read_through(
+            link=dish_link(menu_id, submenu_id, dish_id),
+            get_cache=partial(self.cache_repo.get_dish_cache, menu_id, submenu_id, dish_id),
+            load=partial(self.load_dish, menu_id, submenu_id, dish_id),
+            background_tasks=background_tasks
         )
-        if cache:
-            return cache
+
+    async def load_dish(self,
+                        menu_id: str,
+                        submenu_id: str,
+                        dish_id: str) -> DishRow:
+        """Загрузка блюда из БД с записью в кеш"""
         dish_info = await self.dish_repo.read_dish(dish_id)
-        background_tasks.add_task(
-            self.cache_repo.set_dish_cache,
+        await self.cache_repo.set_dish_cache(
             menu_id=menu_id,
             submenu_id=submenu_id,
             dish_info=dish_info
@@ -94,7 +152,7 @@ class AsyncDishService:
                           submenu_id: str,
                           dish_id: str,
                           updated_dish: DishSchema,
-                          background_tasks: BackgroundTasks) -> Dish:
+                          background_tasks: BackgroundTasks) -> DishRow:
         """Изменение блюд по id"""
         dish = await self.dish_repo.update_dish(dish_id, updated_dish)
         background_tasks.add_task(
@@ -1,10 +1,26 @@
 """Сервисный слой для модели Меню"""
-from fastapi import BackgroundTasks, Depends
+import logging
+from functools import partial
+from typing import AsyncIterator, Sequence
 
+from aioredis import RedisError
+from fastapi import BackgroundTasks, Depends, Response
+
+from app.config import (
+    FULL_MENU_JSON_FROM_DB,
+    FULL_MENU_SNAPSHOT,
+    FULL_MENU_STREAM_BATCH_SIZE,
+    PAGE_DEFAULT_LIMIT,
+)
 from app.db.cache import CacheRepository
-from app.db.repositories.menu_repository import AsyncMenuRepository
+from app.db.cache_keys import full_menu_link, menu_link, menus_link, page_link
+from app.db.repositories.menu_repository import (
+    AsyncMenuRepository,
+    MenuCountRow,
+    MenuRow,
+)
 from app.models.domain.menus_models import Menu
-from app.models.schemas.menus.menu_schemas import MenuSchema
+from app.models.schemas.menus.menu_schemas import MenuFullResponse, MenuSchema
 
 
 class AsyncMenuService:
@@ -18,57 +34,99 @@ class AsyncMenuService:
 
     async def create_menu(self,
                           menu: MenuSchema,
-                          background_tasks: BackgroundTasks) -> Menu:
+                          background_tasks: BackgroundTasks) -> MenuRow:
         """Добавление нового меню"""
         created_menu = await self.menu_repo.create_menu(menu)
-        menu_info = await self.menu_repo.read_menu(menu_id=created_menu.id)
+        await self.cache_repo.delete_not_found_cache(menu_link(created_menu.id))
         background_tasks.add_task(
             self.cache_repo.create_new_menu_cache,
-            menu_info=menu_info
+            menu_id=created_menu.id
         )
         return created_menu
 
-    async def read_all_menus(self,
-                             background_tasks: BackgroundTasks) -> list[Menu]:
-        """Получение всех меню"""
-        cache = await self.cache_repo.get_all_menus_cache()
-        if cache:
-            return cache
-        menu_list = await self.menu_repo.read_all_menus()
+    async def upsert_menus(self,
+                           menus: list[MenuSchema],
+                           background_tasks: BackgroundTasks) -> Sequence[MenuRow]:
+        """Пакетное создание и изменение меню с инвалидацией кеша один раз на пакет"""
+        items = await self.menu_repo.upsert_menus(menus)
+        menu_ids = [item.id for item in items]
+        await self.cache_repo.delete_not_found_cache(*[menu_link(menu_id) for menu_id in menu_ids])
         background_tasks.add_task(
-            self.cache_repo.set_all_menus_cache,
-            menu_list
+            self.cache_repo.upsert_menus_cache,
+            menu_ids=menu_ids
+        )
+        return items
+
+    async def read_all_menus(self,
+                             background_tasks: BackgroundTasks,
+                             response: Response,
+                             limit: int | None = None,
+                             cursor: str | None = None) -> list[Menu]:
+        """
+        Получение всех меню.
+
+        Если передан limit или cursor, возвращается страница меню, а курсор
+        следующей страницы записывается в заголовок ответа.
+        """
+        if limit is not None or cursor is not None:
+            limit = limit or PAGE_DEFAULT_LIMIT
+            return await self.cache_repo.read_page(
+                link=page_link(menus_link(), limit, cursor),
+                limit=limit,
+                load=partial(self.load_menus_page, limit, cursor),
+                response=response,
+                background_tasks=background_tasks
+            )
+        return await self.cache_repo.read_through(
+            link=menus_link(),
+            get_cache=self.cache_repo.get_all_menus_cache,
+            load=self.load_all_menus,
+            background_tasks=background_tasks
         )
+
+    async def load_all_menus(self) -> Sequence[MenuCountRow]:
+        """Загрузка всех меню из БД с записью в кеш"""
+        menu_list = await self.menu_repo.read_all_menus()
+        await self.cache_repo.set_all_menus_cache(menu_list)
+        return menu_list
+
+    async def load_menus_page(self,
+                              limit: int,
+                              cursor: str | None) -> Sequence[MenuCountRow]:
+        """Загрузка страницы меню из БД с записью в кеш"""
+        menu_list = await self.menu_repo.read_all_menus(limit, cursor)
+        await self.cache_repo.set_cache(page_link(menus_link(), limit, cursor), menu_list)
         return menu_list
 
     async def read_menu(self,
                         menu_id: str,
                         background_tasks: BackgroundTasks) -> Menu:
         """Получение меню по id"""
-        cache = await self.cache_repo.get_menu_cache(menu_id)
-        if cache:
-            return cache
-        menu_info = await self.menu_repo.read_menu(menu_id)
-        background_tasks.add_task(
-            self.cache_repo.set_menu_cache,
-            menu_id,
-            menu_info
+        return await self.cache_repo.read_through(
+            link=menu_link(menu_id),
+            get_cache=partial(self.cache_repo.get_menu_cache, menu_id),
+            load=partial(self.load_menu, menu_id),
+            background_tasks=background_tasks
         )
+
+    async def load_menu(self,
+                        menu_id: str) -> MenuCountRow:
+        """Загрузка меню из БД с записью в кеш"""
+        menu_info = await self.menu_repo.read_menu(menu_id)
+        await self.cache_repo.set_menu_cache(menu_id, menu_info)
         return menu_info
 
     async def update_menu(self,
                           menu_id: str,
                           updated_menu: MenuSchema,
-                          background_tasks: BackgroundTasks) -> Menu:
+                          background_tasks: BackgroundTasks) -> MenuRow:
         """Изменение меню по id"""
         updated_menu_info = await self.menu_repo.update_menu(
             menu_id=menu_id,
             updated_menu=updated_menu
         )
-        menu_info = await self.menu_repo.read_menu(menu_id)
         background_tasks.add_task(
             self.cache_repo.update_menu_cache,
-            menu_info=menu_info,
             menu_id=menu_id
         )
         return updated_menu_info
@@ -85,15 +143,63 @@ class AsyncMenuService:
         return deleted_menu
 
     async def get_full_restaurant_menu(self,
-                                       background_tasks: BackgroundTasks) -> list[Menu]:
+                                       background_tasks: BackgroundTasks) -> list[Menu] | Response:
         """
         Получение полного списка всех меню, соответствующих подменю и соответствующих блюд
+
+        Если Redis недоступен, а полное меню читается из снимков меню (app.config.FULL_MENU_SNAPSHOT),
+        снимки отдаются без кеша.
         """
-        cache = await self.cache_repo.get_full_restaurant_menu()
-        if cache:
-            return cache
-        items = await self.menu_repo.get_full_restaurant_menu()
-        background_tasks.add_task(
-            self.cache_repo.set_full_restaurant_menu, items
-        )
+        try:
+            return await self.cache_repo.read_through(
+                link=full_menu_link(),
+                get_cache=self.cache_repo.get_full_restaurant_menu,
+                load=self.load_full_restaurant_menu,
+                background_tasks=background_tasks
+            )
+        except RedisError as error:
+            if not FULL_MENU_SNAPSHOT:
+                raise
+            logging.error(error)
+            return Response(content=await self.menu_repo.get_full_restaurant_menu_snapshot(),
+                            media_type='application/json')
+
+    async def load_full_restaurant_menu(self) -> Sequence[Menu] | bytes:
+        """
+        Загрузка полного меню ресторана из БД с записью в кеш
+
+        Если включен app.config.FULL_MENU_SNAPSHOT, полное меню читается из снимков меню,
+        если включен app.config.FULL_MENU_JSON_FROM_DB - собирается в БД. В обоих случаях
+        загружается готовый JSON-документ.
+        """
+        items: Sequence[Menu] | bytes
+        if FULL_MENU_SNAPSHOT:
+            items = await self.menu_repo.get_full_restaurant_menu_snapshot()
+        elif FULL_MENU_JSON_FROM_DB:
+            items = await self.menu_repo.get_full_restaurant_menu_json()
+        else:
+            items = await self.menu_repo.get_full_restaurant_menu()
+        await self.cache_repo.set_full_restaurant_menu(items)
         return items
+
+    async def stream_full_restaurant_menu(self) -> AsyncIterator[bytes]:
+        """
+        Потоковая отдача полного меню ресторана в формате NDJSON: одно меню на строку.
+
+        Меню читаются из БД пачками (app.config.FULL_MENU_STREAM_BATCH_SIZE) и отдаются
+        по мере чтения, без кеша: весь ответ не собирается ни в памяти, ни в Redis.
+        """
+        async for menus in self.menu_repo.stream_full_restaurant_menu(FULL_MENU_STREAM_BATCH_SIZE):
+            yield b''.join(
+                MenuFullResponse.model_validate(menu).model_dump_json().encode() + b'\n' for menu in menus
+            )
+
+    async def rebuild_menu_snapshots(self) -> int:
+        """
+        Пересборка снимков всех меню с инвалидацией полного меню ресторана в кеше.
+
+        :return: Количество меню.
+        """
+        menus_count = await self.menu_repo.rebuild_menu_snapshots()
+        await self.cache_repo.delete_full_base_cache()
+        return menus_count
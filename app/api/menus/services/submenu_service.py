@@ -1,7 +1,16 @@
-from fastapi import BackgroundTasks, Depends
+from functools import partial
+from typing import Sequence
 
+from fastapi import BackgroundTasks, Depends, Response
+
+from app.config import PAGE_DEFAULT_LIMIT
 from app.db.cache import CacheRepository
-from app.db.repositories.submenu_repository import AsyncSubmenuRepository
+from app.db.cache_keys import page_link, submenu_link, submenus_link
+from app.db.repositories.submenu_repository import (
+    AsyncSubmenuRepository,
+    SubmenuCountRow,
+    SubmenuRow,
+)
 from app.models.domain.menus_models import Submenu
 from app.models.schemas.menus.submenu_schemas import SubmenuSchema
 
@@ -18,46 +27,99 @@ class AsyncSubmenuService:
     async def create_submenu(self,
                              menu_id: str,
                              submenu: SubmenuSchema,
-                             background_tasks: BackgroundTasks) -> Submenu:
+                             background_tasks: BackgroundTasks) -> SubmenuRow:
         """Добавление нового подменю"""
         created_submenu = await self.submenu_repo.create_submenu(menu_id, submenu)
-        submenu_info = await self.submenu_repo.read_submenu(
-            submenu_id=created_submenu.id
-        )
+        await self.cache_repo.delete_not_found_cache(submenu_link(menu_id, created_submenu.id))
         background_tasks.add_task(
             self.cache_repo.create_new_submenu_cache,
-            submenu_info=submenu_info,
             menu_id=menu_id,
-            submenu_id=submenu_info.id
+            submenu_id=created_submenu.id
         )
         return created_submenu
 
+    async def upsert_submenus(self,
+                              menu_id: str,
+                              submenus: list[SubmenuSchema],
+                              background_tasks: BackgroundTasks) -> Sequence[SubmenuRow]:
+        """Пакетное создание и изменение подменю с инвалидацией кеша один раз на пакет"""
+        items = await self.submenu_repo.upsert_submenus(menu_id, submenus)
+        submenu_ids = [item.id for item in items]
+        await self.cache_repo.delete_not_found_cache(
+            *[submenu_link(menu_id, submenu_id) for submenu_id in submenu_ids]
+        )
+        background_tasks.add_task(
+            self.cache_repo.upsert_submenus_cache,
+            menu_id=menu_id,
+            submenu_ids=submenu_ids
+        )
+        return items
+
     async def read_all_submenus(self,
                                 menu_id: str,
-                                background_tasks: BackgroundTasks) -> list[Submenu]:
-        """Получение всех подменю"""
-        cache = await self.cache_repo.get_all_submenus_cache(menu_id=menu_id)
-        if cache:
-            return cache
+                                background_tasks: BackgroundTasks,
+                                response: Response,
+                                limit: int | None = None,
+                                cursor: str | None = None) -> list[Submenu]:
+        """
+        Получение всех подменю.
+
+        Если передан limit или cursor, возвращается страница подменю, а курсор
+        следующей страницы записывается в заголовок ответа.
+        """
+        if limit is not None or cursor is not None:
+            limit = limit or PAGE_DEFAULT_LIMIT
+            return await self.cache_repo.read_page(
+                link=page_link(submenus_link(menu_id), limit, cursor),
+                limit=limit,
+                load=partial(self.load_submenus_page, menu_id, limit, cursor),
+                response=response,
+                background_tasks=background_tasks
+            )
+        return await self.cache_repo.read_through(
+            link=submenus_link(menu_id),
+            get_cache=partial(self.cache_repo.get_all_submenus_cache, menu_id),
+            load=partial(self.load_all_submenus, menu_id),
+            background_tasks=background_tasks
+        )
+
+    async def load_all_submenus(self,
+                                menu_id: str) -> Sequence[SubmenuCountRow]:
+        """Загрузка всех подменю из БД с записью в кеш"""
         submenu_list = await self.submenu_repo.read_all_submenus(menu_id)
-        background_tasks.add_task(
-            self.cache_repo.set_all_submenus_cache,
+        await self.cache_repo.set_all_submenus_cache(
             menu_id=menu_id,
             submenu_list=submenu_list
         )
         return submenu_list
 
+    async def load_submenus_page(self,
+                                 menu_id: str,
+                                 limit: int,
+                                 cursor: str | None) -> Sequence[SubmenuCountRow]:
+        """Загрузка страницы подменю из БД с записью в кеш"""
+        submenu_list = await self.submenu_repo.read_all_submenus(menu_id, limit, cursor)
+        await self.cache_repo.set_cache(page_link(submenus_link(menu_id), limit, cursor), submenu_list)
+        return submenu_list
+
     async def read_submenu(self,
                            menu_id: str,
                            submenu_id: str,
                            background_tasks: BackgroundTasks) -> Submenu:
         """Получение подменю по id"""
-        cache = await self.cache_repo.get_submenu_cache(menu_id, submenu_id)
-        if cache:
-            return cache
+        return await self.cache_repo.read_through(
+            link=submenu_link(menu_id, submenu_id),
+            get_cache=partial(self.cache_repo.get_submenu_cache, menu_id, submenu_id),
+            load=partial(self.load_submenu, menu_id, submenu_id),
+            background_tasks=background_tasks
+        )
+
+    async def load_submenu(self,
+                           menu_id: str,
+                           submenu_id: str) -> SubmenuCountRow:
+        """Загрузка подменю из БД с записью в кеш"""
         submenu_info = await self.submenu_repo.read_submenu(submenu_id)
-        background_tasks.add_task(
-            self.cache_repo.set_submenu_cache,
+        await self.cache_repo.set_submenu_cache(
             menu_id=menu_id,
             submenu_id=submenu_id,
             submenu_info=submenu_info
@@ -68,18 +130,14 @@ class AsyncSubmenuService:
                              menu_id: str,
                              submenu_id: str,
                              updated_submenu: SubmenuSchema,
-                             background_tasks: BackgroundTasks) -> Submenu:
+                             background_tasks: BackgroundTasks) -> SubmenuRow:
         """Изменение подменю по id"""
         updated_submenu_info = await self.submenu_repo.update_submenu(
             submenu_id=submenu_id,
             updated_submenu=updated_submenu
         )
-        submenu_info = await self.submenu_repo.read_submenu(
-            submenu_id=submenu_id
-        )
         background_tasks.add_task(
             self.cache_repo.update_submenu_cache,
-            submenu_info=submenu_info,
             menu_id=menu_id,
             submenu_id=submenu_id
         )
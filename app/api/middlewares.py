@@ -0,0 +1,211 @@
+"""
+ASGI middleware приложения.
+
+ConditionalGetMiddleware добавляет к ответам GET эндпоинтов меню строгий ETag
+(хеш тела ответа) и заголовок Cache-Control, а на запрос с совпадающим
+If-None-Match отвечает 304 без тела. Если готовый ответ есть в кеше, ETag
+сравнивается с хранящимся рядом с записью до вызова приложения.
+
+ResponseCacheMiddleware отдает закешированные ответы GET эндпоинтов меню
+до маршрутизации FastAPI: без разрешения зависимостей (сервис, репозиторий,
+сессия БД), вызова эндпоинта и валидации модели ответа.
+"""
+import logging
+
+from aioredis import RedisError
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import HTTP_CACHE_CONTROL
+from app.db.cache import CacheRepository, cache_stats, make_etag
+from app.db.cache_keys import LINK_FAMILIES, build_link
+from app.db.database_connect import get_redis
+
+API_PREFIX = '/api/v1'
+FULL_MENU_PATH = f'{API_PREFIX}/menus/full_restaurant_menu'
+
+# Названия коллекций в пути '/menus/{menu_id}/submenus/{submenu_id}/dishes/{dish_id}/'
+# и соответствующие им параметры пути
+PATH_COLLECTIONS = ('menus', 'submenus', 'dishes')
+PATH_PARAMS = ('menu_id', 'submenu_id', 'dish_id')
+
+
+def etag_matches(etag: str, if_none_match: str) -> bool:
+    """
+    Проверка ETag по заголовку If-None-Match (слабое сравнение, RFC 9110).
+
+    :param etag: ETag ответа.
+    :param if_none_match: Значение заголовка If-None-Match.
+    :return: True, если у клиента актуальная версия ответа.
+    """
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in tags or etag in (tag.removeprefix('W/') for tag in tags)
+
+
+class ConditionalGetMiddleware:
+    """
+    Условные GET-запросы (ETag / If-None-Match / Cache-Control).
+
+    ETag - хеш тела ответа. Для готовых JSON-ответов из кеша он вычисляется при записи
+    в кеш и хранится рядом с записью (CacheRepository.get_etag), поэтому запрос с совпадающим
+    If-None-Match получает 304 до вызова приложения: без запросов в БД, чтения записи
+    и сериализации. При промахе запрос обрабатывается приложением, и ETag вычисляется
+    по телу ответа. Потоковые ответы (без Content-Length) и ответы со статусом, отличным от 200,
+    передаются без изменений.
+    """
+
+    def __init__(self,
+                 app: ASGIApp,
+                 path_prefix: str = '/api/v1/menus',
+                 cache_control: str = HTTP_CACHE_CONTROL) -> None:
+        self.app = app
+        self.path_prefix = path_prefix
+        self.cache_control = cache_control
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http' or scope['method'] != 'GET' or not scope['path'].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = Headers(scope=scope).get('if-none-match')
+        if if_none_match and not scope['query_string']:
+            etag = await self.get_cached_etag(scope)
+            if etag is not None and etag_matches(etag, if_none_match):
+                headers = [(b'etag', etag.encode()), (b'cache-control', self.cache_control.encode())]
+                await send({'type': 'http.response.start', 'status': 304, 'headers': headers})
+                await send({'type': 'http.response.body', 'body': b''})
+                return
+        start_message: Message | None = None
+        body_parts: list[bytes] = []
+
+        async def send_with_etag(message: Message) -> None:
+            nonlocal start_message
+            if message['type'] == 'http.response.start':
+                headers = Headers(raw=message['headers'])
+                if message['status'] == 200 and 'content-length' in headers and 'etag' not in headers:
+                    start_message = message
+                    return
+            elif message['type'] == 'http.response.body' and start_message is not None:
+                body_parts.append(message.get('body', b''))
+                if message.get('more_body', False):
+                    return
+                body = b''.join(body_parts)
+                etag = make_etag(body)
+                headers = MutableHeaders(raw=start_message['headers'])
+                headers['etag'] = etag
+                headers.setdefault('cache-control', self.cache_control)
+                start_message['headers'] = headers.raw
+                if if_none_match and etag_matches(etag, if_none_match):
+                    not_modified_headers = [(key, value) for key, value in headers.raw
+                                            if key not in (b'content-length', b'content-type')]
+                    await send({'type': 'http.response.start', 'status': 304, 'headers': not_modified_headers})
+                    await send({'type': 'http.response.body', 'body': b''})
+                    return
+                await send(start_message)
+                await send({'type': 'http.response.body', 'body': body})
+                return
+            await send(message)
+
+        await self.app(scope, receive, send_with_etag)
+
+    @staticmethod
+    async def get_cached_etag(scope: Scope) -> str | None:
+        """
+        Получение ETag готового JSON-ответа из кеша по пути запроса.
+
+        :param scope: ASGI scope запроса.
+        :return: ETag или None, если путь не кешируется или готового ответа в кеше нет.
+        """
+        parsed = parse_cache_path(scope['path'])
+        if parsed is None:
+            return None
+        family, ids = parsed
+        link = build_link(family, **ids)
+        try:
+            etag = await get_cache_repository(scope).get_etag(link)
+        except RedisError as error:
+            logging.error(error)
+            return None
+        if etag is not None:
+            cache_stats.record(link, hit=True)
+        return etag
+
+
+def get_cache_repository(scope: Scope) -> CacheRepository:
+    """Репозиторий кеша с клиентом Redis с учетом dependency_overrides приложения, как в эндпоинтах."""
+    redis_dependency = scope['app'].dependency_overrides.get(get_redis, get_redis)
+    return CacheRepository(redis_cacher=redis_dependency())
+
+
+def parse_cache_path(path: str) -> tuple[str, dict[str, str]] | None:
+    """
+    Получение семейства ключа кеша и ID сущностей по пути GET эндпоинта.
+
+    Учитываются только пути в том виде, в котором они объявлены в роутерах
+    (с завершающим слешем, кроме полного меню ресторана).
+
+    :param path: Путь запроса, например '/api/v1/menus/{menu_id}/submenus/'.
+    :return: Семейство ключа и ID сущностей или None, если путь не кешируется.
+    """
+    if path == FULL_MENU_PATH:
+        return 'full_menu', {}
+    if not path.startswith(f'{API_PREFIX}/') or not path.endswith('/'):
+        return None
+    segments = path[len(API_PREFIX) + 1:-1].split('/')
+    collections, ids = segments[0::2], segments[1::2]
+    if len(segments) > len(LINK_FAMILIES) or tuple(collections) != PATH_COLLECTIONS[:len(collections)] or '' in ids:
+        return None
+    return LINK_FAMILIES[len(segments) - 1], dict(zip(PATH_PARAMS, ids))
+
+
+class ResponseCacheMiddleware:
+    """
+    Ответы на GET-запросы эндпоинтов меню из кеша до маршрутизации FastAPI.
+
+    Использует те же ключи и записи, что и CacheRepository (локальный кеш воркера
+    и Redis), поэтому инвалидируется теми же изменениями. Отдаются только
+    актуальные готовые JSON-ответы: при промахе, устаревшей записи (ее обновление
+    в фоне выполняет сервис) или запросе с параметрами запрос передается приложению.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] == 'http' and scope['method'] == 'GET' and not scope['query_string']:
+            parsed = parse_cache_path(scope['path'])
+            if parsed is not None:
+                try:
+                    body = await self.get_cached_response(scope, *parsed)
+                except RedisError as error:
+                    # Без Redis запрос обрабатывает приложение (например, полное меню из снимков)
+                    logging.error(error)
+                    body = None
+                if body is not None:
+                    await Response(content=body, media_type='application/json')(scope, receive, send)
+                    return
+        await self.app(scope, receive, send)
+
+    async def get_cached_response(self,
+                                  scope: Scope,
+                                  family: str,
+                                  ids: dict[str, str]) -> bytes | None:
+        """
+        Получение готового JSON-ответа из кеша.
+
+        :param scope: ASGI scope запроса.
+        :param family: Семейство ключа кеша.
+        :param ids: ID сущностей из пути.
+        :return: Тело ответа или None, если актуального готового ответа в кеше нет.
+        """
+        cache_repo = get_cache_repository(scope)
+        link = build_link(family, **ids)
+        if family == 'dishes':
+            value = await cache_repo.get_all_dishes_cache(ids['menu_id'], ids['submenu_id'])
+        else:
+            value = await cache_repo.get_cache(link)
+        if not isinstance(value, bytes) or link in cache_repo.stale_links:
+            return None
+        cache_stats.record(link, hit=True)
+        return value
@@ -19,6 +19,100 @@ REDIS_PORT = os.environ.get('REDIS_PORT')
 
 EXPIRATION = 3600
 
+# Мягкое и жесткое время жизни кеша по семействам ключей, в секундах.
+# После мягкого срока сервисы сразу отдают устаревшее значение и обновляют его в фоне,
+# после жесткого запись удаляется из Redis и следующий запрос идет в БД.
+CACHE_TTL = {
+    'menus': (EXPIRATION, 2 * EXPIRATION),
+    'menu': (EXPIRATION, 2 * EXPIRATION),
+    'submenus': (EXPIRATION, 2 * EXPIRATION),
+    'submenu': (EXPIRATION, 2 * EXPIRATION),
+    'dishes': (EXPIRATION, 2 * EXPIRATION),
+    'dish': (EXPIRATION, 2 * EXPIRATION),
+    'full_menu': (EXPIRATION, 2 * EXPIRATION),
+}
+
+# Хранить в кеше готовые JSON-ответы эндпоинтов вместо сериализованных объектов БД.
+# Попадание в кеш тогда отдается как есть, без десериализации, валидации и кодирования в JSON.
+CACHE_RENDERED_RESPONSES = os.getenv('CACHE_RENDERED_RESPONSES', 'true') == 'true'
+
+# Кодек записей кеша в Redis: 'msgpack' или 'json' (см. app/db/serializers.py).
+# Записи, сделанные другим кодеком, продолжают читаться, поэтому смена кодека не требует очистки кеша.
+CACHE_CODEC = os.getenv('CACHE_CODEC', 'msgpack')
+# Записи больше этого размера в байтах сжимаются zlib
+CACHE_COMPRESSION_THRESHOLD = int(os.getenv('CACHE_COMPRESSION_THRESHOLD', 16 * 1024))
+
+# Локальный (в памяти воркера) уровень кеша перед Redis
+LOCAL_CACHE_ENABLED = os.getenv('LOCAL_CACHE_ENABLED') == 'true'
+LOCAL_CACHE_MAX_ENTRIES = int(os.getenv('LOCAL_CACHE_MAX_ENTRIES', 1000))
+LOCAL_CACHE_MAX_BYTES = int(os.getenv('LOCAL_CACHE_MAX_BYTES', 16 * 1024 * 1024))
+# Время жизни локальной записи ограничивает рассинхронизацию воркеров при потере сообщений
+LOCAL_CACHE_TTL = float(os.getenv('LOCAL_CACHE_TTL', 5))
+# Канал Redis для сообщений об инвалидации локального кеша
+CACHE_INVALIDATION_CHANNEL = 'cache_invalidation'
+
+# Объединение одновременных загрузок одного ключа кеша (single flight):
+# время жизни блокировки в Redis и интервал опроса кеша ожидающими запросами, в секундах
+SINGLE_FLIGHT_LOCK_TIMEOUT = float(os.getenv('SINGLE_FLIGHT_LOCK_TIMEOUT', 5))
+SINGLE_FLIGHT_POLL_INTERVAL = float(os.getenv('SINGLE_FLIGHT_POLL_INTERVAL', 0.05))
+
+# Прогрев кеша: при запуске приложения, через эндпоинт администрирования и после синхронизации
+# с файлом меню. Ограничение числа одновременных загрузок из БД (у каждой своя сессия).
+CACHE_WARMUP_ON_STARTUP = os.getenv('CACHE_WARMUP_ON_STARTUP', 'true') == 'true'
+CACHE_WARMUP_CONCURRENCY = int(os.getenv('CACHE_WARMUP_CONCURRENCY', 4))
+# Время жизни блокировки прогрева в Redis, в секундах: одновременно прогрев выполняет
+# только один воркер (например, при запуске всех воркеров после развертывания).
+CACHE_WARMUP_LOCK_TIMEOUT = int(os.getenv('CACHE_WARMUP_LOCK_TIMEOUT', 300))
+
+# Время жизни записи о ненайденном меню, подменю или блюде (ответ 404), в секундах.
+# Пока запись есть, запросы несуществующих ID не доходят до БД.
+CACHE_NOT_FOUND_TTL = int(os.getenv('CACHE_NOT_FOUND_TTL', 30))
+
+# Заголовок Cache-Control ответов GET эндпоинтов меню. По умолчанию клиент может хранить ответ,
+# но перед использованием проверяет его запросом с If-None-Match (ответ 304 без тела, если ETag совпал).
+HTTP_CACHE_CONTROL = os.getenv('HTTP_CACHE_CONTROL', 'no-cache')
+
+# Отдавать закешированные ответы GET эндпоинтов меню из ASGI middleware, до маршрутизации FastAPI
+# и разрешения зависимостей (только для готовых JSON-ответов, см. CACHE_RENDERED_RESPONSES)
+CACHE_ASGI_RESPONSES = os.getenv('CACHE_ASGI_RESPONSES', 'true') == 'true'
+
+# Постраничное чтение списков меню, подменю и блюд (параметры limit и cursor): наибольший размер
+# страницы и размер страницы, если передан только курсор. Без параметров список отдается целиком.
+PAGE_MAX_LIMIT = int(os.getenv('PAGE_MAX_LIMIT', 100))
+PAGE_DEFAULT_LIMIT = int(os.getenv('PAGE_DEFAULT_LIMIT', 20))
+
+# Потоковая отдача полного меню ресторана (NDJSON): количество меню, читаемых из БД за раз
+# через курсор на стороне сервера. Память на запрос определяется этим числом, а не размером меню.
+FULL_MENU_STREAM_BATCH_SIZE = int(os.getenv('FULL_MENU_STREAM_BATCH_SIZE', 50))
+
+# Собирать JSON полного меню ресторана в БД одним запросом (json_agg) вместо загрузки объектов моделей
+FULL_MENU_JSON_FROM_DB = os.getenv('FULL_MENU_JSON_FROM_DB', 'true') == 'true'
+# Читать полное меню ресторана из снимков меню (таблица menu_snapshots), которые обновляются при изменениях.
+# Снимки отдаются и без Redis, если он недоступен.
+FULL_MENU_SNAPSHOT = os.getenv('FULL_MENU_SNAPSHOT', 'true') == 'true'
+
+# Наибольшее количество меню, подменю или блюд в одном запросе пакетного создания и изменения.
+# Пакет записывается одним INSERT, поэтому размер ограничен числом параметров запроса Postgres.
+BATCH_MAX_SIZE = int(os.getenv('BATCH_MAX_SIZE', 1000))
+
+# Пул соединений с БД (на каждый воркер): постоянные соединения, дополнительные соединения сверх них,
+# ожидание свободного соединения и время жизни соединения в секундах, проверка соединения перед выдачей
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 10))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 30))
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))
+DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true') == 'true'
+# Размер кеша подготовленных выражений asyncpg на соединение (0 - для PgBouncer в режиме transaction)
+DB_STATEMENT_CACHE_SIZE = int(os.getenv('DB_STATEMENT_CACHE_SIZE', 100))
+
+# Пул соединений с Redis (на каждый воркер): максимум соединений и ожидание свободного соединения в секундах
+REDIS_MAX_CONNECTIONS = int(os.getenv('REDIS_MAX_CONNECTIONS', 50))
+REDIS_POOL_TIMEOUT = float(os.getenv('REDIS_POOL_TIMEOUT', 5))
+# Таймауты подключения и чтения ответа Redis в секундах. Таймаут чтения по умолчанию не ограничен:
+# подписка на канал инвалидации локального кеша ждет сообщений без ограничения времени.
+REDIS_SOCKET_CONNECT_TIMEOUT = float(os.getenv('REDIS_SOCKET_CONNECT_TIMEOUT', 5))
+REDIS_SOCKET_TIMEOUT = float(os.getenv('REDIS_SOCKET_TIMEOUT', 0)) or None
+
 
 # Для переключения между докером и локалом необходимо закомментировать соответствующие переменные
 # Общие переменные (используются в тестах)
@@ -35,6 +129,17 @@ REDIS_URL = f'redis://redis:{REDIS_PORT}/0'  # Для докера
 # Для Докера:
 SQLALCHEMY_DATABASE_URL = f'postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_DOCKER_HOST}:{DB_PORT}/{DB_NAME}'
 
+# Необязательная реплика для чтения: если DB_READ_HOST не задан, чтение идет с основной БД.
+# Чтение после изменения в том же запросе всегда идет с основной БД (read-your-writes).
+DB_READ_HOST = os.environ.get('DB_READ_HOST')
+DB_READ_PORT = os.environ.get('DB_READ_PORT', DB_PORT)
+SQLALCHEMY_READ_DATABASE_URL = (
+    f'postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_READ_HOST}:{DB_READ_PORT}/{DB_NAME}' if DB_READ_HOST else None
+)
+# Время в секундах (не меньше отставания реплики), в течение которого загрузки в кеш
+# недавно измененных данных читают с основной БД, а не с реплики.
+DB_REPLICA_LAG_TTL = int(os.getenv('DB_REPLICA_LAG_TTL', 5))
+
 # Данные для celery и rabbitmq
 RABBITMQ_DEFAULT_USER = os.getenv('RABBITMQ_DEFAULT_USER')
 RABBITMQ_DEFAULT_PASS = os.getenv('RABBITMQ_DEFAULT_PASS')
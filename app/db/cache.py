@@ -1,10 +1,272 @@
-import pickle
+import hashlib
+import json
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Awaitable, Callable, Iterable, NamedTuple, Sequence
+
+from fastapi import BackgroundTasks, Depends, HTTPException, Response, status
+from pydantic import TypeAdapter
+
+from app.config import (
+    CACHE_INVALIDATION_CHANNEL,
+    CACHE_NOT_FOUND_TTL,
+    CACHE_RENDERED_RESPONSES,
+    CACHE_TTL,
+    DB_REPLICA_LAG_TTL,
+)
+from app.db.cache_keys import (
+    GLOBAL_GENERATION_KEY,
+    LIST_FAMILIES,
+    build_link,
+    dish_link,
+    dishes_link,
+    full_menu_link,
+    get_etag_key,
+    get_link_family,
+    get_link_generation_keys,
+    get_list_generation_key,
+    get_menu_generation_key,
+    get_not_found_key,
+    get_recent_write_key,
+    get_submenu_generation_key,
+    menu_link,
+    menus_link,
+    submenu_link,
+    submenus_link,
+)
+from app.db.database_connect import get_redis, has_read_replica, primary_reads
+from app.db.local_cache import LocalCache, local_cache
+from app.db.repositories.dish_repository import DishRow
+from app.db.repositories.menu_repository import MenuCountRow
+from app.db.repositories.submenu_repository import SubmenuCountRow
+from app.db.serializers import CacheSerializer
+from app.db.single_flight import single_flight
+from app.models.domain.menus_models import Dish, Menu, Submenu
+from app.models.schemas.menus.dish_schemas import DishResponse
+from app.models.schemas.menus.menu_schemas import (
+    MenuCountResponse,
+    MenuFullResponse,
+    MenuResponse,
+)
+from app.models.schemas.menus.submenu_schemas import (
+    SubmenuCountResponse,
+    SubmenuResponse,
+)
+
+# Списки блюд подменю хранятся в хешах Redis: поле на каждое блюдо и поле-маркер
+# с мягким временем жизни списка. Хеш без маркера не считается закешированным списком.
+DISH_LIST_MARKER = '__list__'
+
+# Запись блюда в хеш списка блюд (или удаление из него, если запись пустая),
+# только если список уже закеширован целиком
+UPDATE_DISH_LIST_SCRIPT = """
+if redis.call('HEXISTS', KEYS[1], ARGV[1]) == 0 then
+    return 0
+end
+if ARGV[3] == '' then
+    return redis.call('HDEL', KEYS[1], ARGV[2])
+end
+return redis.call('HSET', KEYS[1], ARGV[2], ARGV[3])
+"""
+
+# Заголовок ответа постраничного чтения списка с курсором следующей страницы
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
+
+# Зависимости закешированных представлений от изменений сущностей:
+# (сущность, действие) -> (семейства ключей, которые нужно удалить, область поколения).
+# Представления (см. app.db.cache_keys):
+# - menus - список меню без счетчиков, зависит только от самих меню;
+# - menu - меню со счетчиками подменю и блюд;
+# - submenus - список подменю без счетчиков;
+# - submenu - подменю со счетчиком блюд;
+# - dishes - список блюд, обновляется на месте (см. CacheBatch.update_dish_list),
+#   поэтому в зависимостях не указан;
+# - dish - блюдо;
+# - full_menu - полное меню ресторана, зависит от всего.
+# При удалении меню или подменю увеличивается счетчик его поколений, что удаляет
+# все вложенные записи, в т.ч. блюда, ID которых неизвестны.
+CACHE_DEPENDENCIES: dict[tuple[str, str], tuple[tuple[str, ...], str | None]] = {
+    ('menu', 'create'): (('menus', 'full_menu'), None),
+    ('menu', 'update'): (('menus', 'menu', 'full_menu'), None),
+    ('menu', 'delete'): (('menus', 'full_menu'), 'menu'),
+    ('submenu', 'create'): (('menu', 'submenus', 'full_menu'), None),
+    ('submenu', 'update'): (('submenus', 'submenu', 'full_menu'), None),
+    ('submenu', 'delete'): (('menu', 'submenus', 'full_menu'), 'submenu'),
+    ('dish', 'create'): (('menu', 'submenu', 'full_menu'), None),
+    ('dish', 'update'): (('dish', 'full_menu'), None),
+    ('dish', 'delete'): (('menu', 'submenu', 'dish', 'full_menu'), None),
+}
+
+
+# Модели ответов эндпоинтов для семейств ключей (см. response_model в app/api/menus/routers)
+RESPONSE_ADAPTERS: dict[str, TypeAdapter] = {
+    'menus': TypeAdapter(list[MenuResponse]),
+    'menu': TypeAdapter(MenuCountResponse),
+    'submenus': TypeAdapter(list[SubmenuResponse]),
+    'submenu': TypeAdapter(SubmenuCountResponse),
+    'dishes': TypeAdapter(list[DishResponse]),
+    'dish': TypeAdapter(DishResponse),
+    'full_menu': TypeAdapter(list[MenuFullResponse]),
+}
+
+
+def render_response(link: str, value) -> bytes | Any:
+    """
+    Подготовка данных из БД к записи в кеш.
 
-from fastapi import Depends
+    Данные проходят ту же валидацию моделью ответа, что и в FastAPI, и записываются
+    в кеш готовым JSON-ответом (app.config.CACHE_RENDERED_RESPONSES) либо словарями
+    и списками, которые не зависят от классов моделей БД.
 
-from app.config import EXPIRATION
-from app.db.database_connect import get_redis
-from app.models.domain.menus_models import Dish, Menu, Submenu
+    JSON-документ, собранный БД (например, AsyncMenuRepository.get_full_restaurant_menu_json),
+    записывается без повторной валидации.
+
+    :param link: Ссылка на ключ кеша.
+    :param value: Данные из БД (строки запроса, объекты моделей или готовый JSON).
+    :return: Тело ответа в формате JSON или данные ответа.
+    """
+    if isinstance(value, bytes):
+        return value if CACHE_RENDERED_RESPONSES else json.loads(value)
+    adapter = RESPONSE_ADAPTERS[get_link_family(link)]
+    response = adapter.validate_python(value, from_attributes=True)
+    if CACHE_RENDERED_RESPONSES:
+        return adapter.dump_json(response)
+    return adapter.dump_python(response, mode='json')
+
+
+def get_next_cursor(page, limit: int) -> str | None:
+    """
+    Получение курсора следующей страницы списка.
+
+    Курсор - ID последнего элемента полной страницы, поэтому последняя страница
+    списка, в котором ровно кратное limit количество элементов, будет пустой.
+
+    :param page: Страница из кеша или из БД (Response с готовым JSON-ответом, словари или строки запроса).
+    :param limit: Количество элементов на странице.
+    :return: ID последнего элемента или None, если страница неполная.
+    """
+    items = json.loads(page.body) if isinstance(page, Response) else page
+    if len(items) < limit:
+        return None
+    last_item = items[-1]
+    return last_item['id'] if isinstance(last_item, dict) else last_item.id
+
+
+def make_etag(body: bytes) -> str:
+    """
+    Получение строгого ETag по содержимому ответа.
+
+    :param body: Тело ответа.
+    :return: ETag в кавычках.
+    """
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def make_response(value):
+    """
+    Подготовка данных из кеша к отдаче эндпоинтом.
+
+    Готовый JSON-ответ оборачивается в Response и отдается FastAPI без валидации
+    и повторного кодирования, остальные данные возвращаются без изменений.
+    """
+    if isinstance(value, bytes):
+        return Response(content=value, media_type='application/json')
+    return value
+
+
+class CacheStats:
+    """Счетчики попаданий и промахов кеша по семействам ключей."""
+
+    def __init__(self) -> None:
+        self.hits: Counter[str] = Counter()
+        self.misses: Counter[str] = Counter()
+
+    def record(self, link: str, hit: bool) -> None:
+        """Учет обращения к кешу по ссылке."""
+        (self.hits if hit else self.misses)[get_link_family(link)] += 1
+
+    def hit_ratios(self) -> dict[str, float]:
+        """Доля попаданий по семействам ключей, к которым были обращения."""
+        return {
+            family: self.hits[family] / (self.hits[family] + self.misses[family])
+            for family in sorted(self.hits.keys() | self.misses.keys())
+        }
+
+    def reset(self) -> None:
+        """Сброс счетчиков."""
+        self.hits.clear()
+        self.misses.clear()
+
+
+# Статистика обращений к кешу в данном воркере (см. CacheRepository.read_through)
+cache_stats = CacheStats()
+
+
+class CacheEntry(NamedTuple):
+    """Запись кеша с моментом истечения мягкого времени жизни (unix time)."""
+    value: Any
+    soft_expires_at: float
+
+
+@dataclass
+class CacheBatch:
+    """
+    Изменения кеша, выполняемые одной транзакцией Redis (см. CacheRepository.execute_batch).
+
+    Записи создаются по ключам текущих поколений, поэтому не стоит записывать значения
+    внутри меню или подменю, счетчик поколений которого увеличивается в том же пакете.
+    """
+    # Ссылки на записи, которые нужно удалить
+    delete_links: list[str] = field(default_factory=list)
+    # Счетчики поколений, которые нужно увеличить
+    generation_keys: list[str] = field(default_factory=list)
+    # Ссылка -> данные из БД для записи в кеш
+    set_values: dict[str, Any] = field(default_factory=dict)
+    # Изменения списков блюд: (menu_id, submenu_id, dish_id, блюдо или None, если блюдо удалено)
+    dish_list_updates: list[tuple[str, str, str, Any]] = field(default_factory=list)
+    # Ссылки на созданные сущности, записи о ненайденных сущностях которых нужно удалить
+    found_links: list[str] = field(default_factory=list)
+
+    def delete(self, *links: str) -> None:
+        """Удаление записей по ссылкам, вместе со списком инвалидируются все его страницы."""
+        self.delete_links.extend(links)
+        self.incr(*[get_list_generation_key(link) for link in links if get_link_family(link) in LIST_FAMILIES])
+
+    def incr(self, *generation_keys: str) -> None:
+        """Увеличение счетчиков поколений."""
+        self.generation_keys.extend(generation_keys)
+
+    def found(self, *links: str) -> None:
+        """
+        Удаление записей о ненайденных сущностях по ссылкам на созданные сущности.
+
+        Сервис удаляет эти записи до ответа клиенту, но чтение, начатое до создания
+        сущности, может записать ответ 404 уже после этого. Повторное удаление
+        в фоновой задаче кеша ограничивает такую запись временем до ее выполнения.
+        """
+        self.found_links.extend(links)
+
+    def set(self, link: str, value) -> None:
+        """Запись данных из БД по ссылке."""
+        self.set_values[link] = value
+
+    def update_dish_list(self,
+                         menu_id: str,
+                         submenu_id: str,
+                         dish_id: str,
+                         dish_info: DishRow | None = None) -> None:
+        """
+        Изменение одного блюда в закешированном списке блюд подменю.
+
+        Поле блюда записывается (HSET) или удаляется (HDEL) Lua-скриптом,
+        только если список закеширован целиком, поэтому изменение блюда
+        не требует перестроения списка. Страницы списка блюд инвалидируются.
+        """
+        self.dish_list_updates.append((menu_id, submenu_id, dish_id, dish_info))
+        self.incr(get_list_generation_key(dishes_link(menu_id, submenu_id)))
 
 
 class CacheRepository:
@@ -15,20 +277,456 @@ class CacheRepository:
     def __init__(self,
                  redis_cacher=Depends(get_redis)) -> None:
         self.redis_cacher = redis_cacher
+        # Необязательный локальный уровень кеша воркера (app.config.LOCAL_CACHE_ENABLED)
+        self.local_cacher: LocalCache | None = local_cache
+        # Формат записей кеша в Redis (app.config.CACHE_CODEC)
+        self.serializer = CacheSerializer()
+        # Ссылки, для которых в рамках запроса были получены устаревшие записи
+        self.stale_links: set[str] = set()
+        # Есть ли отдельная реплика для чтения, отставание которой учитывается при загрузке в кеш
+        self.read_replica = has_read_replica()
+
+    async def get_generations(self,
+                              generation_keys: list[str]) -> dict[str, int]:
+        """
+        Получение номеров поколений.
+
+        Поколения, которых нет в локальном кеше, читаются из Redis одним запросом MGET.
+
+        :param generation_keys: Ключи счетчиков поколений.
+        :return: Словарь ключ счетчика -> номер поколения.
+        """
+        generations = {}
+        if self.local_cacher:
+            for key in generation_keys:
+                generation = self.local_cacher.get(key)
+                if generation is not None:
+                    generations[key] = generation
+        missing_keys = [key for key in generation_keys if key not in generations]
+        if missing_keys:
+            for key, generation in zip(missing_keys,
+                                       await self.redis_cacher.mget(missing_keys)):
+                generations[key] = int(generation or 0)
+                if self.local_cacher:
+                    self.local_cacher.set(key, generations[key], size=len(key))
+        return generations
+
+    async def get_keys(self,
+                       *links: str) -> list[str]:
+        """
+        Получение ключей кеша для ссылок с учетом текущих поколений.
+
+        Номера поколений для всех ссылок читаются одним запросом.
+
+        :param links: Ссылки на ключи кеша.
+        :return: Ключи вида '{поколение}:{ссылка}', '{поколение}:{поколение меню}:{ссылка}'
+            или '{поколение}:{поколение меню}:{поколение подменю}:{ссылка}' в порядке ссылок.
+        """
+        links_generation_keys = [get_link_generation_keys(link) for link in links]
+        generations = await self.get_generations(
+            list({key for generation_keys in links_generation_keys for key in generation_keys})
+        )
+        return [
+            ':'.join(str(generations[key]) for key in generation_keys) + f':{link}'
+            for link, generation_keys in zip(links, links_generation_keys)
+        ]
+
+    async def get_cache(self,
+                        link: str):
+        """
+        Получение значения из кеша по ссылке.
+
+        :param link: Ссылка на ключ кеша.
+        :return: Десериализованное значение или None, если кеша нет.
+        """
+        value, = await self.get_many_cache(link)
+        return value
+
+    async def get_many_cache(self,
+                             *links: str) -> list[Any]:
+        """
+        Получение значений из кеша по нескольким ссылкам.
+
+        Сначала значения ищутся в локальном кеше воркера, остальные читаются из Redis
+        одним запросом MGET. Если мягкое время жизни записи истекло, значение
+        все равно возвращается, а ссылка добавляется в stale_links для фонового обновления.
+
+        :param links: Ссылки на ключи кеша.
+        :return: Десериализованные значения (None, если кеша нет) в порядке ссылок.
+        """
+        keys = await self.get_keys(*links)
+        entries: list[CacheEntry | None] = [
+            self.local_cacher.get(key) if self.local_cacher else None for key in keys
+        ]
+        missing = [index for index, entry in enumerate(entries) if entry is None]
+        if missing:
+            caches = await self.redis_cacher.mget([keys[index] for index in missing])
+            for index, cache in zip(missing, caches):
+                # Записи неизвестного формата (например, от предыдущей версии приложения)
+                loaded = self.serializer.loads(cache) if cache else None
+                if loaded is None:
+                    continue
+                entries[index] = CacheEntry(*loaded)
+                if self.local_cacher:
+                    self.local_cacher.set(keys[index], entries[index], size=len(cache))
+        values: list[Any] = []
+        now = time.time()
+        for link, entry in zip(links, entries):
+            if entry is None:
+                values.append(None)
+                continue
+            if entry.soft_expires_at < now:
+                self.stale_links.add(link)
+            values.append(entry.value)
+        return values
+
+    async def set_cache(self,
+                        link: str,
+                        value) -> None:
+        """
+        Запись значения в кеш по ссылке.
+
+        Мягкое и жесткое время жизни записи задаются для семейства ключа
+        в app.config.CACHE_TTL, запись удаляется из Redis по жесткому времени.
+
+        Если включен app.config.CACHE_RENDERED_RESPONSES, в кеш записывается
+        готовый JSON-ответ эндпоинта.
+
+        :param link: Ссылка на ключ кеша.
+        :param value: Данные из БД, сериализуются app.db.serializers.CacheSerializer.
+        :return: None
+        """
+        await self.execute_batch(CacheBatch(set_values={link: value}))
+
+    async def read_through(self,
+                           link: str,
+                           get_cache: Callable[[], Awaitable[Any]],
+                           load: Callable[[], Awaitable[Any]],
+                           background_tasks: BackgroundTasks) -> Any:
+        """
+        Получение данных из кеша, а при промахе - из БД.
+
+        Если запись устарела (истекло мягкое время жизни), сразу возвращается устаревшее
+        значение, а обновление из БД выполняется фоновой задачей. При промахе данные
+        загружаются с объединением одновременных запросов (single flight).
+        Если сущность по ссылке недавно не была найдена, сразу возвращается 404 без запроса в БД.
+        Готовые JSON-ответы из кеша возвращаются в виде Response.
+
+        :param link: Ссылка на ключ кеша.
+        :param get_cache: Получение данных из кеша (get_*_cache).
+        :param load: Загрузка данных из БД с записью в кеш (через set_*_cache).
+        :param background_tasks: Фоновые задачи запроса.
+        :return: Данные из кеша или из БД.
+        """
+        cache = await get_cache()
+        cache_stats.record(link, hit=cache is not None)
+        if cache is not None:
+            if link in self.stale_links:
+                background_tasks.add_task(self.single_flight, link, load, get_cache)
+            return make_response(cache)
+        not_found = await self.get_not_found_cache(link)
+        if not_found is not None:
+            raise HTTPException(status.HTTP_404_NOT_FOUND, detail=not_found)
+        return make_response(await self.single_flight(link, partial(self.load_or_not_found, link, load), get_cache))
+
+    async def read_page(self,
+                        link: str,
+                        limit: int,
+                        load: Callable[[], Awaitable[Any]],
+                        response: Response,
+                        background_tasks: BackgroundTasks) -> Any:
+        """
+        Получение страницы списка из кеша, а при промахе - из БД (см. read_through).
+
+        Курсор следующей страницы передается в заголовке NEXT_CURSOR_HEADER.
+
+        :param link: Ссылка на страницу списка (app.db.cache_keys.page_link).
+        :param limit: Количество элементов на странице.
+        :param load: Загрузка страницы из БД с записью в кеш (через set_cache).
+        :param response: Ответ эндпоинта, в который пишется заголовок, если страница не готовый Response.
+        :param background_tasks: Фоновые задачи запроса.
+        :return: Страница из кеша или из БД.
+        """
+        page = await self.read_through(
+            link=link,
+            get_cache=partial(self.get_cache, link),
+            load=load,
+            background_tasks=background_tasks
+        )
+        next_cursor = get_next_cursor(page, limit)
+        if next_cursor is not None:
+            (page if isinstance(page, Response) else response).headers[NEXT_CURSOR_HEADER] = next_cursor
+        return page
+
+    async def load_or_not_found(self,
+                                link: str,
+                                load: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Загрузка данных из БД с записью в кеш ответа 404, если сущность не найдена.
+
+        :param link: Ссылка на ключ кеша.
+        :param load: Загрузка данных из БД с записью в кеш.
+        :return: Загруженные данные.
+        """
+        try:
+            return await load()
+        except HTTPException as error:
+            if error.status_code == status.HTTP_404_NOT_FOUND:
+                await self.set_not_found_cache(link, error.detail)
+            raise
+
+    async def get_etag(self,
+                       link: str) -> str | None:
+        """
+        Получение ETag закешированного готового JSON-ответа без чтения самой записи.
+
+        :param link: Ссылка на ключ кеша.
+        :return: ETag или None, если актуального готового ответа в кеше нет.
+        """
+        key, = await self.get_keys(link)
+        etag = await self.redis_cacher.get(get_etag_key(key))
+        return etag.decode() if etag is not None else None
+
+    async def get_not_found_cache(self,
+                                  link: str) -> str | None:
+        """
+        Получение записи о том, что сущность по ссылке не найдена.
+
+        :param link: Ссылка на ключ кеша.
+        :return: Текст ответа 404 или None, если записи нет.
+        """
+        detail = await self.redis_cacher.get(get_not_found_key(link))
+        return detail.decode() if detail is not None else None
+
+    async def set_not_found_cache(self,
+                                  link: str,
+                                  detail: str) -> None:
+        """
+        Запись о том, что сущность по ссылке не найдена, на CACHE_NOT_FOUND_TTL секунд.
+
+        :param link: Ссылка на ключ кеша.
+        :param detail: Текст ответа 404.
+        :return: None
+        """
+        await self.redis_cacher.set(get_not_found_key(link), detail, ex=CACHE_NOT_FOUND_TTL)
+
+    async def delete_not_found_cache(self,
+                                     *links: str) -> None:
+        """
+        Удаление записей о ненайденных сущностях.
+
+        Вызывается сервисами при создании сущности до ответа клиенту, чтобы
+        созданная сущность не считалась ненайденной.
+        Фоновые задачи кеша удаляют эти записи повторно (см. CacheBatch.found).
 
-    async def delete_cache_by_mask(self,
-                                   link: str) -> None:
+        :param links: Ссылки на созданные сущности.
+        :return: None
+        """
+        async with self.redis_cacher.pipeline(transaction=True) as pipe:
+            pipe.delete(*(get_not_found_key(link) for link in links))
+            self.mark_recent_writes(pipe, links)
+            await pipe.execute()
+
+    def mark_recent_writes(self,
+                           pipe,
+                           keys: Iterable[str]) -> None:
+        """
+        Добавление в транзакцию отметок о недавнем изменении ссылок и счетчиков поколений.
+
+        Отметки нужны только при реплике для чтения и живут DB_REPLICA_LAG_TTL секунд.
+
+        :param pipe: Транзакция Redis.
+        :param keys: Измененные ссылки и счетчики поколений.
+        :return: None
+        """
+        if self.read_replica:
+            for key in keys:
+                pipe.set(get_recent_write_key(key), 1, ex=DB_REPLICA_LAG_TTL)
+
+    async def recently_written(self,
+                               link: str) -> bool:
+        """
+        Проверка, изменялись ли данные по ссылке за последние DB_REPLICA_LAG_TTL секунд.
+
+        Учитываются отметки самой ссылки и счетчиков поколений, которыми определяется ее ключ.
+
+        :param link: Ссылка на ключ кеша.
+        :return: True, если реплика может еще не содержать изменение.
+        """
+        if not self.read_replica:
+            return False
+        marks = [get_recent_write_key(key) for key in (link, *get_link_generation_keys(link))]
+        return await self.redis_cacher.exists(*marks) > 0
+
+    async def load_for_cache(self,
+                             link: str,
+                             load: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Загрузка данных для записи в кеш.
+
+        Данные читаются с реплики, а если они недавно изменялись (реплика может отставать) -
+        с основной БД, чтобы устаревшие данные не попали в кеш.
+
+        :param link: Ссылка на ключ кеша.
+        :param load: Загрузка данных из БД с записью в кеш.
+        :return: Загруженные данные.
+        """
+        if await self.recently_written(link):
+            with primary_reads():
+                return await load()
+        return await load()
+
+    async def single_flight(self,
+                            link: str,
+                            load: Callable[[], Awaitable[Any]],
+                            get_cache: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Загрузка данных при промахе кеша с объединением одновременных запросов.
+
+        Из всех запросов за одной ссылкой (в том числе из разных воркеров) в БД
+        обращается только один, остальные получают записанное им в кеш значение.
+        Недавно измененные данные читаются с основной БД, а не с реплики (см. load_for_cache).
+
+        :param link: Ссылка на ключ кеша.
+        :param load: Загрузка данных из БД с записью в кеш.
+        :param get_cache: Получение данных из кеша.
+        :return: Загруженные данные.
+        """
+        return await single_flight(self.redis_cacher, link, partial(self.load_for_cache, link, load), get_cache)
+
+    async def invalidate(self,
+                         links: list[str] | None = None,
+                         menu_ids: list[str] | None = None,
+                         submenu_ids: list[str] | None = None) -> None:
+        """
+        Инвалидация кеша.
+
+        Записи по ссылкам удаляются напрямую, а для меню и подменю увеличивается счетчик поколений,
+        что за O(1) инвалидирует все вложенные записи без их перебора и удаления.
+        Удаление и увеличение счетчиков выполняются одной транзакцией.
+
+        :param links: Ссылки на ключи, которые нужно удалить.
+        :param menu_ids: ID меню, весь кеш которых нужно инвалидировать.
+        :param submenu_ids: ID подменю, весь кеш которых нужно инвалидировать.
+        :return: None
+        """
+        batch = CacheBatch()
+        batch.delete(*links or [])
+        batch.incr(*[get_menu_generation_key(menu_id) for menu_id in menu_ids or []])
+        batch.incr(*[get_submenu_generation_key(submenu_id) for submenu_id in submenu_ids or []])
+        await self.execute_batch(batch)
+
+    async def invalidate_dependents(self,
+                                    entity: str,
+                                    action: str,
+                                    **ids: str) -> None:
         """
-        Удаление записей из кеша по маске.
+        Инвалидация представлений, зависящих от изменения сущности (см. CACHE_DEPENDENCIES).
 
-        Принимается маска ключа кеша, к ней добавляется мета-символ '*' и происходит
-        удаление всех ключей из кеша, которые подходят под данную маску
+        :param entity: Сущность: 'menu', 'submenu' или 'dish'.
+        :param action: Действие: 'create', 'update' или 'delete'.
+        :param ids: ID сущности и ее родителей: menu_id, submenu_id, dish_id.
+        :return: None
+        """
+        batch = CacheBatch()
+        self.add_dependents(batch, entity, action, **ids)
+        await self.execute_batch(batch)
+
+    def add_dependents(self,
+                       batch: CacheBatch,
+                       entity: str,
+                       action: str,
+                       **ids: str) -> None:
+        """
+        Добавление в пакет инвалидации представлений, зависящих от изменения сущности.
 
-        :param link: Маска ключа кеша.
+        :param batch: Пакет изменений кеша.
+        :param entity: Сущность: 'menu', 'submenu' или 'dish'.
+        :param action: Действие: 'create', 'update' или 'delete'.
+        :param ids: ID сущности и ее родителей: menu_id, submenu_id, dish_id.
+        :return: None
+        """
+        families, scope = CACHE_DEPENDENCIES[entity, action]
+        batch.delete(*[build_link(family, **ids) for family in families])
+        if scope == 'menu':
+            batch.incr(get_menu_generation_key(ids['menu_id']))
+        elif scope == 'submenu':
+            batch.incr(get_submenu_generation_key(ids['submenu_id']))
+
+    async def execute_batch(self,
+                            batch: CacheBatch) -> None:
+        """
+        Выполнение пакета изменений кеша.
+
+        Номера поколений для всех ключей пакета читаются одним запросом (или берутся
+        из локального кеша), затем все удаления, увеличения счетчиков, записи и изменения
+        списков блюд выполняются одной транзакцией MULTI. Если включен локальный кеш,
+        в той же транзакции публикуется сообщение с инвалидированными и перезаписанными
+        ключами, по которому остальные воркеры очищают свои локальные кеши.
+        Повторяющиеся удаления и увеличения счетчиков (например, от пакетного изменения
+        сущностей) выполняются один раз.
+        В той же транзакции удаляются записи о ненайденных созданных сущностях (см. CacheBatch.found).
+        Для готовых JSON-ответов рядом с записью хранится ETag (см. get_etag), удаляемый вместе с ней.
+        При реплике для чтения измененные ссылки и счетчики поколений отмечаются как недавно
+        измененные, и их загрузки в кеш читают с основной БД (см. load_for_cache).
+
+        :param batch: Пакет изменений кеша.
         :return: None
         """
-        for key in await self.redis_cacher.keys(link + '*'):
-            await self.redis_cacher.delete(key)
+        delete_links = list(dict.fromkeys(batch.delete_links))
+        generation_keys = list(dict.fromkeys(batch.generation_keys))
+        set_links = list(batch.set_values)
+        keys = await self.get_keys(
+            *delete_links,
+            *set_links,
+            *[dishes_link(menu_id, submenu_id) for menu_id, submenu_id, _, _ in batch.dish_list_updates]
+        )
+        delete_keys = keys[:len(delete_links)]
+        set_keys = keys[len(delete_keys):len(delete_keys) + len(set_links)]
+        dish_list_keys = keys[len(delete_keys) + len(set_links):]
+        now = time.time()
+        local_entries = {}
+        async with self.redis_cacher.pipeline(transaction=True) as pipe:
+            if delete_keys:
+                pipe.delete(*delete_keys, *(get_etag_key(key) for key in delete_keys))
+            if batch.found_links:
+                pipe.delete(*(get_not_found_key(link) for link in dict.fromkeys(batch.found_links)))
+            for generation_key in generation_keys:
+                pipe.incr(generation_key)
+            for key, link in zip(set_keys, set_links):
+                soft_ttl, hard_ttl = CACHE_TTL[get_link_family(link)]
+                entry = CacheEntry(render_response(link, batch.set_values[link]), now + soft_ttl)
+                cache = self.serializer.dumps(*entry)
+                pipe.set(key, cache, ex=hard_ttl)
+                if isinstance(entry.value, bytes):
+                    # ETag живет до мягкого истечения записи: устаревшую запись обновляет приложение
+                    pipe.set(get_etag_key(key), make_etag(entry.value), ex=soft_ttl)
+                else:
+                    pipe.delete(get_etag_key(key))
+                local_entries[key] = (entry, len(cache))
+            for key, (menu_id, submenu_id, dish_id, dish_info) in zip(dish_list_keys, batch.dish_list_updates):
+                cache = b''
+                if dish_info is not None:
+                    soft_ttl, _ = CACHE_TTL['dish']
+                    cache = self.serializer.dumps(
+                        render_response(dish_link(menu_id, submenu_id, dish_id), dish_info), now + soft_ttl
+                    )
+                pipe.eval(UPDATE_DISH_LIST_SCRIPT, 1, key, DISH_LIST_MARKER, dish_id, cache)
+            self.mark_recent_writes(pipe, dict.fromkeys([
+                *delete_links,
+                *generation_keys,
+                *batch.found_links,
+                *[dishes_link(menu_id, submenu_id) for menu_id, submenu_id, _, _ in batch.dish_list_updates],
+            ]))
+            # Перезаписанные ключи тоже публикуются: у других воркеров может быть их прежнее значение
+            invalidated_keys = delete_keys + generation_keys + set_keys + dish_list_keys
+            if self.local_cacher and invalidated_keys:
+                pipe.publish(CACHE_INVALIDATION_CHANNEL, json.dumps(invalidated_keys))
+            await pipe.execute()
+        if self.local_cacher:
+            self.local_cacher.delete(*invalidated_keys)
+            for key, (entry, size) in local_entries.items():
+                self.local_cacher.set(key, entry, size=size)
 
     async def delete_list_cache(self,
                                 link: str) -> None:
@@ -38,26 +736,20 @@ class CacheRepository:
         :param link: Ссылка на ключ кеша, который нужно удалить.
         :return: None
         """
-        await self.redis_cacher.delete(link)
+        await self.invalidate(links=[link])
 
-    async def delete_cache_except_dish_keys(self) -> None:
-        """Удаление всех записей из кеша, кроме ключей для конкретных блюд."""
-        all_keys = await self.redis_cacher.keys('*')
-
-        dish_keys_to_keep = set()
-        for key in all_keys:
-            key_str = key.decode('utf-8')
-            if '/dishes/' in key_str:
-                dish_keys_to_keep.add(key)
-
-        keys_to_delete = [key for key in all_keys if key not in dish_keys_to_keep]
+    async def delete_all_cache(self) -> None:
+        """
+        Инвалидация всего кеша.
 
-        for key in keys_to_delete:
-            await self.redis_cacher.delete(key)
+        Увеличивается глобальный счетчик поколений, например после массовой
+        синхронизации данных.
+        """
+        await self.execute_batch(CacheBatch(generation_keys=[GLOBAL_GENERATION_KEY]))
 
     async def set_all_dishes_cache(self,
                                    submenu_id: str,
-                                   dish_list: list[Dish],
+                                   dish_list: Sequence[DishRow],
                                    menu_id) -> None:
         """
         Запись всех блюд в кеш.
@@ -65,20 +757,36 @@ class CacheRepository:
         Ключ в Redis будет представлен в виде строки-ссылки на список всех блюд,
         сформированной на основе указанных menu_id и submenu_id.
 
-        Значение в кеше будет представлять список блюд в формате pickle.
+        Список хранится в хеше Redis: каждое блюдо - отдельное поле (см. app.db.serializers),
+        поле DISH_LIST_MARKER означает, что список закеширован целиком (в т.ч. пустой).
+        Хеш перезаписывается одной транзакцией, в которой, если включен локальный кеш,
+        публикуется ключ списка, чтобы остальные воркеры удалили прежний список из локальных кешей.
 
-        Время жизни данного кеша ограничено переменной app.config.EXPIRATION.
+        Время жизни данного кеша задается в app.config.CACHE_TTL.
 
         :param menu_id: ID меню у подменю для данного блюда.
         :param submenu_id: Идентификатор подменю.
         :param dish_list: Список блюд для сохранения в кеш.
         :return: None.
         """
-        await self.redis_cacher.set(
-            f'/menus/{menu_id}/submenus/{submenu_id}/dishes',
-            pickle.dumps(dish_list),
-            ex=EXPIRATION
-        )
+        link = dishes_link(menu_id, submenu_id)
+        key, = await self.get_keys(link)
+        soft_ttl, hard_ttl = CACHE_TTL['dishes']
+        soft_expires_at = time.time() + soft_ttl
+        fields = {DISH_LIST_MARKER: self.serializer.dumps(None, soft_expires_at)}
+        for dish in dish_list:
+            fields[dish.id] = self.serializer.dumps(
+                render_response(dish_link(menu_id, submenu_id, dish.id), dish), soft_expires_at
+            )
+        async with self.redis_cacher.pipeline(transaction=True) as pipe:
+            pipe.delete(key)
+            pipe.hset(key, mapping=fields)
+            pipe.expire(key, hard_ttl)
+            if self.local_cacher:
+                pipe.publish(CACHE_INVALIDATION_CHANNEL, json.dumps([key]))
+            await pipe.execute()
+        if self.local_cacher:
+            self.local_cacher.set(key, self.load_dish_list(fields), size=sum(map(len, fields.values())))
 
     async def get_all_dishes_cache(self,
                                    menu_id: str,
@@ -86,25 +794,68 @@ class CacheRepository:
         """
         Получение всех блюд из кеша.
 
-        Из Redis извлекается сериализованный json объект данных.
-        Для получения оригинальных данных, этот json объект десериализуется.
+        Из Redis извлекаются все поля хеша списка блюд (HGETALL),
+        каждое поле десериализуется отдельно.
 
-        :param menu_id: Идентификатор меню.
-        :param submenu_id: Идентификатор подменю.
+        :param menu_id: ID меню.
+        :param submenu_id: ID подменю.
         :return: Список блюд из кеша, либо None, если кеш не существует.
         """
-        cache = await self.redis_cacher.get(
-            f'/menus/{menu_id}/submenus/{submenu_id}/dishes'
+        link = dishes_link(menu_id, submenu_id)
+        key, = await self.get_keys(link)
+        entry = self.local_cacher.get(key) if self.local_cacher else None
+        if entry is None:
+            fields = {
+                field.decode(): value
+                for field, value in (await self.redis_cacher.hgetall(key)).items()
+            }
+            entry = self.load_dish_list(fields)
+            if entry is None:
+                return None
+            if self.local_cacher:
+                self.local_cacher.set(key, entry, size=sum(map(len, fields.values())))
+        if entry.soft_expires_at < time.time():
+            self.stale_links.add(link)
+        return entry.value
+
+    def load_dish_list(self,
+                       fields: dict[str, bytes]) -> CacheEntry | None:
+        """
+        Сборка списка блюд из полей хеша.
+
+        Блюда упорядочиваются по ID, как в БД и на страницах списка: порядок полей
+        HGETALL не совпадает с порядком записи, когда Redis хранит большой хеш
+        хеш-таблицей, а не listpack. Если все блюда записаны готовыми JSON-ответами,
+        из них собирается JSON-ответ со списком без повторного кодирования.
+
+        :param fields: Поля хеша списка блюд.
+        :return: Список блюд с мягким временем истечения списка или None,
+            если список не закеширован целиком либо записан в неизвестном формате.
+        """
+        marker = fields.get(DISH_LIST_MARKER)
+        loaded = self.serializer.loads(marker) if marker else None
+        if loaded is None:
+            return None
+        _, soft_expires_at = loaded
+        dishes = []
+        for dish_id, value in sorted(fields.items()):
+            if dish_id == DISH_LIST_MARKER:
+                continue
+            loaded = self.serializer.loads(value)
+            if loaded is None:
+                return None
+            dishes.append(loaded[0])
+        if all(isinstance(dish, bytes) for dish in dishes):
+            return CacheEntry(b'[' + b','.join(dishes) + b']', soft_expires_at)
+        return CacheEntry(
+            [json.loads(dish) if isinstance(dish, bytes) else dish for dish in dishes],
+            soft_expires_at
         )
-        if cache:
-            dish_list = pickle.loads(cache)
-            return dish_list
-        return None
 
     async def set_dish_cache(self,
                              menu_id: str,
                              submenu_id: str,
-                             dish_info: Dish) -> None:
+                             dish_info: DishRow) -> None:
         """
         Запись информации о блюде в кеш.
 
@@ -113,10 +864,9 @@ class CacheRepository:
         :param dish_info: Информация о блюде для записи в кеш.
         :return: None
         """
-        await self.redis_cacher.set(
-            f'/menus/{menu_id}/submenus/{submenu_id}/dishes/{dish_info.id}',
-            pickle.dumps(dish_info),
-            ex=EXPIRATION
+        await self.set_cache(
+            dish_link(menu_id, submenu_id, dish_info.id),
+            dish_info
         )
 
     async def get_dish_cache(self,
@@ -131,41 +881,38 @@ class CacheRepository:
         :param dish_id: ID блюда.
         :return: Информация о блюде или None, если не найдено в кеше.
         """
-        cache = await self.redis_cacher.get(
-            f'/menus/{menu_id}/submenus/{submenu_id}/dishes/{dish_id}',
+        return await self.get_cache(
+            dish_link(menu_id, submenu_id, dish_id),
         )
-        if cache:
-            return pickle.loads(cache)
-        return None
 
     async def create_new_dish_cache(self,
-                                    dish_info: Dish,
+                                    dish_info: DishRow,
                                     submenu_id: str,
                                     menu_id: str) -> None:
         """
         Создание новой записи о блюде в кеше.
 
-        Если в БД происходит внесение изменений (в т.ч добавление нового блюда,
-        изменение существующего блюда), то должно происходить обновление кеша
-        для всех блюд, не задевая кеш для конкретных блюд
+        Новое блюдо меняет счетчики блюд в подменю и меню, поэтому инвалидируются
+        записи со счетчиками и полное меню ресторана (см. CACHE_DEPENDENCIES).
+        Кеш других подменю не затрагивается.
 
-        Происходит удаление кеша для списка всех блюд, и создается кеш для создаваемого
-        блюда.
+        Затем создается кеш для создаваемого блюда, и блюдо добавляется
+        в закешированный список блюд подменю.
 
         :param menu_id: ID меню у подменю для данного блюда
         :param dish_info: Информация о создаваемом блюде.
         :param submenu_id: ID подменю.
         :return: None
         """
-        await self.delete_cache_except_dish_keys()
-        await self.set_dish_cache(
-            menu_id=menu_id,
-            submenu_id=submenu_id,
-            dish_info=dish_info
-        )
+        batch = CacheBatch()
+        self.add_dependents(batch, 'dish', 'create', menu_id=menu_id, submenu_id=submenu_id)
+        batch.found(dish_link(menu_id, submenu_id, dish_info.id))
+        batch.set(dish_link(menu_id, submenu_id, dish_info.id), dish_info)
+        batch.update_dish_list(menu_id, submenu_id, dish_info.id, dish_info)
+        await self.execute_batch(batch)
 
     async def update_dish_cache(self,
-                                dish_info: Dish,
+                                dish_info: DishRow,
                                 menu_id: str,
                                 submenu_id: str) -> None:
         """
@@ -175,29 +922,22 @@ class CacheRepository:
         то должно происходить обновление кеша для данного конкретного блюда
 
         Происходит удаление кеша для данного блюда, повторное создание кеша для данного
-        блюда.
+        блюда и замена блюда в закешированном списке блюд.
 
         :param dish_info: Информация о блюде.
         :param menu_id: ID меню.
         :param submenu_id: ID подменю.
         :return: None
         """
-        # Инвалидируем кеш для определенного блюда, которое изменилось
-        await self.delete_cache_by_mask(
-            link=f'/menus/{menu_id}/submenus/{submenu_id}/dishes/{dish_info.id}'
-        )
-        # Удаляем кеш для списка всех блюд, так как одно блюдо изменилось,
-        # кеш неактуален становится
-        await self.delete_cache_by_mask(
-            link=f'/menus/{menu_id}/submenus/{submenu_id}/dishes/'
-        )
-        await self.set_dish_cache(
-            dish_info=dish_info,
-            submenu_id=submenu_id,
-            menu_id=menu_id,
+        # Инвалидируем кеш для определенного блюда, которое изменилось.
+        # Список блюд обновляется на месте, счетчики при этом не меняются.
+        batch = CacheBatch()
+        self.add_dependents(
+            batch, 'dish', 'update', menu_id=menu_id, submenu_id=submenu_id, dish_id=dish_info.id
         )
-
-        await self.delete_full_base_cache()
+        batch.set(dish_link(menu_id, submenu_id, dish_info.id), dish_info)
+        batch.update_dish_list(menu_id, submenu_id, dish_info.id, dish_info)
+        await self.execute_batch(batch)
 
     async def delete_dish_cache(self,
                                 menu_id: str,
@@ -206,58 +946,56 @@ class CacheRepository:
         """
         Удаление кеша в связи с удалением блюда из БД
 
+        Удаляются кеш блюда и записи со счетчиками, блюдо удаляется
+        из закешированного списка блюд подменю.
+
         :param menu_id: ID меню
         :param submenu_id: ID подменю
         :param dish_id: ID блюда
         :return: None
         """
-        await self.delete_cache_by_mask(
-            link=f'/menus/{menu_id}/submenus/{submenu_id}/dishes/{dish_id}'
-        )
-        await self.delete_cache_by_mask(
-            link=f'/menus/{menu_id}/'
+        batch = CacheBatch()
+        self.add_dependents(
+            batch, 'dish', 'delete', menu_id=menu_id, submenu_id=submenu_id, dish_id=dish_id
         )
-        await self.delete_full_base_cache()
+        batch.update_dish_list(menu_id, submenu_id, dish_id)
+        await self.execute_batch(batch)
 
     async def get_all_submenus_cache(self,
                                      menu_id: str) -> list[Submenu] | None:
         """
         Получение всех подменю из кеша.
 
-        Из Redis извлекается сериализованный pickle объект данных.
-        Для получения оригинальных данных, этот pickle объект десериализуется.
+        Из Redis извлекается сериализованный объект данных.
+        Для получения оригинальных данных, этот объект десериализуется.
 
         :param menu_id: Идентификатор меню.
         :return: Список подменю из кеша, либо None, если кеш не существует.
         """
-        cache = await self.redis_cacher.get(
-            f'/menus/{menu_id}/submenus/'
+        return await self.get_cache(
+            submenus_link(menu_id)
         )
-        if cache:
-            return pickle.loads(cache)
-        return None
 
     async def set_all_submenus_cache(self,
                                      menu_id: str,
-                                     submenu_list: list[Submenu]) -> None:
+                                     submenu_list: Sequence[SubmenuCountRow]) -> None:
         """
         Запись всех подменю в кеш.
 
         Ключ в Redis будет представлен в виде строки-ссылки на список всех блюд,
         сформированной на основе указанного menu_id.
 
-        Значение в кеше будет представлять список блюд в формате pickle.
+        Значение в кеше будет представлять список блюд (см. app.db.serializers).
 
-        Время жизни данного кеша ограничено переменной app.config.EXPIRATION.
+        Время жизни данного кеша задается в app.config.CACHE_TTL.
 
         :param menu_id: ID меню для данного подменю .
         :param submenu_list: Список подменю для сохранения в кеш.
         :return: None.
         """
-        await self.redis_cacher.set(
-            f'/menus/{menu_id}/submenus',
-            pickle.dumps(submenu_list),
-            ex=EXPIRATION
+        await self.set_cache(
+            submenus_link(menu_id),
+            submenu_list
         )
 
     async def get_submenu_cache(self,
@@ -270,17 +1008,14 @@ class CacheRepository:
         :param submenu_id: ID получаемого подменю.
         :return: Информация о подменю или None, если нет в кеше.
         """
-        cache = await self.redis_cacher.get(
-            f'/menus/{menu_id}/submenus/{submenu_id}'
+        return await self.get_cache(
+            submenu_link(menu_id, submenu_id)
         )
-        if cache:
-            return pickle.loads(cache)
-        return None
 
     async def set_submenu_cache(self,
                                 menu_id: str,
                                 submenu_id: str,
-                                submenu_info: Submenu) -> None:
+                                submenu_info: SubmenuCountRow) -> None:
         """
         Запись информации о подменю в кеш
 
@@ -289,40 +1024,34 @@ class CacheRepository:
         :param submenu_info: Информация о подменю.
         :return: None.
         """
-        await self.redis_cacher.set(
-            f'/menus/{menu_id}/submenus/{submenu_id}',
-            pickle.dumps(submenu_info),
-            ex=EXPIRATION
+        await self.set_cache(
+            submenu_link(menu_id, submenu_id),
+            submenu_info
         )
 
     async def create_new_submenu_cache(self,
-                                       submenu_info: Submenu,
                                        menu_id: str,
                                        submenu_id: str) -> None:
         """
         Создание новой записи о подменю в кеше.
 
-        Если в БД происходит внесение изменений (в т.ч добавление нового подменю),
-        то должно происходить обновление кеша для всех подменю, не задевая кеш для
-        конкретных блюд
+        Новое подменю меняет список подменю и счетчики меню, поэтому инвалидируются
+        список подменю, меню со счетчиками и полное меню ресторана (см. CACHE_DEPENDENCIES).
+        Кеш других подменю и меню не затрагивается.
 
-        Происходит очистка кеша, который становится неактуальным, и создается кеш для создаваемого
-        подменю.
+        Кеш самого подменю не создается: в ответе эндпоинта подменю есть счетчик блюд,
+        которого нет у созданного объекта. Подменю будет закешировано при первом чтении.
 
         :param submenu_id: ID подменю.
         :param menu_id: ID меню у данного подменю.
-        :param submenu_info: Информация о создаваемом подменю.
         :return: None
         """
-        await self.delete_cache_except_dish_keys()
-        await self.set_submenu_cache(
-            submenu_info=submenu_info,
-            menu_id=menu_id,
-            submenu_id=submenu_id
-        )
+        batch = CacheBatch()
+        self.add_dependents(batch, 'submenu', 'create', menu_id=menu_id, submenu_id=submenu_id)
+        batch.found(submenu_link(menu_id, submenu_id))
+        await self.execute_batch(batch)
 
     async def update_submenu_cache(self,
-                                   submenu_info,
                                    menu_id: str,
                                    submenu_id: str) -> None:
         """
@@ -331,82 +1060,61 @@ class CacheRepository:
         Если в БД происходит внесение изменений (в т.ч изменение существующего подменю),
         то должно происходить обновление кеша для данного конкретного подменю
 
-        Происходит удаление кеша для данного подменю, повторное создание кеша для данного
-        подменю.
+        Происходит удаление кеша для данного подменю и списка подменю. Новый кеш подменю
+        создается при первом чтении, так как у измененного объекта нет счетчика блюд.
 
         :param submenu_id: ID подменю
         :param menu_id: ID меню
-        :param submenu_info: Информация о подменю.
         :return: None
         """
-        # Удалим кеш для данного подменю
-        await self.delete_cache_by_mask(
-            link=f'/menus/{menu_id}/submenus/{submenu_id}'
-        )
-
-        # Удалим кеш для списка подменю, так как одно подменю поменялось,
-        # и кеш стал неактуальным
-        await self.delete_cache_by_mask(
-            link=f'/menus/{menu_id}/submenus'
-        )
-
-        # Создадим новый кеш для подменю
-        await self.set_submenu_cache(
-            submenu_info=submenu_info,
-            menu_id=menu_id,
-            submenu_id=submenu_id
-        )
-        await self.delete_full_base_cache()
+        # Удалим кеш для данного подменю и для списка подменю, так как одно
+        # подменю поменялось, и кеш стал неактуальным
+        await self.invalidate_dependents('submenu', 'update', menu_id=menu_id, submenu_id=submenu_id)
 
     async def delete_submenu_cache(self,
                                    menu_id: str,
                                    submenu_id: str) -> None:
         """
-        Удаление кеша в связи с удалением блюда из БД
+        Удаление кеша в связи с удалением подменю из БД
+
+        Увеличивается счетчик поколений подменю, что удаляет весь его кеш, в т.ч. блюда.
+        Кеш других подменю этого меню сохраняется.
 
         :param submenu_id:
         :param menu_id:
         :return: None
         """
-        await self.delete_full_base_cache()
-        await self.delete_cache_by_mask(
-            link=f'/menus/{menu_id}/submenus/{submenu_id}'
-        )
-        await self.redis_cacher.delete(f'/menus/{menu_id}')
+        await self.invalidate_dependents('submenu', 'delete', menu_id=menu_id, submenu_id=submenu_id)
 
     async def get_all_menus_cache(self) -> list[Menu] | None:
         """
         Получение всех подменю из кеша.
 
-        Из Redis извлекается сериализованный pickle объект данных.
-        Для получения оригинальных данных, этот pickle объект десериализуется.
+        Из Redis извлекается сериализованный объект данных.
+        Для получения оригинальных данных, этот объект десериализуется.
 
         :return: Список подменю из кеша, либо None, если кеш не существует.
         """
-        cache = await self.redis_cacher.get('/menus/')
-        if cache:
-            return pickle.loads(cache)
-        return None
+        return await self.get_cache(menus_link())
 
     async def set_all_menus_cache(self,
-                                  menu_list: list[Menu]) -> None:
+                                  menu_list: Sequence[MenuCountRow]) -> None:
         """
         Запись всех подменю в кеш.
 
         Ключ в Redis будет представлен в виде строки-ссылки на список всех блюд,
         сформированной на основе указанного menu_id.
 
-        Значение в кеше будет представлять список блюд в формате pickle.
+        Значение в кеше будет представлять список блюд (см. app.db.serializers).
 
-        Время жизни данного кеша ограничено переменной app.config.EXPIRATION.
+        Время жизни данного кеша задается в app.config.CACHE_TTL.
 
         :param menu_list:
         :return: None.
         """
-        await self.redis_cacher.set(
-            '/menus/',
-            pickle.dumps(menu_list),
-            ex=EXPIRATION
+        await self.set_cache(
+            menus_link(),
+            menu_list
         )
 
     async def get_menu_cache(self,
@@ -417,16 +1125,13 @@ class CacheRepository:
         :param menu_id: ID меню.
         :return: Информация о меню или None, если нет в кеше.
         """
-        cache = await self.redis_cacher.get(
-            f'/menus/{menu_id}'
+        return await self.get_cache(
+            menu_link(menu_id)
         )
-        if cache:
-            return pickle.loads(cache)
-        return None
 
     async def set_menu_cache(self,
                              menu_id: str,
-                             menu_info: Menu) -> None:
+                             menu_info: MenuCountRow) -> None:
         """
         Запись информации о меню в кеш
 
@@ -434,55 +1139,42 @@ class CacheRepository:
         :param menu_info: Информация о меню.
         :return: None.
         """
-        await self.redis_cacher.set(
-            f'/menus/{menu_id}',
-            pickle.dumps(menu_info),
-            ex=EXPIRATION
+        await self.set_cache(
+            menu_link(menu_id),
+            menu_info
         )
 
     async def create_new_menu_cache(self,
-                                    menu_info: Menu) -> None:
+                                    menu_id: str) -> None:
         """
         Создание новой записи о меню в кеше.
 
-        Происходит очистка неактуального кеша, и создается кеш для создаваемого
-        меню.
+        Происходит очистка неактуального кеша. Кеш самого меню не создается:
+        в ответе эндпоинта меню есть счетчики, которых нет у созданного объекта.
 
-        :param menu_info:
+        :param menu_id: ID созданного меню.
         :return: None
         """
-        await self.delete_list_cache(
-            link='/menus/'
-        )
-        await self.set_menu_cache(
-            menu_info=menu_info,
-            menu_id=menu_info.id
-        )
+        batch = CacheBatch()
+        self.add_dependents(batch, 'menu', 'create', menu_id=menu_id)
+        batch.found(menu_link(menu_id))
+        await self.execute_batch(batch)
 
     async def update_menu_cache(self,
-                                menu_info: Menu,
                                 menu_id: str) -> None:
         """
         Обновление кеша конкретного меню при изменении этого меню в БД.
 
-        Происходит очистка неактуального кеша, а затем повторное создание кеша для данного
-        меню.
+        Происходит очистка неактуального кеша. Новый кеш меню создается при первом чтении,
+        так как у измененного объекта нет счетчиков.
 
         :param menu_id:
-        :param menu_info: Информация о подменю.
         :return: None
         """
         # Удалим кеш для списка всех меню, так как меню
-        # изменилось и кеш стал неактуальным
-        await self.delete_cache_by_mask(
-            link='/menus'
-        )
-        await self.set_menu_cache(
-            menu_info=menu_info,
-            menu_id=menu_id,
-        )
-
-        await self.delete_full_base_cache()
+        # изменилось и кеш стал неактуальным. Подменю и блюда
+        # от названия меню не зависят, поэтому их кеш сохраняется.
+        await self.invalidate_dependents('menu', 'update', menu_id=menu_id)
 
     async def delete_menu_cache(self,
                                 menu_id: str) -> None:
@@ -492,32 +1184,80 @@ class CacheRepository:
         :param menu_id:
         :return: None
         """
-        await self.delete_cache_by_mask(
-            link=f'/menus/{menu_id}'
-        )
-        await self.delete_cache_by_mask(
-            link='/menus/'
-        )
-        await self.delete_full_base_cache()
+        await self.invalidate_dependents('menu', 'delete', menu_id=menu_id)
+
+    async def upsert_menus_cache(self,
+                                 menu_ids: list[str]) -> None:
+        """
+        Очистка кеша после пакетного создания и изменения меню.
 
-    async def set_full_restaurant_menu(self, items: list[Menu]) -> None:
+        Представления всех меню пакета инвалидируются одной транзакцией Redis.
+
+        :param menu_ids: ID созданных и измененных меню.
+        :return: None
+        """
+        batch = CacheBatch()
+        for menu_id in menu_ids:
+            self.add_dependents(batch, 'menu', 'update', menu_id=menu_id)
+        batch.found(*[menu_link(menu_id) for menu_id in menu_ids])
+        await self.execute_batch(batch)
+
+    async def upsert_submenus_cache(self,
+                                    menu_id: str,
+                                    submenu_ids: list[str]) -> None:
+        """
+        Очистка кеша после пакетного создания и изменения подменю одного меню.
+
+        Меню со счетчиками, список подменю, каждое подменю пакета и полное меню ресторана
+        инвалидируются одной транзакцией Redis.
+
+        :param menu_id: ID меню.
+        :param submenu_ids: ID созданных и измененных подменю.
+        :return: None
+        """
+        batch = CacheBatch()
+        self.add_dependents(batch, 'submenu', 'create', menu_id=menu_id)
+        for submenu_id in submenu_ids:
+            self.add_dependents(batch, 'submenu', 'update', menu_id=menu_id, submenu_id=submenu_id)
+        batch.found(*[submenu_link(menu_id, submenu_id) for submenu_id in submenu_ids])
+        await self.execute_batch(batch)
+
+    async def upsert_dishes_cache(self,
+                                  menu_id: str,
+                                  submenu_id: str,
+                                  dish_ids: list[str]) -> None:
+        """
+        Очистка кеша после пакетного создания и изменения блюд одного подменю.
+
+        Меню и подменю со счетчиками, каждое блюдо пакета и полное меню ресторана
+        инвалидируются одной транзакцией Redis. Список блюд подменю удаляется целиком,
+        а не изменяется на месте по одному блюду.
+
+        :param menu_id: ID меню.
+        :param submenu_id: ID подменю.
+        :param dish_ids: ID созданных и измененных блюд.
+        :return: None
+        """
+        batch = CacheBatch()
+        self.add_dependents(batch, 'dish', 'create', menu_id=menu_id, submenu_id=submenu_id)
+        for dish_id in dish_ids:
+            self.add_dependents(batch, 'dish', 'update', menu_id=menu_id, submenu_id=submenu_id, dish_id=dish_id)
+        batch.delete(dishes_link(menu_id, submenu_id))
+        batch.found(*[dish_link(menu_id, submenu_id, dish_id) for dish_id in dish_ids])
+        await self.execute_batch(batch)
+
+    async def set_full_restaurant_menu(self, items: Sequence[Menu] | bytes) -> None:
         """
         Кеширование полного списка всех меню, соответствующих подменю и блюд
         """
-        await self.redis_cacher.set('Full_restaurant_menu',
-                                    pickle.dumps(items),
-                                    ex=EXPIRATION)
+        await self.set_cache(full_menu_link(), items)
 
     async def get_full_restaurant_menu(self) -> list[Menu] | None:
         """
         Получение из кеша полного списка всех меню, соответствующих подменю и блюд
         """
-        cache = await self.redis_cacher.get('Full_restaurant_menu')
-        if cache:
-            items = pickle.loads(cache)
-            return items
-        return None
+        return await self.get_cache(full_menu_link())
 
     async def delete_full_base_cache(self) -> None:
         """Удаление древовидной структуры базы из кеша."""
-        await self.redis_cacher.delete('Full_restaurant_menu')
+        await self.invalidate(links=[full_menu_link()])
@@ -0,0 +1,172 @@
+"""
+Ссылки на ключи кеша и счетчики поколений.
+
+Все ссылки строятся только функциями этого модуля, поэтому запись и чтение
+одного представления всегда используют одну и ту же ссылку (без расхождений
+в завершающих слешах и т.п.). Ссылка не является ключом Redis: ключ получается
+добавлением номеров поколений (см. CacheRepository.get_keys).
+"""
+from typing import Callable
+
+FULL_MENU_KEY = 'Full_restaurant_menu'
+
+# Счетчики поколений кеша. Каждый ключ кеша начинается с номера глобального поколения,
+# ключи внутри меню и подменю - еще и с номеров поколений этого меню и подменю.
+# Увеличение счетчика делает все ключи старого поколения недостижимыми,
+# а сами записи истекают по времени жизни.
+# У счетчиков нет времени жизни, поэтому при maxmemory-policy volatile-* Redis их не вытесняет.
+GENERATION_PREFIX = 'cache_generation:'
+GLOBAL_GENERATION_KEY = f'{GENERATION_PREFIX}global'
+
+# Записи о ненайденных ID (ответ 404). Не зависят от поколений, чтобы создание сущности
+# удаляло запись одной командой, и живут недолго (app.config.CACHE_NOT_FOUND_TTL).
+NOT_FOUND_PREFIX = 'not_found:'
+
+# Отметки о недавних изменениях ссылок и счетчиков поколений (app.config.DB_REPLICA_LAG_TTL).
+# Пока отметка есть, загрузки в кеш зависящих от нее ссылок читают с основной БД, а не с реплики.
+RECENT_WRITE_PREFIX = 'recent_write:'
+
+# ETag готовых JSON-ответов (хеш тела) по ключам записей кеша. Ключ записи содержит номера
+# поколений, поэтому ETag инвалидируется вместе с записью и не требует чтения самой записи.
+ETAG_PREFIX = 'etag:'
+
+# Семейства ключей по количеству сегментов ссылки '/menus/{menu_id}/submenus/...'
+LINK_FAMILIES = ('menus', 'menu', 'submenus', 'submenu', 'dishes', 'dish')
+# Семейства списков, у которых кешируются страницы (см. page_link)
+LIST_FAMILIES = ('menus', 'submenus', 'dishes')
+
+
+def menus_link() -> str:
+    """Список всех меню."""
+    return '/menus'
+
+
+def menu_link(menu_id: str) -> str:
+    """Меню со счетчиками подменю и блюд."""
+    return f'{menus_link()}/{menu_id}'
+
+
+def submenus_link(menu_id: str) -> str:
+    """Список подменю меню."""
+    return f'{menu_link(menu_id)}/submenus'
+
+
+def submenu_link(menu_id: str, submenu_id: str) -> str:
+    """Подменю со счетчиком блюд."""
+    return f'{submenus_link(menu_id)}/{submenu_id}'
+
+
+def dishes_link(menu_id: str, submenu_id: str) -> str:
+    """Список блюд подменю."""
+    return f'{submenu_link(menu_id, submenu_id)}/dishes'
+
+
+def dish_link(menu_id: str, submenu_id: str, dish_id: str) -> str:
+    """Блюдо."""
+    return f'{dishes_link(menu_id, submenu_id)}/{dish_id}'
+
+
+def page_link(link: str, limit: int, cursor: str | None) -> str:
+    """
+    Страница списка при постраничном чтении по ключу (keyset).
+
+    :param link: Ссылка на список, например submenus_link(menu_id).
+    :param limit: Количество элементов на странице.
+    :param cursor: ID последнего элемента предыдущей страницы или None для первой страницы.
+    :return: Ссылка вида '{ссылка на список}?limit={limit}&cursor={cursor}'.
+    """
+    return f'{link}?limit={limit}&cursor={cursor or ""}'
+
+
+def full_menu_link() -> str:
+    """Полное меню ресторана."""
+    return FULL_MENU_KEY
+
+
+# Построение ссылок по семейству: семейство -> (функция, названия ее параметров)
+LINK_BUILDERS: dict[str, tuple[Callable[..., str], tuple[str, ...]]] = {
+    'menus': (menus_link, ()),
+    'menu': (menu_link, ('menu_id',)),
+    'submenus': (submenus_link, ('menu_id',)),
+    'submenu': (submenu_link, ('menu_id', 'submenu_id')),
+    'dishes': (dishes_link, ('menu_id', 'submenu_id')),
+    'dish': (dish_link, ('menu_id', 'submenu_id', 'dish_id')),
+    'full_menu': (full_menu_link, ()),
+}
+
+
+def build_link(family: str, **ids: str) -> str:
+    """
+    Построение ссылки семейства по ID сущностей.
+
+    :param family: Семейство ключа, например 'submenu'.
+    :param ids: ID сущностей (menu_id, submenu_id, dish_id), лишние ID игнорируются.
+    :return: Ссылка на ключ кеша.
+    """
+    builder, params = LINK_BUILDERS[family]
+    return builder(*(ids[param] for param in params))
+
+
+def get_link_family(link: str) -> str:
+    """
+    Получение семейства ключа кеша, по которому определяется время жизни записи.
+
+    :param link: Ссылка на ключ кеша.
+    :return: Название семейства из app.config.CACHE_TTL.
+    """
+    if link == FULL_MENU_KEY:
+        return 'full_menu'
+    path = link.partition('?')[0]
+    return LINK_FAMILIES[len(path.strip('/').split('/')) - 1]
+
+
+def get_not_found_key(link: str) -> str:
+    """Получение ключа записи о том, что сущность по ссылке не найдена."""
+    return f'{NOT_FOUND_PREFIX}{link}'
+
+
+def get_etag_key(key: str) -> str:
+    """Получение ключа ETag готового JSON-ответа, записанного по ключу кеша."""
+    return f'{ETAG_PREFIX}{key}'
+
+
+def get_recent_write_key(key: str) -> str:
+    """Получение ключа отметки о недавнем изменении ссылки или счетчика поколений."""
+    return f'{RECENT_WRITE_PREFIX}{key}'
+
+
+def get_menu_generation_key(menu_id: str) -> str:
+    """Получение ключа счетчика поколений для меню."""
+    return f'{GENERATION_PREFIX}menu:{menu_id}'
+
+
+def get_submenu_generation_key(submenu_id: str) -> str:
+    """Получение ключа счетчика поколений для подменю."""
+    return f'{GENERATION_PREFIX}submenu:{submenu_id}'
+
+
+def get_list_generation_key(link: str) -> str:
+    """Получение ключа счетчика поколений для страниц списка."""
+    return f'{GENERATION_PREFIX}list:{link}'
+
+
+def get_link_generation_keys(link: str) -> list[str]:
+    """
+    Получение счетчиков поколений, которыми определяется ключ ссылки.
+
+    :param link: Ссылка на ключ кеша, например '/menus/{menu_id}/submenus/{submenu_id}/dishes'.
+    :return: Глобальный счетчик, счетчик меню для ссылок внутри меню,
+        счетчик подменю для ссылок внутри подменю и счетчик списка для страниц списка.
+    """
+    generation_keys = [GLOBAL_GENERATION_KEY]
+    path, _, query = link.partition('?')
+    segments = path.strip('/').split('/')
+    if len(segments) > 1 and segments[0] == 'menus':
+        generation_keys.append(get_menu_generation_key(segments[1]))
+    if len(segments) > 3:
+        generation_keys.append(get_submenu_generation_key(segments[3]))
+    if query:
+        # Страниц списка может быть сколько угодно, поэтому они инвалидируются
+        # не удалением, а увеличением счетчика списка (см. app.db.cache.CacheBatch)
+        generation_keys.append(get_list_generation_key(path))
+    return generation_keys
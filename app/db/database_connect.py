@@ -1,17 +1,64 @@
-from typing import AsyncGenerator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import AsyncGenerator, Iterator
 
-from aioredis import ConnectionPool, Redis
+from aioredis import BlockingConnectionPool, Redis
 from sqlalchemy import MetaData
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
-from app.config import REDIS_URL, SQLALCHEMY_DATABASE_URL
+from app.config import (
+    DB_MAX_OVERFLOW,
+    DB_POOL_PRE_PING,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_STATEMENT_CACHE_SIZE,
+    REDIS_MAX_CONNECTIONS,
+    REDIS_POOL_TIMEOUT,
+    REDIS_SOCKET_CONNECT_TIMEOUT,
+    REDIS_SOCKET_TIMEOUT,
+    REDIS_URL,
+    SQLALCHEMY_DATABASE_URL,
+    SQLALCHEMY_READ_DATABASE_URL,
+)
 
 metadata = MetaData()
 Base = declarative_base()
 
+
+class DatabasePool(AsyncAdaptedQueuePool):
+    """Пул соединений с БД со счетчиком запросов, ожидающих соединение."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.waiting = 0
+
+    def _do_get(self):
+        self.waiting += 1
+        try:
+            return super()._do_get()
+        finally:
+            self.waiting -= 1
+
+
+def create_engine(database_url: str = SQLALCHEMY_DATABASE_URL):
+    """Создание асинхронного движка БД с настройками пула из app.config"""
+    return create_async_engine(
+        database_url,
+        poolclass=DatabasePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        connect_args={'statement_cache_size': DB_STATEMENT_CACHE_SIZE},
+    )
+
+
 # Создаем асинхронную сессию
-engine = create_async_engine(SQLALCHEMY_DATABASE_URL)
+engine = create_engine()
 
 async_session_maker = sessionmaker(class_=AsyncSession,
                                    expire_on_commit=False,
@@ -19,6 +66,40 @@ async_session_maker = sessionmaker(class_=AsyncSession,
                                    autoflush=False,
                                    autocommit=False)
 
+# Движок и сессии реплики для чтения (без реплики - основная БД)
+read_engine = create_engine(SQLALCHEMY_READ_DATABASE_URL) if SQLALCHEMY_READ_DATABASE_URL else engine
+read_session_maker = sessionmaker(class_=AsyncSession,
+                                  expire_on_commit=False,
+                                  bind=read_engine,
+                                  autoflush=False,
+                                  autocommit=False) if read_engine is not engine else async_session_maker
+
+
+def has_read_replica() -> bool:
+    """Задана ли отдельная реплика для чтения (DB_READ_HOST)."""
+    return read_engine is not engine
+
+
+# Чтение с основной БД до конца текущего запроса (read-your-writes).
+# Устанавливается при обращении к сессии основной БД, т.е. при изменении данных.
+read_from_primary: ContextVar[bool] = ContextVar('read_from_primary', default=False)
+
+
+@contextmanager
+def primary_reads() -> Iterator[None]:
+    """
+    Чтение с основной БД внутри блока.
+
+    Используется при загрузке в кеш недавно измененных данных (см. CacheRepository.load_for_cache):
+    реплика может отставать, и прочитанные с нее устаревшие данные остались бы в кеше
+    на все время жизни записи.
+    """
+    token = read_from_primary.set(True)
+    try:
+        yield
+    finally:
+        read_from_primary.reset(token)
+
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     """Возвращает сессию соединения с базой данных"""
@@ -26,9 +107,106 @@ async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
         yield async_session
 
 
+class LazySession:
+    """
+    Сессии основной БД и реплики для чтения, создаваемые при первом обращении.
+
+    Запрос, полностью обслуженный из кеша, не создает сессию и не берет
+    соединение из пула. Созданные сессии закрываются при выходе из контекста.
+    """
+
+    def __init__(self,
+                 session_maker: sessionmaker = async_session_maker,
+                 read_session_maker: sessionmaker = read_session_maker) -> None:
+        self.session_maker = session_maker
+        self.read_session_maker = read_session_maker
+        self._session: AsyncSession | None = None
+        self._read_session: AsyncSession | None = None
+
+    @property
+    def session(self) -> AsyncSession:
+        """
+        Сессия основной БД, создается при первом обращении.
+
+        После обращения к ней чтение до конца запроса тоже идет с основной БД.
+        """
+        if self._session is None:
+            self._session = self.session_maker()
+        read_from_primary.set(True)
+        return self._session
+
+    @property
+    def read_session(self) -> AsyncSession:
+        """Сессия реплики для чтения (основной БД, если реплики нет или в запросе были изменения)."""
+        if self.read_session_maker is self.session_maker or read_from_primary.get():
+            return self.session
+        if self._read_session is None:
+            self._read_session = self.read_session_maker()
+        return self._read_session
+
+    async def close(self) -> None:
+        """Закрывает созданные сессии."""
+        for session in (self._session, self._read_session):
+            if session is not None:
+                await session.close()
+        self._session = self._read_session = None
+
+    async def __aenter__(self) -> 'LazySession':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+
+async def get_lazy_session() -> AsyncGenerator[LazySession, None]:
+    """Возвращает сессию базы данных, создаваемую при первом запросе в БД"""
+    token = read_from_primary.set(False)
+    try:
+        async with LazySession() as lazy_session:
+            yield lazy_session
+    finally:
+        read_from_primary.reset(token)
+
+
+class RedisPool(BlockingConnectionPool):
+    """
+    Пул соединений с Redis с ограничением числа соединений.
+
+    Если свободных соединений нет, запрос ждет освобождения соединения
+    до REDIS_POOL_TIMEOUT секунд, число таких запросов хранится в waiting.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.waiting = 0
+
+    async def get_connection(self, command_name, *keys, **options):
+        self.waiting += 1
+        try:
+            return await super().get_connection(command_name, *keys, **options)
+        finally:
+            self.waiting -= 1
+
+    def stats(self) -> dict[str, int]:
+        """Количество выданных, свободных и ожидающих соединений."""
+        checked_out = self.max_connections - self.pool.qsize()
+        return {
+            'max_connections': self.max_connections,
+            'checked_out': checked_out,
+            'idle': len(self._connections) - checked_out,
+            'waiting': self.waiting,
+        }
+
+
 def create_redis():
     """Создание пула соединений с Redis"""
-    return ConnectionPool.from_url(REDIS_URL)
+    return RedisPool.from_url(
+        REDIS_URL,
+        max_connections=REDIS_MAX_CONNECTIONS,
+        timeout=REDIS_POOL_TIMEOUT,
+        socket_connect_timeout=REDIS_SOCKET_CONNECT_TIMEOUT,
+        socket_timeout=REDIS_SOCKET_TIMEOUT,
+    )
 
 
 redis_connection_pool = create_redis()
@@ -37,3 +215,30 @@ redis_connection_pool = create_redis()
 def get_redis():
     """Получение соединения с Redis"""
     return Redis(connection_pool=redis_connection_pool)
+
+
+def get_pool_stats() -> dict[str, dict[str, int]]:
+    """
+    Состояние пулов соединений с БД (и репликой для чтения, если она задана) и Redis текущего воркера.
+
+    :return: Размер, выданные (checked_out), свободные (idle) и ожидающие (waiting)
+        соединения для каждого пула.
+    """
+    stats = {'database': get_database_pool_stats(engine)}
+    if has_read_replica():
+        stats['read_database'] = get_database_pool_stats(read_engine)
+    stats['redis'] = redis_connection_pool.stats()
+    return stats
+
+
+def get_database_pool_stats(database_engine) -> dict[str, int]:
+    """Размер, выданные, свободные и ожидающие соединения пула движка БД."""
+    database_pool = database_engine.sync_engine.pool
+    return {
+        'pool_size': database_pool.size(),
+        'max_overflow': DB_MAX_OVERFLOW,
+        'checked_out': database_pool.checkedout(),
+        'idle': database_pool.checkedin(),
+        'overflow': max(database_pool.overflow(), 0),
+        'waiting': database_pool.waiting,
+    }
@@ -0,0 +1,121 @@
+"""
+Локальный (в памяти процесса) уровень кеша перед Redis.
+
+Каждый воркер uvicorn держит свой LRU-кеш с ограничением по количеству записей,
+суммарному размеру и времени жизни. Согласованность между воркерами обеспечивается
+сообщениями об инвалидации, которые CacheRepository публикует в канал Redis.
+"""
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any
+
+from aioredis import Redis
+
+from app.config import (
+    CACHE_INVALIDATION_CHANNEL,
+    LOCAL_CACHE_ENABLED,
+    LOCAL_CACHE_MAX_BYTES,
+    LOCAL_CACHE_MAX_ENTRIES,
+    LOCAL_CACHE_TTL,
+)
+
+
+class LocalCache:
+    """LRU-кеш в памяти процесса с ограничением по записям, байтам и времени жизни."""
+
+    def __init__(self,
+                 max_entries: int,
+                 max_bytes: int,
+                 ttl: float) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size = 0
+        # Ключ -> (момент истечения, размер, значение)
+        self.entries: OrderedDict[str, tuple[float, int, Any]] = OrderedDict()
+
+    def get(self, key: str) -> Any:
+        """
+        Получение значения из кеша.
+
+        :param key: Ключ кеша.
+        :return: Значение или None, если записи нет или она истекла.
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires_at, _, value = entry
+        if expires_at < time.monotonic():
+            self.delete(key)
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, size: int) -> None:
+        """
+        Запись значения в кеш с вытеснением самых давно использованных записей.
+
+        :param key: Ключ кеша.
+        :param value: Значение.
+        :param size: Размер значения в байтах (размер сериализованного значения в Redis).
+        :return: None
+        """
+        if size > self.max_bytes:
+            return
+        self.delete(key)
+        self.entries[key] = (time.monotonic() + self.ttl, size, value)
+        self.size += size
+        while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+            _, (_, evicted_size, _) = self.entries.popitem(last=False)
+            self.size -= evicted_size
+
+    def delete(self, *keys: str) -> None:
+        """Удаление записей из кеша."""
+        for key in keys:
+            entry = self.entries.pop(key, None)
+            if entry is not None:
+                self.size -= entry[1]
+
+    def clear(self) -> None:
+        """Очистка кеша."""
+        self.entries.clear()
+        self.size = 0
+
+
+async def listen_cache_invalidation(redis: Redis,
+                                    cache: LocalCache) -> None:
+    """
+    Прослушивание сообщений об инвалидации кеша от других воркеров.
+
+    Сообщение содержит список ключей Redis (записей или счетчиков поколений),
+    которые нужно удалить из локального кеша. При потере соединения сообщения
+    могли быть пропущены, поэтому локальный кеш очищается целиком.
+
+    :param redis: Клиент Redis.
+    :param cache: Локальный кеш воркера.
+    :return: None
+    """
+    while True:
+        try:
+            async with redis.pubsub() as pubsub:
+                await pubsub.subscribe(CACHE_INVALIDATION_CHANNEL)
+                cache.clear()
+                async for message in pubsub.listen():
+                    if message['type'] == 'message':
+                        cache.delete(*json.loads(message['data']))
+        except asyncio.CancelledError:
+            raise
+        except Exception as error:
+            logging.error(error)
+            cache.clear()
+            await asyncio.sleep(1)
+
+
+local_cache = LocalCache(
+    max_entries=LOCAL_CACHE_MAX_ENTRIES,
+    max_bytes=LOCAL_CACHE_MAX_BYTES,
+    ttl=LOCAL_CACHE_TTL,
+) if LOCAL_CACHE_ENABLED else None
@@ -1,49 +1,115 @@
 import uuid
+from typing import Sequence
 
 from fastapi import Depends, HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import Row, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.database_connect import get_async_session
-from app.models.domain.menus_models import Dish, Submenu
+from app.db.database_connect import LazySession, get_lazy_session
+from app.db.repositories.menu_snapshot import (
+    refresh_menu_snapshot,
+    refresh_menu_snapshots,
+    submenu_menu_id,
+)
+from app.models.domain.menus_models import Dish, Menu, Submenu
 from app.models.schemas.menus.dish_schemas import DishSchema
 
+# Строка запросов по столбцам и ... RETURNING, которую репозиторий возвращает вместо объекта модели:
+# поля DishResponse (id, title, description, price) и submenu_id
+DishRow = Row[tuple[str, str, str, str, str]]
+
 
 class AsyncDishRepository:
     """Репозиторий необходимых CRUD операций для модели Блюда"""
 
     def __init__(self,
-                 session: AsyncSession = Depends(get_async_session)) -> None:
-        self.session = session
+                 lazy_session: LazySession = Depends(get_lazy_session)) -> None:
+        self.lazy_session = lazy_session
+
+    @property
+    def session(self) -> AsyncSession:
+        """Сессия БД, создается при первом запросе в БД"""
+        return self.lazy_session.session
+
+    @property
+    def read_session(self) -> AsyncSession:
+        """Сессия реплики для чтения, создается при первом запросе в БД"""
+        return self.lazy_session.read_session
 
     # Доработать репозиторий, не должно быть блюд с одинаковыми названиями
     async def create_dish(self,
                           menu_id: str,
                           submenu_id: str,
-                          dish: DishSchema) -> Dish:
-        """Добавление нового блюда"""
-        custom_id = dish.id
-        if custom_id:
-            dish_obj = Dish(id=custom_id,
-                            title=dish.title,
-                            description=dish.description,
-                            submenu_id=submenu_id,
-                            price=dish.price)
-        else:
-            dish_obj = Dish(title=dish.title,
-                            description=dish.description,
-                            submenu_id=submenu_id,
-                            price=dish.price)
-            dish_obj.id = str(uuid.uuid4())
-        self.session.add(dish_obj)
+                          dish: DishSchema) -> DishRow:
+        """Добавление нового блюда одним запросом INSERT ... RETURNING"""
+        item = (await self.session.execute(
+            insert(Dish)
+            .values(id=dish.id or str(uuid.uuid4()),
+                    title=dish.title,
+                    description=dish.description,
+                    submenu_id=submenu_id,
+                    price=dish.price)
+            .returning(Dish.id, Dish.title, Dish.description, Dish.price, Dish.submenu_id)
+        )).one()
+        await refresh_menu_snapshot(self.session, submenu_menu_id(submenu_id))
+        await self.session.commit()
+        return item
+
+    async def upsert_dishes(self,
+                            submenu_id: str,
+                            dishes: list[DishSchema]) -> Sequence[DishRow]:
+        """
+        Пакетное создание и изменение блюд подменю одним запросом INSERT ... ON CONFLICT DO UPDATE.
+
+        Блюда без ID создаются с новым ID, существующие блюда этого подменю изменяются.
+        Блюда другого подменю с тем же ID не изменяются и не возвращаются.
+
+        :param submenu_id: ID подменю.
+        :param dishes: Блюда пакета.
+        :return: Созданные и измененные блюда.
+        """
+        values = {
+            dish.id or str(uuid.uuid4()): {'title': dish.title, 'description': dish.description, 'price': dish.price}
+            for dish in dishes
+        }
+        query = insert(Dish).values([
+            {'id': dish_id, 'submenu_id': submenu_id, **dish} for dish_id, dish in values.items()
+        ])
+        upsert = query.on_conflict_do_update(
+            index_elements=[Dish.id],
+            set_={
+                'title': query.excluded.title,
+                'description': query.excluded.description,
+                'price': query.excluded.price
+            },
+            where=Dish.submenu_id == query.excluded.submenu_id
+        ).returning(Dish.id, Dish.title, Dish.description, Dish.price, Dish.submenu_id)
+        try:
+            items = (await self.session.execute(upsert)).all()
+        except IntegrityError:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                                detail='submenu not found')
+        await refresh_menu_snapshots(self.session, Menu.id == submenu_menu_id(submenu_id))
         await self.session.commit()
-        await self.session.refresh(dish_obj)
-        return dish_obj
+        return items
 
     async def read_all_dishes(self,
-                              submenu_id: str) -> list[Dish]:
-        """Получение всех блюд"""
-        query = await self.session.execute(
+                              submenu_id: str,
+                              limit: int | None = None,
+                              cursor: str | None = None) -> Sequence[DishRow]:
+        """
+        Получение всех блюд или страницы блюд подменю.
+
+        Блюда упорядочены по ID, страница читается по ключу (keyset) по индексу (submenu_id, id).
+
+        :param submenu_id: ID подменю.
+        :param limit: Количество блюд на странице или None для всех блюд.
+        :param cursor: ID последнего блюда предыдущей страницы.
+        :return: Список блюд.
+        """
+        query = (
             select(
                 Dish.id,
                 Dish.title,
@@ -52,24 +118,29 @@ class AsyncDishRepository:
                 Dish.submenu_id,
             )
             .where(Dish.submenu_id == submenu_id)
-            .group_by(Dish.id)
+            .order_by(Dish.id)
         )
-        return query.all()
+        if cursor is not None:
+            query = query.where(Dish.id > cursor)
+        if limit is not None:
+            query = query.limit(limit)
+        return (await self.read_session.execute(query)).all()
 
     async def read_dish(self,
-                        dish_id: str) -> Dish:
+                        dish_id: str) -> DishRow:
         """Получение блюда по id"""
-        query = await self.session.execute(
+        query = await self.read_session.execute(
             select(
                 Dish.id,
                 Dish.title,
                 Dish.description,
-                Dish.price
+                Dish.price,
+                Dish.submenu_id
             )
             .filter(Dish.id == dish_id)
         )
 
-        item: Dish = query.first()
+        item = query.first()
 
         if item:
             return item
@@ -79,20 +150,23 @@ class AsyncDishRepository:
 
     async def update_dish(self,
                           dish_id: str,
-                          updated_dish: DishSchema) -> Dish:
-        """Изменение блюда по id"""
-        # Находим текущее блюдо в бд
-        current_dish = await self.session.get(Dish, dish_id)
+                          updated_dish: DishSchema) -> DishRow:
+        """
+        Изменение блюда по id одним запросом UPDATE ... RETURNING.
 
-        if current_dish:
-            current_dish.title = updated_dish.title
-            current_dish.description = updated_dish.description
-            current_dish.price = updated_dish.price
+        Блюдо не найдено, если запрос не изменил ни одной строки.
+        """
+        item = (await self.session.execute(
+            update(Dish)
+            .where(Dish.id == dish_id)
+            .values(title=updated_dish.title, description=updated_dish.description, price=updated_dish.price)
+            .returning(Dish.id, Dish.title, Dish.description, Dish.price, Dish.submenu_id)
+        )).first()
 
-            await self.session.merge(current_dish)
+        if item:
+            await refresh_menu_snapshot(self.session, submenu_menu_id(item.submenu_id))
             await self.session.commit()
-            await self.session.refresh(current_dish)
-            return current_dish
+            return item
         else:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                                 detail='dish not found')
@@ -103,6 +177,7 @@ class AsyncDishRepository:
         dish = await self.session.get(Dish, dish_id)
         if dish:
             await self.session.delete(dish)
+            await refresh_menu_snapshot(self.session, submenu_menu_id(dish.submenu_id))
             await self.session.commit()
             return dish
         else:
@@ -117,7 +192,7 @@ class AsyncDishRepository:
         :param submenu_id: ID подменю
         :return: Возвращает menu_id, в котором хранится блюдо
         """
-        query = await self.session.execute(
+        query = await self.read_session.execute(
             select(Submenu.menu_id)
             .select_from(Dish)
             .join(Submenu, Dish.submenu_id == Submenu.id)
@@ -1,74 +1,129 @@
 import uuid
+from typing import AsyncIterator, Sequence
 
 from fastapi import Depends, HTTPException, status
-from sqlalchemy import distinct, func, select
+from sqlalchemy import Row, Text, cast, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.db.database_connect import get_async_session
-from app.models.domain.menus_models import Dish, Menu, Submenu
+from app.db.database_connect import LazySession, get_lazy_session
+from app.db.repositories.menu_snapshot import (
+    json_array,
+    menu_document,
+    read_menu_snapshots,
+    rebuild_menu_snapshots,
+    refresh_menu_snapshot,
+    refresh_menu_snapshots,
+)
+from app.models.domain.menus_models import Menu, Submenu
 from app.models.schemas.menus.menu_schemas import MenuSchema
 
+# Строки запросов по столбцам и ... RETURNING, которые репозиторий возвращает вместо объектов модели:
+# поля MenuResponse (id, title, description) и поля MenuCountResponse со счетчиками подменю и блюд
+MenuRow = Row[tuple[str, str, str]]
+MenuCountRow = Row[tuple[str, str, str, int, int]]
+
 
 class AsyncMenuRepository:
     """Репозиторий необходимых CRUD операций для модели Меню"""
 
-    def __init__(self, session: AsyncSession = Depends(get_async_session)) -> None:
-        self.session = session
+    def __init__(self,
+                 lazy_session: LazySession = Depends(get_lazy_session)) -> None:
+        self.lazy_session = lazy_session
+
+    @property
+    def session(self) -> AsyncSession:
+        """Сессия БД, создается при первом запросе в БД"""
+        return self.lazy_session.session
+
+    @property
+    def read_session(self) -> AsyncSession:
+        """Сессия реплики для чтения, создается при первом запросе в БД"""
+        return self.lazy_session.read_session
 
     # Необходимо доработать репозиторий на проверку существующего меню,
     # не должно быть два меню с одинаковым названием
-    async def create_menu(self, menu: MenuSchema) -> Menu:
-        """Добавление нового меню"""
+    async def create_menu(self, menu: MenuSchema) -> MenuRow:
+        """Добавление нового меню одним запросом INSERT ... RETURNING"""
+        menu_id = menu.id or str(uuid.uuid4())
         try:
-            custom_id = menu.id
-            if custom_id:
-                menu_obj = Menu(id=custom_id, title=menu.title, description=menu.description)
-            else:
-                menu_obj = Menu(title=menu.title, description=menu.description)
-                menu_obj.id = str(uuid.uuid4())
-
-            self.session.add(menu_obj)
+            item = (await self.session.execute(
+                insert(Menu)
+                .values(id=menu_id, title=menu.title, description=menu.description)
+                .returning(Menu.id, Menu.title, Menu.description)
+            )).one()
+            await refresh_menu_snapshot(self.session, menu_id)
             await self.session.commit()
-            await self.session.refresh(menu_obj)
-            return menu_obj
+            return item
         except IntegrityError:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
                                 detail='Menu with this title is already exists')
 
-    async def read_all_menus(self) -> list[Menu]:
-        """Получение всех меню"""
-        query = await self.session.execute(
-            select(
-                Menu.id,
-                Menu.title,
-                Menu.description,
-                func.count(Submenu.id).label('submenus_count'),
-                func.count(Dish.id).label('dishes_count')
-            )
-            .outerjoin(Submenu, Menu.id == Submenu.menu_id)
-            .outerjoin(Dish, Submenu.id == Dish.submenu_id)
-            .group_by(Menu.id)
+    async def upsert_menus(self, menus: list[MenuSchema]) -> Sequence[MenuRow]:
+        """
+        Пакетное создание и изменение меню одним запросом INSERT ... ON CONFLICT DO UPDATE.
+
+        Меню без ID создаются с новым ID, существующие меню изменяются. Если ID повторяется
+        в пакете, применяется последнее меню с этим ID. Снимки меню обновляются одним запросом.
+
+        :param menus: Меню пакета.
+        :return: Созданные и измененные меню.
+        """
+        values = {
+            menu.id or str(uuid.uuid4()): {'title': menu.title, 'description': menu.description}
+            for menu in menus
+        }
+        query = insert(Menu).values([{'id': menu_id, **menu} for menu_id, menu in values.items()])
+        upsert = query.on_conflict_do_update(
+            index_elements=[Menu.id],
+            set_={'title': query.excluded.title, 'description': query.excluded.description}
+        ).returning(Menu.id, Menu.title, Menu.description)
+        items = (await self.session.execute(upsert)).all()
+        await refresh_menu_snapshots(self.session, Menu.id.in_(values))
+        await self.session.commit()
+        return items
+
+    async def read_all_menus(self,
+                             limit: int | None = None,
+                             cursor: str | None = None) -> Sequence[MenuCountRow]:
+        """
+        Получение всех меню или страницы меню.
+
+        Страница читается по ключу (keyset): меню с ID больше курсора в порядке ID,
+        что использует индекс первичного ключа независимо от номера страницы.
+
+        :param limit: Количество меню на странице или None для всех меню.
+        :param cursor: ID последнего меню предыдущей страницы.
+        :return: Список меню.
+        """
+        query = select(
+            Menu.id,
+            Menu.title,
+            Menu.description,
+            Menu.submenus_count,
+            Menu.dishes_count
         )
-        return query.all()
+        if cursor is not None:
+            query = query.where(Menu.id > cursor)
+        if limit is not None:
+            query = query.order_by(Menu.id).limit(limit)
+        return (await self.read_session.execute(query)).all()
 
-    async def read_menu(self, menu_id: str) -> Menu:
+    async def read_menu(self, menu_id: str) -> MenuCountRow:
         """Получение меню по id"""
-        query = await self.session.execute(
+        query = await self.read_session.execute(
             select(
                 Menu.id,
                 Menu.title,
                 Menu.description,
-                func.count(distinct(Submenu.id)).label('submenus_count'),
-                func.count(distinct(Dish.id)).label('dishes_count')
+                Menu.submenus_count,
+                Menu.dishes_count
             )
-            .outerjoin(Submenu, Menu.id == Submenu.menu_id)
-            .outerjoin(Dish, Submenu.id == Dish.submenu_id)
             .filter(Menu.id == menu_id)
-            .group_by(Menu.id)
         )
-        item: Menu = query.first()
+        item = query.first()
 
         if item:
             return item
@@ -76,24 +131,29 @@ class AsyncMenuRepository:
             raise HTTPException(status.HTTP_404_NOT_FOUND,
                                 detail='menu not found')
 
-    async def update_menu(self, menu_id: str, updated_menu: MenuSchema) -> Menu:
-        """Изменение меню по id"""
-        current_menu = await self.session.get(Menu, menu_id)
+    async def update_menu(self, menu_id: str, updated_menu: MenuSchema) -> MenuRow:
+        """
+        Изменение меню по id одним запросом UPDATE ... RETURNING.
 
-        if current_menu:
-            current_menu.title = updated_menu.title
-            current_menu.description = updated_menu.description
+        Меню не найдено, если запрос не изменил ни одной строки.
+        """
+        item = (await self.session.execute(
+            update(Menu)
+            .where(Menu.id == menu_id)
+            .values(title=updated_menu.title, description=updated_menu.description)
+            .returning(Menu.id, Menu.title, Menu.description)
+        )).first()
 
-            await self.session.merge(current_menu)
+        if item:
+            await refresh_menu_snapshot(self.session, menu_id)
             await self.session.commit()
-            await self.session.refresh(current_menu)
-            return current_menu
+            return item
         else:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                                 detail='menu not found')
 
     async def delete_menu(self, menu_id: str) -> Menu:
-        """Удаление меню по id"""
+        """Удаление меню по id, снимок меню удаляется БД вместе с меню"""
         menu = await self.session.get(Menu, menu_id)
         if menu:
             await self.session.delete(menu)
@@ -103,10 +163,57 @@ class AsyncMenuRepository:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                                 detail='menu not found')
 
-    async def get_full_restaurant_menu(self) -> list[Menu]:
+    async def get_full_restaurant_menu(self) -> Sequence[Menu]:
         """Получение полного списка всех меню, соответствующих подменю и соответствующих блюд"""
-        query = (await self.session.execute(
+        query = (await self.read_session.execute(
             # При выполнении select в рамках одного запроса сразу же будут выводиться соответствующие подменю и блюда
             select(Menu).options(selectinload(Menu.submenus).selectinload(Submenu.dishes))
         )).scalars().fetchall()
         return query
+
+    async def get_full_restaurant_menu_json(self) -> bytes:
+        """
+        Получение полного меню ресторана готовым JSON-документом, собранным в БД одним запросом.
+
+        Поля и их порядок совпадают с MenuFullResponse, элементы списков упорядочены по ID
+        (см. app.db.repositories.menu_snapshot.menu_document). Объекты моделей не создаются,
+        ответ не проходит валидацию и кодирование в JSON.
+
+        :return: JSON-документ со списком меню.
+        """
+        query = select(cast(json_array(menu_document(), Menu.id), Text))
+        return (await self.read_session.execute(query)).scalar_one().encode()
+
+    async def get_full_restaurant_menu_snapshot(self) -> bytes:
+        """
+        Получение полного меню ресторана из снимков меню (см. app.db.repositories.menu_snapshot).
+
+        :return: JSON-документ со списком меню.
+        """
+        return await read_menu_snapshots(self.read_session)
+
+    async def rebuild_menu_snapshots(self) -> int:
+        """Пересборка снимков всех меню, возвращает количество меню"""
+        return await rebuild_menu_snapshots(self.session)
+
+    async def stream_full_restaurant_menu(self, batch_size: int) -> AsyncIterator[Sequence[Menu]]:
+        """
+        Потоковое получение полного меню ресторана пачками меню.
+
+        Меню читаются курсором на стороне сервера по batch_size строк, подменю и блюда
+        загружаются отдельным запросом на каждую пачку. Выданные пачки удаляются из сессии,
+        поэтому в памяти одновременно находится только одна пачка.
+
+        :param batch_size: Количество меню в пачке.
+        :return: Асинхронный итератор пачек меню с подменю и блюдами.
+        """
+        result = await self.read_session.stream(
+            select(Menu)
+            .options(selectinload(Menu.submenus).selectinload(Submenu.dishes))
+            .order_by(Menu.id)
+            .execution_options(yield_per=batch_size)
+        )
+        async for menus in result.scalars().partitions():
+            yield menus
+            for menu in menus:
+                self.read_session.expunge(menu)
@@ -0,0 +1,140 @@
+"""
+Снимок полного меню ресторана.
+
+JSON-документ каждого меню с подменю и блюдами (поля и их порядок совпадают с MenuFullResponse)
+собирается в БД и хранится в таблице menu_snapshots. Репозитории меню, подменю и блюд обновляют
+снимок измененного меню в той же транзакции, что и само изменение, поэтому полное меню ресторана
+читается из снимков одним запросом без соединения таблиц, даже если кеш в Redis пуст или недоступен.
+Строка снимка удаляется вместе с меню (ON DELETE CASCADE).
+"""
+from sqlalchemy import Text, cast, delete, func, literal_column, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.domain.menus_models import Dish, Menu, MenuSnapshot, Submenu
+
+
+def json_array(item, order_by):
+    """JSON-массив элементов группы в порядке order_by, пустой массив для пустой группы."""
+    return func.coalesce(func.json_agg(aggregate_order_by(item, order_by)), literal_column("'[]'::json"))
+
+
+def menu_document():
+    """
+    JSON-документ меню с подменю и блюдами для строки запроса из таблицы меню.
+
+    Вложенные списки подменю и блюд строятся коррелированными подзапросами с json_agg,
+    элементы списков упорядочены по ID.
+    """
+    dishes = (
+        select(json_array(
+            func.json_build_object(
+                'title', Dish.title,
+                'description', Dish.description,
+                'price', Dish.price,
+                'id', Dish.id
+            ),
+            Dish.id
+        ))
+        .where(Dish.submenu_id == Submenu.id)
+        .scalar_subquery()
+    )
+    submenus = (
+        select(json_array(
+            func.json_build_object(
+                'title', Submenu.title,
+                'description', Submenu.description,
+                'id', Submenu.id,
+                'menu_id', Submenu.menu_id,
+                'dishes', dishes
+            ),
+            Submenu.id
+        ))
+        .where(Submenu.menu_id == Menu.id)
+        .scalar_subquery()
+    )
+    return func.json_build_object(
+        'title', Menu.title,
+        'description', Menu.description,
+        'id', Menu.id,
+        'submenus', submenus
+    )
+
+
+def submenu_menu_id(submenu_id):
+    """ID меню подменю (значение или атрибут объекта модели), вычисляемый в запросе обновления снимка."""
+    return select(Submenu.menu_id).where(Submenu.id == submenu_id).scalar_subquery()
+
+
+async def refresh_menu_snapshot(session: AsyncSession, menu_id) -> None:
+    """
+    Пересборка снимка одного меню в текущей транзакции.
+
+    Вызывается репозиториями после изменения меню, его подменю или блюд до commit,
+    изменения объектов сессии перед этим записываются в БД (flush).
+
+    :param session: Сессия БД.
+    :param menu_id: ID меню или подзапрос, возвращающий его (см. submenu_menu_id).
+    :return: None
+    """
+    await refresh_menu_snapshots(session, Menu.id == menu_id)
+
+
+async def refresh_menu_snapshots(session: AsyncSession, condition) -> None:
+    """
+    Пересборка снимков меню, отобранных условием, в текущей транзакции.
+
+    Строки меню блокируются до конца транзакции (SELECT ... FOR UPDATE), затем снимки
+    собираются одним запросом.
+
+    :param session: Сессия БД.
+    :param condition: Условие отбора меню, например Menu.id.in_(menu_ids).
+    :return: None
+    """
+    await session.flush()
+    # Снимок собирается из данных, видимых запросу. Без блокировки две транзакции, изменившие
+    # разные строки одного меню, собрали бы снимки каждая без изменения другой, и снимок
+    # последней зафиксированной транзакции потерял бы чужое изменение. Блокировка строк меню
+    # отдельным запросом (в порядке ID, чтобы пакеты не ждали друг друга по кругу) ждет
+    # завершения конкурирующей транзакции, и следующий запрос видит ее изменения.
+    # Берется FOR NO KEY UPDATE, а не FOR UPDATE: вставка подменю уже держит FOR KEY SHARE
+    # на строке меню (проверка внешнего ключа), и FOR UPDATE с ним конфликтует, что при
+    # одновременном создании подменю одного меню приводит к взаимной блокировке с триггером счетчиков.
+    await session.execute(
+        select(Menu.id).where(condition).order_by(Menu.id).with_for_update(key_share=True)
+    )
+    query = insert(MenuSnapshot).from_select(
+        ['menu_id', 'document'],
+        select(Menu.id, menu_document()).where(condition)
+    )
+    await session.execute(query.on_conflict_do_update(
+        index_elements=[MenuSnapshot.menu_id],
+        set_={'document': query.excluded.document}
+    ))
+
+
+async def rebuild_menu_snapshots(session: AsyncSession) -> int:
+    """
+    Пересборка снимков всех меню, например после синхронизации с файлом меню.
+
+    :param session: Сессия БД.
+    :return: Количество меню.
+    """
+    connection = await session.connection()
+    await connection.execute(delete(MenuSnapshot))
+    result = await connection.execute(
+        insert(MenuSnapshot).from_select(['menu_id', 'document'], select(Menu.id, menu_document()))
+    )
+    await session.commit()
+    return result.rowcount
+
+
+async def read_menu_snapshots(session: AsyncSession) -> bytes:
+    """
+    Получение полного меню ресторана из снимков.
+
+    :param session: Сессия БД.
+    :return: JSON-документ со списком меню в порядке ID.
+    """
+    query = select(cast(json_array(MenuSnapshot.document, MenuSnapshot.menu_id), Text))
+    return (await session.execute(query)).scalar_one().encode()
@@ -1,78 +1,141 @@
 import uuid
+from typing import Sequence
 
 from fastapi import Depends, HTTPException, status
-from sqlalchemy import distinct, func, select
+from sqlalchemy import Row, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.database_connect import get_async_session
-from app.models.domain.menus_models import Dish, Submenu
+from app.db.database_connect import LazySession, get_lazy_session
+from app.db.repositories.menu_snapshot import (
+    refresh_menu_snapshot,
+    refresh_menu_snapshots,
+)
+from app.models.domain.menus_models import Menu, Submenu
 from app.models.schemas.menus.submenu_schemas import SubmenuSchema
 
+# Строки запросов по столбцам и ... RETURNING, которые репозиторий возвращает вместо объектов модели:
+# поля SubmenuResponse (id, title, description, menu_id) и они же со счетчиком блюд
+SubmenuRow = Row[tuple[str, str, str, str]]
+SubmenuCountRow = Row[tuple[str, str, str, str, int]]
+
 
 class AsyncSubmenuRepository:
     """Репозиторий необходимых CRUD операций для модели Подменю"""
 
     def __init__(self,
-                 session: AsyncSession = Depends(get_async_session)) -> None:
-        self.session = session
+                 lazy_session: LazySession = Depends(get_lazy_session)) -> None:
+        self.lazy_session = lazy_session
+
+    @property
+    def session(self) -> AsyncSession:
+        """Сессия БД, создается при первом запросе в БД"""
+        return self.lazy_session.session
+
+    @property
+    def read_session(self) -> AsyncSession:
+        """Сессия реплики для чтения, создается при первом запросе в БД"""
+        return self.lazy_session.read_session
 
     # Доработать репозиторий, подменю с одинаковыми названиями не должно быть
-    async def create_submenu(self, menu_id: str, submenu: SubmenuSchema) -> Submenu:
-        """Добавление нового подменю"""
+    async def create_submenu(self, menu_id: str, submenu: SubmenuSchema) -> SubmenuRow:
+        """Добавление нового подменю одним запросом INSERT ... RETURNING"""
         try:
-            custom_id = submenu.id
-            if custom_id:
-                submenu_obj = Submenu(id=custom_id,
-                                      title=submenu.title,
-                                      description=submenu.description,
-                                      menu_id=menu_id)
-            else:
-                submenu_obj = Submenu(title=submenu.title,
-                                      description=submenu.description,
-                                      menu_id=menu_id)
-                submenu_obj.id = str(uuid.uuid4())
-            self.session.add(submenu_obj)  # Добавляем сформированный объект в сессию
+            item = (await self.session.execute(
+                insert(Submenu)
+                .values(id=submenu.id or str(uuid.uuid4()),
+                        title=submenu.title,
+                        description=submenu.description,
+                        menu_id=menu_id)
+                .returning(Submenu.id, Submenu.title, Submenu.description, Submenu.menu_id)
+            )).one()
+            await refresh_menu_snapshot(self.session, menu_id)
             await self.session.commit()
-            await self.session.refresh(submenu_obj)
-            return submenu_obj
+            return item
         except IntegrityError:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
                                 detail='submenu with this title already exists')
 
-    async def read_all_submenus(self, menu_id: str) -> list[Submenu]:
-        """Получение всех подменю"""
-        query = await self.session.execute(
+    async def upsert_submenus(self,
+                              menu_id: str,
+                              submenus: list[SubmenuSchema]) -> Sequence[SubmenuRow]:
+        """
+        Пакетное создание и изменение подменю меню одним запросом INSERT ... ON CONFLICT DO UPDATE.
+
+        Подменю без ID создаются с новым ID, существующие подменю этого меню изменяются.
+        Подменю другого меню с тем же ID не изменяются и не возвращаются.
+
+        :param menu_id: ID меню.
+        :param submenus: Подменю пакета.
+        :return: Созданные и измененные подменю.
+        """
+        values = {
+            submenu.id or str(uuid.uuid4()): {'title': submenu.title, 'description': submenu.description}
+            for submenu in submenus
+        }
+        query = insert(Submenu).values([
+            {'id': submenu_id, 'menu_id': menu_id, **submenu} for submenu_id, submenu in values.items()
+        ])
+        upsert = query.on_conflict_do_update(
+            index_elements=[Submenu.id],
+            set_={'title': query.excluded.title, 'description': query.excluded.description},
+            where=Submenu.menu_id == query.excluded.menu_id
+        ).returning(Submenu.id, Submenu.title, Submenu.description, Submenu.menu_id)
+        try:
+            items = (await self.session.execute(upsert)).all()
+        except IntegrityError:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                                detail='menu not found')
+        await refresh_menu_snapshots(self.session, Menu.id == menu_id)
+        await self.session.commit()
+        return items
+
+    async def read_all_submenus(self,
+                                menu_id: str,
+                                limit: int | None = None,
+                                cursor: str | None = None) -> Sequence[SubmenuCountRow]:
+        """
+        Получение всех подменю или страницы подменю меню.
+
+        Страница читается по ключу (keyset) в порядке ID по индексу (menu_id, id).
+
+        :param menu_id: ID меню.
+        :param limit: Количество подменю на странице или None для всех подменю.
+        :param cursor: ID последнего подменю предыдущей страницы.
+        :return: Список подменю.
+        """
+        query = (
             select(
                 Submenu.id,
                 Submenu.title,
                 Submenu.description,
                 Submenu.menu_id,
-                func.count(Dish.id).label('dishes_count')
+                Submenu.dishes_count
             )
-            .outerjoin(Dish, Submenu.id == Dish.submenu_id)
             .where(Submenu.menu_id == menu_id)
-            .group_by(Submenu.id)
         )
-
-        return query.all()
+        if cursor is not None:
+            query = query.where(Submenu.id > cursor)
+        if limit is not None:
+            query = query.order_by(Submenu.id).limit(limit)
+        return (await self.read_session.execute(query)).all()
 
     async def read_submenu(self,
-                           submenu_id: str) -> Submenu:
+                           submenu_id: str) -> SubmenuCountRow:
         """Получение подменю по id"""
-        query = await self.session.execute(
+        query = await self.read_session.execute(
             select(
                 Submenu.id,
                 Submenu.title,
                 Submenu.description,
-                func.count(distinct(Dish.id)).label('dishes_count')
+                Submenu.menu_id,
+                Submenu.dishes_count
             )
-            .outerjoin(Dish, Submenu.id == Dish.submenu_id)
             .where(Submenu.id == submenu_id)
-            .group_by(Submenu.id)
         )
 
-        item: Submenu = query.first()
+        item = query.first()
 
         if item:
             return item
@@ -82,18 +145,23 @@ class AsyncSubmenuRepository:
 
     async def update_submenu(self,
                              submenu_id: str,
-                             updated_submenu: SubmenuSchema) -> Submenu:
-        """Изменение подменю по id"""
-        current_submenu = await self.session.get(Submenu, submenu_id)
+                             updated_submenu: SubmenuSchema) -> SubmenuRow:
+        """
+        Изменение подменю по id одним запросом UPDATE ... RETURNING.
 
-        if current_submenu:
-            current_submenu.title = updated_submenu.title
-            current_submenu.description = updated_submenu.description
+        Подменю не найдено, если запрос не изменил ни одной строки.
+        """
+        item = (await self.session.execute(
+            update(Submenu)
+            .where(Submenu.id == submenu_id)
+            .values(title=updated_submenu.title, description=updated_submenu.description)
+            .returning(Submenu.id, Submenu.title, Submenu.description, Submenu.menu_id)
+        )).first()
 
-            await self.session.merge(current_submenu)
+        if item:
+            await refresh_menu_snapshot(self.session, item.menu_id)
             await self.session.commit()
-            await self.session.refresh(current_submenu)
-            return current_submenu
+            return item
         else:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                                 detail='submenu not found')
@@ -103,6 +171,7 @@ class AsyncSubmenuRepository:
         submenu = await self.session.get(Submenu, submenu_id)
         if submenu:
             await self.session.delete(submenu)
+            await refresh_menu_snapshot(self.session, submenu.menu_id)
             await self.session.commit()
             return submenu
         else:
@@ -0,0 +1,126 @@
+"""
+Формат записей кеша в Redis.
+
+Запись состоит из заголовка и тела:
+
+- версия формата (1 байт);
+- идентификатор кодека тела (1 байт);
+- флаги (1 байт): тело сжато zlib, тело - готовые байты без кодирования;
+- мягкое время истечения записи (8 байт, double);
+- тело.
+
+Кодек, которым была записана запись, указан в ее заголовке, поэтому смена кодека
+(app.config.CACHE_CODEC) не требует очистки кеша: новые записи пишутся новым кодеком,
+а старые читаются тем, которым были записаны. Записи неизвестной версии формата
+(например, pickle предыдущих версий приложения) считаются промахом кеша.
+"""
+import json
+import struct
+import zlib
+from typing import Any, Protocol
+
+import msgpack
+
+from app.config import CACHE_CODEC, CACHE_COMPRESSION_THRESHOLD
+
+FORMAT_VERSION = 1
+HEADER = struct.Struct('>BBBd')
+
+FLAG_COMPRESSED = 1
+FLAG_RAW = 2
+
+
+class Codec(Protocol):
+    """Кодек тела записи кеша."""
+    codec_id: int
+
+    @staticmethod
+    def dumps(value: Any) -> bytes:
+        """Кодирование значения в байты."""
+
+    @staticmethod
+    def loads(data: bytes) -> Any:
+        """Декодирование значения из байтов."""
+
+
+class JsonCodec:
+    """Компактный JSON (без пробелов, в UTF-8)."""
+    codec_id = 1
+
+    @staticmethod
+    def dumps(value: Any) -> bytes:
+        return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode()
+
+    @staticmethod
+    def loads(data: bytes) -> Any:
+        return json.loads(data)
+
+
+class MsgpackCodec:
+    """MessagePack."""
+    codec_id = 2
+
+    @staticmethod
+    def dumps(value: Any) -> bytes:
+        return msgpack.packb(value, use_bin_type=True)
+
+    @staticmethod
+    def loads(data: bytes) -> Any:
+        return msgpack.unpackb(data, raw=False)
+
+
+CODECS: dict[str, type[Codec]] = {
+    'json': JsonCodec,
+    'msgpack': MsgpackCodec,
+}
+CODECS_BY_ID: dict[int, type[Codec]] = {codec.codec_id: codec for codec in CODECS.values()}
+
+
+class CacheSerializer:
+    """Сериализация записей кеша выбранным кодеком со сжатием больших записей."""
+
+    def __init__(self,
+                 codec: str = CACHE_CODEC,
+                 compression_threshold: int = CACHE_COMPRESSION_THRESHOLD) -> None:
+        self.codec = CODECS[codec]
+        self.compression_threshold = compression_threshold
+
+    def dumps(self, value: Any, soft_expires_at: float) -> bytes:
+        """
+        Сериализация значения записи кеша.
+
+        :param value: Готовые байты (например, JSON-ответ эндпоинта) или данные из словарей,
+                      списков, строк и чисел.
+        :param soft_expires_at: Мягкое время истечения записи.
+        :return: Запись для Redis.
+        """
+        flags = 0
+        if isinstance(value, bytes):
+            flags |= FLAG_RAW
+            body = value
+        else:
+            body = self.codec.dumps(value)
+        if len(body) > self.compression_threshold:
+            flags |= FLAG_COMPRESSED
+            body = zlib.compress(body)
+        return HEADER.pack(FORMAT_VERSION, self.codec.codec_id, flags, soft_expires_at) + body
+
+    @staticmethod
+    def loads(data: bytes) -> tuple[Any, float] | None:
+        """
+        Десериализация записи кеша.
+
+        :param data: Запись из Redis.
+        :return: Значение и мягкое время истечения записи или None, если формат записи неизвестен.
+        """
+        if len(data) < HEADER.size:
+            return None
+        version, codec_id, flags, soft_expires_at = HEADER.unpack_from(data)
+        if version != FORMAT_VERSION or codec_id not in CODECS_BY_ID:
+            return None
+        body = data[HEADER.size:]
+        if flags & FLAG_COMPRESSED:
+            body = zlib.decompress(body)
+        if flags & FLAG_RAW:
+            return body, soft_expires_at
+        return CODECS_BY_ID[codec_id].loads(body), soft_expires_at
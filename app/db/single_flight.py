@@ -0,0 +1,112 @@
+"""
+Объединение одновременных загрузок одного ключа кеша (single flight).
+
+Когда запись кеша отсутствует или истекла, все одновременные запросы за ней
+не должны выполнять один и тот же запрос в БД. В пределах воркера запросы
+ожидают результат первого запроса (лидера), а между воркерами лидер выбирается
+короткой блокировкой в Redis: остальные воркеры опрашивают кеш, пока лидер не
+запишет в него значение или не снимет блокировку.
+"""
+import asyncio
+import uuid
+from typing import Any, Awaitable, Callable
+
+from aioredis import Redis
+
+from app.config import SINGLE_FLIGHT_LOCK_TIMEOUT, SINGLE_FLIGHT_POLL_INTERVAL
+
+LOCK_PREFIX = 'cache_lock:'
+
+# Снятие блокировки только ее владельцем
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Загрузки, выполняемые в данном воркере: ключ -> результат лидера
+flights: dict[str, asyncio.Future] = {}
+
+
+async def load_with_lock(redis: Redis,
+                         key: str,
+                         load: Callable[[], Awaitable[Any]],
+                         get_cache: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Загрузка значения под блокировкой Redis.
+
+    Если блокировку удалось взять, значение загружается (load должен записать его в кеш).
+    Иначе кеш опрашивается, пока значение не появится, блокировка не будет снята
+    или не истечет SINGLE_FLIGHT_LOCK_TIMEOUT, после чего значение загружается самостоятельно.
+
+    :param redis: Клиент Redis.
+    :param key: Ключ загрузки.
+    :param load: Загрузка значения из БД с записью в кеш.
+    :param get_cache: Получение значения из кеша.
+    :return: Загруженное значение.
+    """
+    lock_key = f'{LOCK_PREFIX}{key}'
+    token = uuid.uuid4().hex
+    if await redis.set(lock_key, token, nx=True, px=int(SINGLE_FLIGHT_LOCK_TIMEOUT * 1000)):
+        try:
+            return await load()
+        finally:
+            await redis.register_script(RELEASE_LOCK_SCRIPT)(keys=[lock_key], args=[token])
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + SINGLE_FLIGHT_LOCK_TIMEOUT
+    while loop.time() < deadline:
+        await asyncio.sleep(SINGLE_FLIGHT_POLL_INTERVAL)
+        # Лидер пишет значение в кеш до снятия блокировки, поэтому блокировка
+        # проверяется раньше кеша
+        locked = await redis.exists(lock_key)
+        value = await get_cache()
+        if value is not None:
+            return value
+        if not locked:
+            break
+    return await load()
+
+
+async def single_flight(redis: Redis,
+                        key: str,
+                        load: Callable[[], Awaitable[Any]],
+                        get_cache: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Загрузка значения с объединением одновременных запросов.
+
+    Первый запрос за ключом становится лидером, остальные запросы этого воркера
+    получают его результат (или его исключение, например 404).
+
+    :param redis: Клиент Redis.
+    :param key: Ключ загрузки.
+    :param load: Загрузка значения из БД с записью в кеш.
+    :param get_cache: Получение значения из кеша.
+    :return: Загруженное значение.
+    """
+    while key in flights:
+        flight = flights[key]
+        try:
+            return await asyncio.shield(flight)
+        except asyncio.CancelledError:
+            # Если отменен лидер, а не текущий запрос, загрузка начинается заново
+            if not flight.cancelled():
+                raise
+
+    flight = asyncio.get_running_loop().create_future()
+    # Исключение лидера могло никем не ожидаться, помечаем его полученным
+    flight.add_done_callback(lambda done: done.cancelled() or done.exception())
+    flights[key] = flight
+    try:
+        result = await load_with_lock(redis, key, load, get_cache)
+    except asyncio.CancelledError:
+        flight.cancel()
+        raise
+    except Exception as error:
+        flight.set_exception(error)
+        raise
+    finally:
+        del flights[key]
+    flight.set_result(result)
+    return result
@@ -1,8 +1,21 @@
+import asyncio
+import logging
+
 from fastapi import FastAPI
 
+from app.api.menus.routers.admin_routers import admin_router as admin_routers
 from app.api.menus.routers.dish_routers import dish_router as dish_routers
 from app.api.menus.routers.menu_routers import menu_router as menu_routers
 from app.api.menus.routers.submenu_routers import submenu_router as submenu_routers
+from app.api.menus.services.cache_warmup_service import warm_up_cache
+from app.api.middlewares import ConditionalGetMiddleware, ResponseCacheMiddleware
+from app.config import (
+    CACHE_ASGI_RESPONSES,
+    CACHE_RENDERED_RESPONSES,
+    CACHE_WARMUP_ON_STARTUP,
+)
+from app.db.database_connect import get_redis
+from app.db.local_cache import listen_cache_invalidation, local_cache
 
 # from app.config import CELERY_STATUS
 # from app.tasks.tasks import update_base
@@ -42,6 +55,10 @@ tags_metadata = [
         'name': 'Блюда',
         'description': 'Операции с блюдами из подменю.',
     },
+    {
+        'name': 'Администрирование',
+        'description': 'Служебные операции: прогрев кеша, состояние пулов соединений.',
+    },
 ]
 
 app = FastAPI(
@@ -58,6 +75,42 @@ app = FastAPI(
 app.include_router(menu_routers)
 app.include_router(submenu_routers)
 app.include_router(dish_routers)
+app.include_router(admin_routers)
+if CACHE_ASGI_RESPONSES and CACHE_RENDERED_RESPONSES:
+    app.add_middleware(ResponseCacheMiddleware)
+# Добавлен последним, поэтому ETag получают и ответы ResponseCacheMiddleware
+app.add_middleware(ConditionalGetMiddleware)
+
+
+@app.on_event('startup')
+async def start_local_cache_listener():
+    """Запускает прослушивание инвалидации локального кеша воркера, если он включен."""
+    if local_cache:
+        app.state.local_cache_listener = asyncio.create_task(
+            listen_cache_invalidation(get_redis(), local_cache)
+        )
+
+
+@app.on_event('shutdown')
+async def stop_local_cache_listener():
+    """Останавливает прослушивание инвалидации локального кеша."""
+    if local_cache:
+        app.state.local_cache_listener.cancel()
+
+
+async def warm_up_cache_in_background() -> None:
+    """Прогревает кеш, ошибка прогрева не мешает работе приложения."""
+    try:
+        await warm_up_cache()
+    except Exception as error:
+        logging.error(error)
+
+
+@app.on_event('startup')
+async def start_cache_warmup():
+    """Запускает прогрев кеша в фоне, не задерживая запуск приложения."""
+    if CACHE_WARMUP_ON_STARTUP:
+        app.state.cache_warmup = asyncio.create_task(warm_up_cache_in_background())
 
 
 # @app.on_event('startup')
@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import Column, ForeignKey, String
+from sqlalchemy import JSON, Column, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 from app.db.database_connect import Base
@@ -13,12 +13,17 @@ class Menu(Base):
     id = Column(String, primary_key=True, default=str(uuid.uuid4))
     title = Column(String, index=True, nullable=False)
     description = Column(String)
+    # Счетчики поддерживаются триггерами БД (см. миграцию denormalized counters)
+    submenus_count = Column(Integer, nullable=False, server_default='0')
+    dishes_count = Column(Integer, nullable=False, server_default='0')
 
     submenus = relationship('Submenu', back_populates='menu', cascade='all, delete-orphan, delete')
 
 
 class Submenu(Base):
     __tablename__ = 'submenus'
+    # Постраничное чтение подменю меню по ключу (menu_id, id)
+    __table_args__ = (Index('ix_submenus_menu_id_id', 'menu_id', 'id'),)
 
     # id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     id = Column(String, primary_key=True, default=str(uuid.uuid4))
@@ -28,12 +33,16 @@ class Submenu(Base):
     # menu_id = Column(UUID(as_uuid=True), ForeignKey('menus.id'), nullable=False)
     menu_id = Column(String, ForeignKey('menus.id'), nullable=False)
     menu = relationship('Menu', back_populates='submenus')
+    # Счетчик поддерживается триггерами БД (см. миграцию denormalized counters)
+    dishes_count = Column(Integer, nullable=False, server_default='0')
 
     dishes = relationship('Dish', back_populates='submenu', cascade='all, delete-orphan')
 
 
 class Dish(Base):
     __tablename__ = 'dishes'
+    # Постраничное чтение блюд подменю по ключу (submenu_id, id)
+    __table_args__ = (Index('ix_dishes_submenu_id_id', 'submenu_id', 'id'),)
 
     # id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     id = Column(String, primary_key=True, default=str(uuid.uuid4))
@@ -45,3 +54,11 @@ class Dish(Base):
     # submenu_id = Column(UUID(as_uuid=True), ForeignKey('submenus.id'), nullable=False)
     submenu_id = Column(String, ForeignKey('submenus.id'), nullable=False)
     submenu = relationship('Submenu', back_populates='dishes')
+
+
+class MenuSnapshot(Base):
+    """Снимок меню с подменю и блюдами (см. app.db.repositories.menu_snapshot)"""
+    __tablename__ = 'menu_snapshots'
+
+    menu_id = Column(String, ForeignKey('menus.id', ondelete='CASCADE'), primary_key=True)
+    document = Column(JSON, nullable=False)
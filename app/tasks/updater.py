@@ -4,7 +4,7 @@
 
 import requests  # type: ignore[import]
 
-from app.config import BASE_URL
+from app.config import BASE_URL, BATCH_MAX_SIZE
 
 
 class BaseUpdaterRepo:
@@ -90,14 +90,20 @@ class BaseUpdaterRepo:
     ) -> None:
         """
         Выполняет POST-запрос для добавления новых подменю в базу данных (постит новые подменю в базу списком).
-        Принимает данные о подменю в качестве аргумента и отправляет их на сервер.
-        """
-        for submenu in submenus:
-            self.post_submenu(
-                submenu=submenu,
-                menu_id=menu_id,
-            )
-            # print('post_submenus_batch submenu:', submenu)
+        Принимает данные о подменю в качестве аргумента и отправляет их на сервер
+        пакетами по BATCH_MAX_SIZE подменю, каждый пакет записывается одним запросом в БД.
+        """
+        url = f'{BASE_URL}/menus/{menu_id}/submenus/batch'
+        data = [
+            {
+                'id': submenu['id'],
+                'title': submenu['title'],
+                'description': submenu['description'],
+            }
+            for submenu in submenus
+        ]
+        for start in range(0, len(data), BATCH_MAX_SIZE):
+            requests.post(url, json=data[start:start + BATCH_MAX_SIZE])
 
     def post_dish(
             self,
@@ -127,15 +133,21 @@ class BaseUpdaterRepo:
     ) -> None:
         """
         Выполняет POST-запрос для добавления новых блюд в базу данных (постит новые блюда в базу списком).
-        Принимает данные о блюдах в качестве аргумента и отправляет их на сервер.
-        """
-        for dish in dishes:
-            self.post_dish(
-                dish=dish,
-                submenu_id=submenu_id,
-                menu_id=menu_id,
-            )
-            # print('post_dishes_batch dish:', dish)
+        Принимает данные о блюдах в качестве аргумента и отправляет их на сервер
+        пакетами по BATCH_MAX_SIZE блюд, каждый пакет записывается одним запросом в БД.
+        """
+        url = f'{BASE_URL}/menus/{menu_id}/submenus/{submenu_id}/dishes/batch'
+        data = [
+            {
+                'id': dish['id'],
+                'title': dish['title'],
+                'description': dish['description'],
+                'price': dish['price']
+            }
+            for dish in dishes
+        ]
+        for start in range(0, len(data), BATCH_MAX_SIZE):
+            requests.post(url, json=data[start:start + BATCH_MAX_SIZE])
 
     def patch_menu(self, menu: dict[str, str | list]) -> None:
         """
@@ -357,5 +369,17 @@ class BaseUpdaterRepo:
             self.delete_menu(menu_id=menu_id)
 
     def run(self) -> None:
-        """Запустить обновление данных в базе."""
+        """Запустить обновление данных в базе, пересобрать снимки меню и прогреть кеш обновленными данными."""
         self.check_menus()
+        self.rebuild_menu_snapshots()
+        self.warm_up_cache()
+
+    def rebuild_menu_snapshots(self) -> None:
+        """Выполняет POST-запрос для пересборки снимков меню после обновления данных."""
+        url = f'{BASE_URL}/admin/menu_snapshots/rebuild'
+        requests.post(url)
+
+    def warm_up_cache(self) -> None:
+        """Выполняет POST-запрос для прогрева кеша после обновления данных."""
+        url = f'{BASE_URL}/admin/cache/warmup'
+        requests.post(url)
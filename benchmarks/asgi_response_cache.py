@@ -0,0 +1,106 @@
+"""
+Бенчмарк отдачи закешированных GET-ответов из ASGI middleware.
+
+Сравнивается число запросов в секунду при попадании в кеш для GET эндпоинтов меню
+с ResponseCacheMiddleware (ответ отдается до маршрутизации FastAPI) и без него
+(каждый запрос разрешает зависимости эндпоинта, вызывает сервис и CacheRepository).
+БД не используется: все ответы заранее записываются в кеш.
+
+Запуск (Redis должен быть доступен, база BENCHMARK_REDIS_URL будет очищена):
+
+python -m benchmarks.asgi_response_cache
+"""
+import asyncio
+import os
+import time
+from types import SimpleNamespace
+
+from aioredis import Redis
+from httpx import AsyncClient
+from starlette.middleware import Middleware
+
+from app.api.middlewares import ResponseCacheMiddleware
+from app.config import REDIS_URL
+from app.db.cache import CacheRepository
+from app.db.database_connect import get_redis
+from app.main import app
+from benchmarks.full_menu_response import build_full_menu
+
+BENCHMARK_REDIS_URL = os.environ.get(
+    'BENCHMARK_REDIS_URL',
+    REDIS_URL.rsplit('/', 1)[0] + '/15'
+)
+REQUESTS = 2000
+CONCURRENCY = 10
+URL = '/api/v1/menus'
+
+
+async def fill_cache(cache_repo: CacheRepository) -> list[str]:
+    """Запись в кеш ответов эндпоинтов, возвращает их пути."""
+    full_menu = build_full_menu()
+    menu = full_menu[0]
+    submenu = menu.submenus[0]
+    await cache_repo.set_full_restaurant_menu(full_menu)
+    await cache_repo.set_all_menus_cache(full_menu)
+    await cache_repo.set_menu_cache(menu.id, SimpleNamespace(
+        id=menu.id, title=menu.title, description=menu.description,
+        submenus_count=len(menu.submenus), dishes_count=len(submenu.dishes) * len(menu.submenus)
+    ))
+    await cache_repo.set_all_submenus_cache(menu.id, menu.submenus)
+    await cache_repo.set_all_dishes_cache(submenu.id, submenu.dishes, menu.id)
+    await cache_repo.set_dish_cache(menu.id, submenu.id, submenu.dishes[0])
+    return [
+        f'{URL}/full_restaurant_menu',
+        f'{URL}/',
+        f'{URL}/{menu.id}/',
+        f'{URL}/{menu.id}/submenus/',
+        f'{URL}/{menu.id}/submenus/{submenu.id}/dishes/',
+        f'{URL}/{menu.id}/submenus/{submenu.id}/dishes/{submenu.dishes[0].id}/',
+    ]
+
+
+async def measure_rps(client: AsyncClient, url: str) -> float:
+    """Число запросов в секунду к url при CONCURRENCY одновременных клиентах."""
+    async def worker() -> None:
+        for _ in range(REQUESTS // CONCURRENCY):
+            response = await client.get(url)
+            assert response.status_code == 200, url
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(CONCURRENCY)))
+    return REQUESTS // CONCURRENCY * CONCURRENCY / (time.perf_counter() - started)
+
+
+def set_response_cache_middleware(enabled: bool) -> None:
+    """Включение или отключение ResponseCacheMiddleware в приложении."""
+    app.user_middleware = [
+        middleware for middleware in app.user_middleware if middleware.cls is not ResponseCacheMiddleware
+    ]
+    if enabled:
+        # Порядок как в app.main: ResponseCacheMiddleware внутри ConditionalGetMiddleware
+        app.user_middleware.insert(1, Middleware(ResponseCacheMiddleware))
+    app.middleware_stack = app.build_middleware_stack()
+
+
+async def main() -> None:
+    redis = Redis.from_url(BENCHMARK_REDIS_URL)
+    app.dependency_overrides[get_redis] = lambda: redis
+    await redis.flushdb()
+    urls = await fill_cache(CacheRepository(redis_cacher=redis))
+    results = {}
+    async with AsyncClient(app=app, base_url='http://test') as client:
+        for enabled in (False, True):
+            set_response_cache_middleware(enabled)
+            for url in urls:
+                await measure_rps(client, url)
+                results[url, enabled] = await measure_rps(client, url)
+    print(f'{"эндпоинт":>60} | {"без middleware":>14} | {"с middleware":>12} | {"ускорение":>9}')
+    for url in urls:
+        without, with_middleware = results[url, False], results[url, True]
+        print(f'{url:>60} | {without:>14.0f} | {with_middleware:>12.0f} | {with_middleware / without:>8.2f}x')
+    await redis.flushdb()
+    await redis.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
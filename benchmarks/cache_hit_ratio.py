@@ -0,0 +1,123 @@
+"""
+Доля попаданий в кеш по семействам ключей при воспроизведении смеси запросов.
+
+Через приложение создается дерево меню, затем воспроизводится смесь запросов чтения
+всех эндпоинтов с редкими изменениями блюд и подменю. Доля попаданий считается
+по app.db.cache.cache_stats для каждого семейства ключей (см. app.db.cache_keys).
+Семейство, в котором не было ни одного попадания, означает, что запись и чтение
+этого представления расходятся (например, в ссылке на ключ).
+
+Запуск (нужны БД и Redis приложения, созданные меню удаляются в конце):
+
+python -m benchmarks.cache_hit_ratio
+"""
+import asyncio
+import random
+import sys
+import uuid
+
+from httpx import AsyncClient
+
+from app.db.cache import cache_stats
+from app.main import app
+
+MENUS_COUNT = 2
+SUBMENUS_COUNT = 2
+DISHES_COUNT = 3
+REQUESTS_COUNT = 300
+# Доля изменений в смеси запросов
+WRITES_SHARE = 0.05
+URL = '/api/v1/menus'
+
+
+async def create_tree(client: AsyncClient) -> dict[str, dict[str, list[str]]]:
+    """Создание дерева меню: меню -> подменю -> блюда."""
+    tree: dict[str, dict[str, list[str]]] = {}
+    for _ in range(MENUS_COUNT):
+        response = await client.post(
+            f'{URL}/', json={'title': f'Menu {uuid.uuid4()}', 'description': 'Hit ratio'}
+        )
+        menu_id = response.json()['id']
+        tree[menu_id] = {}
+        for _ in range(SUBMENUS_COUNT):
+            response = await client.post(
+                f'{URL}/{menu_id}/submenus/',
+                json={'title': f'Submenu {uuid.uuid4()}', 'description': 'Hit ratio'}
+            )
+            submenu_id = response.json()['id']
+            tree[menu_id][submenu_id] = []
+            for _ in range(DISHES_COUNT):
+                response = await client.post(
+                    f'{URL}/{menu_id}/submenus/{submenu_id}/dishes/',
+                    json={'title': f'Dish {uuid.uuid4()}', 'description': 'Hit ratio', 'price': '10.00'}
+                )
+                tree[menu_id][submenu_id].append(response.json()['id'])
+    return tree
+
+
+async def replay(client: AsyncClient,
+                 tree: dict[str, dict[str, list[str]]],
+                 rng: random.Random) -> None:
+    """Воспроизведение смеси запросов чтения и изменения."""
+    for _ in range(REQUESTS_COUNT):
+        menu_id = rng.choice(list(tree))
+        submenu_id = rng.choice(list(tree[menu_id]))
+        dish_id = rng.choice(tree[menu_id][submenu_id])
+        submenu_url = f'{URL}/{menu_id}/submenus/{submenu_id}'
+        if rng.random() < WRITES_SHARE:
+            if rng.random() < 0.5:
+                await client.patch(
+                    f'{submenu_url}/dishes/{dish_id}/',
+                    json={'title': f'Dish {uuid.uuid4()}', 'description': 'Hit ratio', 'price': '12.00'}
+                )
+            else:
+                await client.patch(
+                    f'{submenu_url}/',
+                    json={'title': f'Submenu {uuid.uuid4()}', 'description': 'Hit ratio'}
+                )
+            continue
+        url = rng.choice([
+            f'{URL}/',
+            f'{URL}/full_restaurant_menu',
+            f'{URL}/{menu_id}/',
+            f'{URL}/{menu_id}/submenus/',
+            f'{submenu_url}/',
+            f'{submenu_url}/dishes/',
+            f'{submenu_url}/dishes/{dish_id}/',
+        ])
+        response = await client.get(url)
+        assert response.status_code == 200, url
+
+
+async def measure_hit_ratios(client: AsyncClient, seed: int = 0) -> dict[str, float]:
+    """
+    Доля попаданий в кеш по семействам ключей.
+
+    :param client: HTTP-клиент приложения.
+    :param seed: Начальное значение генератора смеси запросов.
+    :return: Словарь семейство ключа -> доля попаданий.
+    """
+    tree = await create_tree(client)
+    try:
+        cache_stats.reset()
+        await replay(client, tree, random.Random(seed))
+        return cache_stats.hit_ratios()
+    finally:
+        for menu_id in tree:
+            await client.delete(f'{URL}/{menu_id}/')
+
+
+async def main() -> None:
+    async with AsyncClient(app=app, base_url='http://test') as client:
+        hit_ratios = await measure_hit_ratios(client)
+    print(f'{"семейство":>10} | {"попаданий":>10} | {"промахов":>9} | {"доля":>7}')
+    for family, ratio in hit_ratios.items():
+        print(f'{family:>10} | {cache_stats.hits[family]:>10} | {cache_stats.misses[family]:>9} | {ratio:>7.1%}')
+    never_hit = [family for family, ratio in hit_ratios.items() if ratio == 0]
+    if never_hit:
+        print(f'Нет попаданий в кеш: {", ".join(never_hit)}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
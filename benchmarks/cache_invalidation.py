@@ -0,0 +1,90 @@
+"""
+Бенчмарк инвалидации кеша.
+
+Сравнивается старая схема инвалидации (KEYS по маске и удаление ключей по одному)
+с инвалидацией через счетчик поколений меню из app.db.cache.CacheRepository при росте
+общего количества ключей в Redis. Инвалидируется одно и то же поддерево меню,
+меняется только количество посторонних ключей.
+
+Запуск (Redis должен быть доступен, база BENCHMARK_REDIS_URL будет очищена):
+
+python -m benchmarks.cache_invalidation
+"""
+import asyncio
+import os
+import time
+
+from aioredis import Redis
+
+from app.config import REDIS_URL
+from app.db.cache import CacheRepository
+from app.db.cache_keys import dish_link, dishes_link, menu_link, submenu_link
+
+BENCHMARK_REDIS_URL = os.environ.get(
+    'BENCHMARK_REDIS_URL',
+    REDIS_URL.rsplit('/', 1)[0] + '/15'
+)
+KEYSPACE_SIZES = (1_000, 10_000, 100_000)
+SUBMENUS_COUNT = 10
+DISHES_COUNT = 10
+ROUNDS = 20
+TARGET_MENU_ID = 'target'
+
+
+async def legacy_delete_cache_by_mask(redis: Redis, link: str) -> None:
+    """Старая схема инвалидации: KEYS по маске и удаление ключей по одному."""
+    for key in await redis.keys(link + '*'):
+        await redis.delete(key)
+
+
+async def fill_keyspace(redis: Redis, size: int) -> None:
+    """Заполнение Redis посторонними ключами других меню."""
+    for start in range(0, size, 10_000):
+        async with redis.pipeline(transaction=False) as pipe:
+            for index in range(start, min(start + 10_000, size)):
+                pipe.set(f'/menus/other-{index}', b'x')
+            await pipe.execute()
+
+
+async def fill_target_menu(cache_repo: CacheRepository) -> None:
+    """Кеширование поддерева меню, которое будет инвалидироваться."""
+    links = [menu_link(TARGET_MENU_ID)]
+    for submenu in map(str, range(SUBMENUS_COUNT)):
+        links += [submenu_link(TARGET_MENU_ID, submenu), dishes_link(TARGET_MENU_ID, submenu)]
+        links += [dish_link(TARGET_MENU_ID, submenu, str(dish)) for dish in range(DISHES_COUNT)]
+    for key in await cache_repo.get_keys(*links):
+        await cache_repo.redis_cacher.set(key, b'x')
+
+
+async def measure(cache_repo: CacheRepository, legacy: bool) -> float:
+    """Среднее время инвалидации поддерева меню в миллисекундах."""
+    elapsed = 0.0
+    for _ in range(ROUNDS):
+        await fill_target_menu(cache_repo)
+        started = time.perf_counter()
+        if legacy:
+            await legacy_delete_cache_by_mask(
+                cache_repo.redis_cacher, f'*/menus/{TARGET_MENU_ID}'
+            )
+        else:
+            await cache_repo.invalidate(menu_ids=[TARGET_MENU_ID])
+        elapsed += time.perf_counter() - started
+    return elapsed / ROUNDS * 1000
+
+
+async def main() -> None:
+    redis = Redis.from_url(BENCHMARK_REDIS_URL)
+    cache_repo = CacheRepository(redis_cacher=redis)
+    print(f'{"ключей в Redis":>15} | {"KEYS + DEL, мс":>15} | {"поколения, мс":>14}')
+    for size in KEYSPACE_SIZES:
+        await redis.flushdb()
+        await fill_keyspace(redis, size)
+        legacy_ms = await measure(cache_repo, legacy=True)
+        generations_ms = await measure(cache_repo, legacy=False)
+        print(f'{size:>15} | {legacy_ms:>15.2f} | {generations_ms:>14.2f}')
+    await redis.flushdb()
+    await redis.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,59 @@
+"""
+Бенчмарк форматов записей кеша.
+
+Для полного меню ресторана из объектов БД сравниваются размер записи и время
+сериализации и десериализации: pickle объектов БД (прежний формат) и форматы
+app.db.serializers.CacheSerializer для разных кодеков, со сжатием и без,
+для данных ответа и готового JSON-ответа (app.config.CACHE_RENDERED_RESPONSES).
+
+Запуск (Redis и БД не нужны):
+
+python -m benchmarks.cache_serialization
+"""
+import pickle
+import time
+from typing import Any, Callable
+
+from app.db.cache import RESPONSE_ADAPTERS
+from app.db.serializers import CODECS, CacheSerializer
+from benchmarks.full_menu_response import build_full_menu
+
+ROUNDS = 50
+NO_COMPRESSION = 2 ** 63
+
+
+def measure(dumps: Callable[[], bytes], loads: Callable[[bytes], Any]) -> tuple[int, float, float]:
+    """Размер записи в байтах и среднее время сериализации и десериализации в миллисекундах."""
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        data = dumps()
+    dumps_ms = (time.perf_counter() - started) / ROUNDS * 1000
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        loads(data)
+    loads_ms = (time.perf_counter() - started) / ROUNDS * 1000
+    return len(data), dumps_ms, loads_ms
+
+
+def main() -> None:
+    full_menu = build_full_menu()
+    adapter = RESPONSE_ADAPTERS['full_menu']
+    response = adapter.validate_python(full_menu, from_attributes=True)
+    # Готовый JSON-ответ записывается как есть, кодек влияет только на данные ответа
+    values = [(f'данные, {codec}', codec, adapter.dump_python(response, mode='json')) for codec in CODECS]
+    values.append(('JSON-ответ', 'msgpack', adapter.dump_json(response)))
+    results = {
+        'pickle объектов БД': measure(lambda: pickle.dumps(full_menu), pickle.loads),
+    }
+    for value_name, codec, value in values:
+        for compressed in (False, True):
+            serializer = CacheSerializer(codec, 0 if compressed else NO_COMPRESSION)
+            name = f'{value_name}{" + zlib" if compressed else ""}'
+            results[name] = measure(lambda: serializer.dumps(value, 0.0), serializer.loads)
+    print(f'{"формат":>28} | {"размер, байт":>12} | {"запись, мс":>10} | {"чтение, мс":>10}')
+    for name, (size, dumps_ms, loads_ms) in results.items():
+        print(f'{name:>28} | {size:>12} | {dumps_ms:>10.3f} | {loads_ms:>10.3f}')
+
+
+if __name__ == '__main__':
+    main()
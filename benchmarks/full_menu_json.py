@@ -0,0 +1,130 @@
+"""
+Бенчмарк получения полного меню ресторана.
+
+Сравнивается получение JSON-ответа полного меню:
+загрузка объектов моделей с selectinload, валидация MenuFullResponse и кодирование в JSON
+(AsyncMenuRepository.get_full_restaurant_menu) и JSON-документ, собранный БД одним запросом
+с json_agg (AsyncMenuRepository.get_full_restaurant_menu_json).
+Для каждого размера меню замеряются медианное время и пик памяти Python (tracemalloc),
+заодно проверяется, что оба ответа совпадают.
+
+Запуск (нужна БД приложения с примененными миграциями, созданные меню удаляются после каждого размера):
+
+python -m benchmarks.full_menu_json
+python -m benchmarks.full_menu_json 10000 100000
+"""
+import asyncio
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+import uuid
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import delete, insert, select
+
+from app.db.cache import RESPONSE_ADAPTERS
+from app.db.database_connect import LazySession
+from app.db.repositories.menu_repository import AsyncMenuRepository
+from app.models.domain.menus_models import Dish, Menu, Submenu
+
+MENUS_COUNT = 10
+SUBMENUS_COUNT = 10
+# Общее количество блюд по умолчанию, блюда делятся поровну между всеми подменю
+DISHES_COUNTS = (10_000, 100_000, 1_000_000)
+# Строк в одном INSERT при создании блюд
+INSERT_CHUNK_SIZE = 10_000
+REPEATS = 5
+
+
+async def create_menus(lazy_session: LazySession, dishes_count: int) -> list[str]:
+    """Создание меню с подменю и dishes_count блюдами, возвращает ID меню."""
+    session = lazy_session.session
+    menu_ids = [str(uuid.uuid4()) for _ in range(MENUS_COUNT)]
+    await session.execute(insert(Menu), [
+        {'id': menu_id, 'title': f'Menu {menu_id}', 'description': 'Full menu'} for menu_id in menu_ids
+    ])
+    submenus = [
+        {'id': str(uuid.uuid4()), 'title': f'Submenu {uuid.uuid4()}', 'description': 'Full menu', 'menu_id': menu_id}
+        for menu_id in menu_ids for _ in range(SUBMENUS_COUNT)
+    ]
+    await session.execute(insert(Submenu), submenus)
+    dishes = [
+        {'id': str(uuid.uuid4()), 'title': f'Dish {uuid.uuid4()}', 'description': 'Full menu',
+         'price': '10.00', 'submenu_id': submenu['id']}
+        for submenu in submenus for _ in range(dishes_count // len(submenus))
+    ]
+    for start in range(0, len(dishes), INSERT_CHUNK_SIZE):
+        await session.execute(insert(Dish), dishes[start:start + INSERT_CHUNK_SIZE])
+    await session.commit()
+    return menu_ids
+
+
+async def delete_menus(lazy_session: LazySession, menu_ids: list[str]) -> None:
+    """Удаление созданных меню с подменю и блюдами."""
+    session = lazy_session.session
+    submenu_ids = select(Submenu.id).where(Submenu.menu_id.in_(menu_ids))
+    await session.execute(delete(Dish).where(Dish.submenu_id.in_(submenu_ids)))
+    await session.execute(delete(Submenu).where(Submenu.menu_id.in_(menu_ids)))
+    await session.execute(delete(Menu).where(Menu.id.in_(menu_ids)))
+    await session.commit()
+
+
+async def read_orm(menu_repo: AsyncMenuRepository) -> bytes:
+    """JSON-ответ из объектов моделей, как при FULL_MENU_JSON_FROM_DB=false."""
+    adapter = RESPONSE_ADAPTERS['full_menu']
+    menus = await menu_repo.get_full_restaurant_menu()
+    # Объекты не должны оставаться в сессии между повторами замера
+    menu_repo.read_session.expunge_all()
+    return adapter.dump_json(adapter.validate_python(menus, from_attributes=True))
+
+
+async def measure(read: Callable[[], Awaitable[Any]]) -> tuple[float, float]:
+    """Медианное время запроса в миллисекундах и пик памяти в мегабайтах."""
+    timings = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        await read()
+        timings.append((time.perf_counter() - started) * 1000)
+    tracemalloc.start()
+    await read()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings), peak / 1024 / 1024
+
+
+def sort_menus(menus: list[dict]) -> list[dict]:
+    """Меню, подменю и блюда в порядке ID для сравнения ответов."""
+    for menu in menus:
+        for submenu in menu['submenus']:
+            submenu['dishes'].sort(key=lambda dish: dish['id'])
+        menu['submenus'].sort(key=lambda submenu: submenu['id'])
+    return sorted(menus, key=lambda menu: menu['id'])
+
+
+async def main(dishes_counts: tuple[int, ...]) -> None:
+    results = {}
+    for dishes_count in dishes_counts:
+        async with LazySession() as lazy_session:
+            menu_ids = await create_menus(lazy_session, dishes_count)
+            try:
+                menu_repo = AsyncMenuRepository(lazy_session)
+                assert sort_menus(json.loads(await read_orm(menu_repo))) == sort_menus(
+                    json.loads(await menu_repo.get_full_restaurant_menu_json())
+                ), 'JSON из БД не совпадает с ответом из объектов моделей'
+                results[dishes_count] = (
+                    await measure(lambda: read_orm(menu_repo)),
+                    await measure(menu_repo.get_full_restaurant_menu_json),
+                )
+            finally:
+                await delete_menus(lazy_session, menu_ids)
+    print(f'{"блюд":>9} | {"модели, мс":>10} | {"модели, МБ":>10} | {"json_agg, мс":>12} | '
+          f'{"json_agg, МБ":>12} | {"ускорение":>9}')
+    for dishes_count, ((orm_time, orm_memory), (json_time, json_memory)) in results.items():
+        print(f'{dishes_count:>9} | {orm_time:>10.1f} | {orm_memory:>10.1f} | {json_time:>12.1f} | '
+              f'{json_memory:>12.1f} | {orm_time / json_time:>8.1f}x')
+
+
+if __name__ == '__main__':
+    asyncio.run(main(tuple(map(int, sys.argv[1:])) or DISHES_COUNTS))
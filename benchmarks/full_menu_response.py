@@ -0,0 +1,100 @@
+"""
+Бенчмарк попадания в кеш эндпоинта полного меню ресторана.
+
+Сравнивается время ответа GET /api/v1/menus/full_restaurant_menu при попадании в кеш
+для двух форматов записей кеша (app.config.CACHE_RENDERED_RESPONSES):
+данные ответа, которые на каждый запрос десериализуются, валидируются моделью ответа
+и кодируются в JSON, и готовые JSON-ответы.
+
+Запуск (Redis должен быть доступен, база BENCHMARK_REDIS_URL будет очищена):
+
+python -m benchmarks.full_menu_response
+"""
+import asyncio
+import os
+import statistics
+import time
+
+from aioredis import Redis
+from httpx import AsyncClient
+
+from app.config import REDIS_URL
+from app.db import cache
+from app.db.cache import CacheRepository
+from app.db.cache_keys import full_menu_link
+from app.db.database_connect import get_redis
+from app.main import app
+from app.models.domain.menus_models import Dish, Menu, Submenu
+
+BENCHMARK_REDIS_URL = os.environ.get(
+    'BENCHMARK_REDIS_URL',
+    REDIS_URL.rsplit('/', 1)[0] + '/15'
+)
+MENUS_COUNT = 10
+SUBMENUS_COUNT = 10
+DISHES_COUNT = 10
+REQUESTS = 500
+URL = '/api/v1/menus/full_restaurant_menu'
+
+
+def build_full_menu() -> list[Menu]:
+    """Построение полного меню ресторана из объектов БД без обращения к БД."""
+    menus = []
+    for menu_index in range(MENUS_COUNT):
+        menu = Menu(id=f'menu-{menu_index}', title=f'Меню {menu_index}', description='Описание меню')
+        for submenu_index in range(SUBMENUS_COUNT):
+            submenu = Submenu(
+                id=f'submenu-{menu_index}-{submenu_index}',
+                title=f'Подменю {submenu_index}',
+                description='Описание подменю',
+                menu_id=menu.id,
+            )
+            submenu.dishes = [
+                Dish(
+                    id=f'dish-{menu_index}-{submenu_index}-{dish_index}',
+                    title=f'Блюдо {dish_index}',
+                    description='Описание блюда',
+                    price='100.50',
+                    submenu_id=submenu.id,
+                )
+                for dish_index in range(DISHES_COUNT)
+            ]
+            menu.submenus.append(submenu)
+        menus.append(menu)
+    return menus
+
+
+async def measure(client: AsyncClient) -> list[float]:
+    """Время ответов эндпоинта в миллисекундах."""
+    timings = []
+    for _ in range(REQUESTS):
+        started = time.perf_counter()
+        response = await client.get(URL)
+        timings.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200
+    return timings
+
+
+async def main() -> None:
+    redis = Redis.from_url(BENCHMARK_REDIS_URL)
+    app.dependency_overrides[get_redis] = lambda: redis
+    full_menu = build_full_menu()
+    print(f'{"формат кеша":>12} | {"среднее, мс":>11} | {"p50, мс":>8} | {"p99, мс":>8} | {"размер, байт":>12}')
+    async with AsyncClient(app=app, base_url='http://test') as client:
+        for rendered in (False, True):
+            await redis.flushdb()
+            cache.CACHE_RENDERED_RESPONSES = rendered
+            cache_repo = CacheRepository(redis_cacher=redis)
+            await cache_repo.set_full_restaurant_menu(full_menu)
+            key, = await cache_repo.get_keys(full_menu_link())
+            size = await redis.strlen(key)
+            await measure(client)
+            timings = sorted(await measure(client))
+            print(f'{"JSON" if rendered else "данные":>12} | {statistics.mean(timings):>11.2f} | '
+                  f'{timings[len(timings) // 2]:>8.2f} | {timings[int(len(timings) * 0.99)]:>8.2f} | {size:>12}')
+    await redis.flushdb()
+    await redis.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,124 @@
+"""
+Бенчмарк чтения счетчиков подменю и блюд меню.
+
+Сравнивается время запросов списка меню и меню по ID со счетчиками:
+подсчет COUNT по соединению меню -> подменю -> блюда (как было до денормализации)
+и чтение счетчиков, которые поддерживаются триггерами БД (AsyncMenuRepository).
+Заодно проверяется, что счетчики совпадают с подсчетом по соединению.
+
+Запуск (нужна БД приложения с примененными миграциями, созданные меню удаляются в конце):
+
+python -m benchmarks.menu_counters
+"""
+import asyncio
+import statistics
+import time
+import uuid
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import delete, distinct, func, insert, select
+
+from app.db.database_connect import LazySession
+from app.db.repositories.menu_repository import AsyncMenuRepository
+from app.models.domain.menus_models import Dish, Menu, Submenu
+
+MENUS_COUNT = 10
+SUBMENUS_COUNT = 10
+# Блюд в каждом подменю: в каждом меню SUBMENUS_COUNT * DISHES_COUNT блюд
+DISHES_COUNT = 300
+REPEATS = 50
+
+
+def join_counts_query():
+    """Подсчет счетчиков всех меню по соединению с подменю и блюдами."""
+    return (
+        select(
+            Menu.id,
+            Menu.title,
+            Menu.description,
+            func.count(distinct(Submenu.id)).label('submenus_count'),
+            func.count(distinct(Dish.id)).label('dishes_count')
+        )
+        .outerjoin(Submenu, Menu.id == Submenu.menu_id)
+        .outerjoin(Dish, Submenu.id == Dish.submenu_id)
+        .group_by(Menu.id)
+    )
+
+
+async def create_menus(lazy_session: LazySession) -> list[str]:
+    """Создание меню с подменю и блюдами, возвращает ID меню."""
+    session = lazy_session.session
+    menu_ids = [str(uuid.uuid4()) for _ in range(MENUS_COUNT)]
+    await session.execute(insert(Menu), [
+        {'id': menu_id, 'title': f'Menu {menu_id}', 'description': 'Counters'} for menu_id in menu_ids
+    ])
+    submenus = [
+        {'id': str(uuid.uuid4()), 'title': f'Submenu {uuid.uuid4()}', 'description': 'Counters', 'menu_id': menu_id}
+        for menu_id in menu_ids for _ in range(SUBMENUS_COUNT)
+    ]
+    await session.execute(insert(Submenu), submenus)
+    await session.execute(insert(Dish), [
+        {'id': str(uuid.uuid4()), 'title': f'Dish {uuid.uuid4()}', 'description': 'Counters',
+         'price': '10.00', 'submenu_id': submenu['id']}
+        for submenu in submenus for _ in range(DISHES_COUNT)
+    ])
+    await session.commit()
+    return menu_ids
+
+
+async def delete_menus(lazy_session: LazySession, menu_ids: list[str]) -> None:
+    """Удаление созданных меню с подменю и блюдами."""
+    session = lazy_session.session
+    submenu_ids = select(Submenu.id).where(Submenu.menu_id.in_(menu_ids))
+    await session.execute(delete(Dish).where(Dish.submenu_id.in_(submenu_ids)))
+    await session.execute(delete(Submenu).where(Submenu.menu_id.in_(menu_ids)))
+    await session.execute(delete(Menu).where(Menu.id.in_(menu_ids)))
+    await session.commit()
+
+
+async def measure(read: Callable[[], Awaitable[Any]]) -> float:
+    """Медианное время запроса в миллисекундах."""
+    timings = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        await read()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+async def main() -> None:
+    async with LazySession() as lazy_session:
+        menu_ids = await create_menus(lazy_session)
+        try:
+            menu_repo = AsyncMenuRepository(lazy_session)
+            session = lazy_session.session
+            join_counts = {
+                row.id: (row.submenus_count, row.dishes_count)
+                for row in (await session.execute(join_counts_query())).all()
+            }
+            counters = {
+                row.id: (row.submenus_count, row.dishes_count) for row in await menu_repo.read_all_menus()
+            }
+            assert counters == join_counts, 'Счетчики не совпадают с подсчетом по соединению'
+
+            menu_id = menu_ids[0]
+            results = {
+                'список меню': (
+                    await measure(lambda: session.execute(join_counts_query())),
+                    await measure(menu_repo.read_all_menus),
+                ),
+                'меню по ID': (
+                    await measure(lambda: session.execute(join_counts_query().where(Menu.id == menu_id))),
+                    await measure(lambda: menu_repo.read_menu(menu_id)),
+                ),
+            }
+        finally:
+            await delete_menus(lazy_session, menu_ids)
+    print(f'Блюд в каждом меню: {SUBMENUS_COUNT * DISHES_COUNT}')
+    print(f'{"запрос":>12} | {"COUNT по соединению, мс":>23} | {"счетчики, мс":>12} | {"ускорение":>9}')
+    for name, (join_time, counters_time) in results.items():
+        print(f'{name:>12} | {join_time:>23.2f} | {counters_time:>12.2f} | {join_time / counters_time:>8.1f}x')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
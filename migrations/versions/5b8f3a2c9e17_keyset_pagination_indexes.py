@@ -0,0 +1,27 @@
+"""keyset pagination indexes
+
+Revision ID: 5b8f3a2c9e17
+Revises: 9c2e7d41a6b3
+Create Date: 2026-10-18 17:42:05.903214
+
+Страницы подменю и блюд читаются по ключу (WHERE menu_id = ? AND id > курсор ORDER BY id LIMIT n),
+составные индексы отдают такую страницу без сортировки. Запросы по внешнему ключу (в т.ч. триггеры
+счетчиков) используют префикс этих индексов, поэтому отдельные индексы по menu_id и submenu_id не нужны.
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '5b8f3a2c9e17'
+down_revision = '9c2e7d41a6b3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_submenus_menu_id_id', 'submenus', ['menu_id', 'id'], unique=False)
+    op.create_index('ix_dishes_submenu_id_id', 'dishes', ['submenu_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_dishes_submenu_id_id', table_name='dishes')
+    op.drop_index('ix_submenus_menu_id_id', table_name='submenus')
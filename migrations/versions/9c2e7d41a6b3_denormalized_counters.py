@@ -0,0 +1,96 @@
+"""denormalized counters
+
+Revision ID: 9c2e7d41a6b3
+Revises: 4df16c0d873f
+Create Date: 2026-10-18 15:10:12.481516
+
+Счетчики подменю и блюд хранятся в menus.submenus_count, menus.dishes_count и
+submenus.dishes_count и поддерживаются триггерами в той же транзакции, что и изменение:
+- изменение блюд меняет submenus.dishes_count;
+- изменение подменю (в т.ч. его dishes_count) меняет счетчики меню.
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '9c2e7d41a6b3'
+down_revision = '4df16c0d873f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('menus', sa.Column('submenus_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('menus', sa.Column('dishes_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('submenus', sa.Column('dishes_count', sa.Integer(), server_default='0', nullable=False))
+
+    op.execute("""
+        UPDATE submenus SET dishes_count = (
+            SELECT count(*) FROM dishes WHERE dishes.submenu_id = submenus.id
+        )
+    """)
+    op.execute("""
+        UPDATE menus SET
+            submenus_count = (SELECT count(*) FROM submenus WHERE submenus.menu_id = menus.id),
+            dishes_count = (SELECT coalesce(sum(dishes_count), 0) FROM submenus WHERE submenus.menu_id = menus.id)
+    """)
+
+    op.execute("""
+        CREATE FUNCTION dishes_update_counters() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('DELETE', 'UPDATE') THEN
+                UPDATE submenus SET dishes_count = dishes_count - 1 WHERE id = OLD.submenu_id;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                UPDATE submenus SET dishes_count = dishes_count + 1 WHERE id = NEW.submenu_id;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER dishes_counters_insert_delete AFTER INSERT OR DELETE ON dishes
+        FOR EACH ROW EXECUTE FUNCTION dishes_update_counters()
+    """)
+    op.execute("""
+        CREATE TRIGGER dishes_counters_move AFTER UPDATE OF submenu_id ON dishes
+        FOR EACH ROW WHEN (OLD.submenu_id IS DISTINCT FROM NEW.submenu_id)
+        EXECUTE FUNCTION dishes_update_counters()
+    """)
+
+    op.execute("""
+        CREATE FUNCTION submenus_update_counters() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('DELETE', 'UPDATE') THEN
+                UPDATE menus SET submenus_count = submenus_count - 1, dishes_count = dishes_count - OLD.dishes_count
+                WHERE id = OLD.menu_id;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                UPDATE menus SET submenus_count = submenus_count + 1, dishes_count = dishes_count + NEW.dishes_count
+                WHERE id = NEW.menu_id;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER submenus_counters_insert_delete AFTER INSERT OR DELETE ON submenus
+        FOR EACH ROW EXECUTE FUNCTION submenus_update_counters()
+    """)
+    op.execute("""
+        CREATE TRIGGER submenus_counters_update AFTER UPDATE OF menu_id, dishes_count ON submenus
+        FOR EACH ROW WHEN (OLD.menu_id IS DISTINCT FROM NEW.menu_id OR OLD.dishes_count <> NEW.dishes_count)
+        EXECUTE FUNCTION submenus_update_counters()
+    """)
+
+
+def downgrade() -> None:
+    op.execute('DROP TRIGGER submenus_counters_update ON submenus')
+    op.execute('DROP TRIGGER submenus_counters_insert_delete ON submenus')
+    op.execute('DROP FUNCTION submenus_update_counters()')
+    op.execute('DROP TRIGGER dishes_counters_move ON dishes')
+    op.execute('DROP TRIGGER dishes_counters_insert_delete ON dishes')
+    op.execute('DROP FUNCTION dishes_update_counters()')
+    op.drop_column('submenus', 'dishes_count')
+    op.drop_column('menus', 'dishes_count')
+    op.drop_column('menus', 'submenus_count')
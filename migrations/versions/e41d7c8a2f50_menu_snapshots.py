@@ -0,0 +1,58 @@
+"""menu snapshots
+
+Revision ID: e41d7c8a2f50
+Revises: 5b8f3a2c9e17
+Create Date: 2026-10-18 19:05:37.214690
+
+Снимки меню с подменю и блюдами для полного меню ресторана (см. app.db.repositories.menu_snapshot).
+Снимки существующих меню собираются тем же документом, что и в приложении.
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'e41d7c8a2f50'
+down_revision = '5b8f3a2c9e17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'menu_snapshots',
+        sa.Column('menu_id', sa.String(), nullable=False),
+        sa.Column('document', sa.JSON(), nullable=False),
+        sa.ForeignKeyConstraint(['menu_id'], ['menus.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('menu_id')
+    )
+    op.execute("""
+        INSERT INTO menu_snapshots (menu_id, document)
+        SELECT menus.id, json_build_object(
+            'title', menus.title,
+            'description', menus.description,
+            'id', menus.id,
+            'submenus', (
+                SELECT coalesce(json_agg(json_build_object(
+                    'title', submenus.title,
+                    'description', submenus.description,
+                    'id', submenus.id,
+                    'menu_id', submenus.menu_id,
+                    'dishes', (
+                        SELECT coalesce(json_agg(json_build_object(
+                            'title', dishes.title,
+                            'description', dishes.description,
+                            'price', dishes.price,
+                            'id', dishes.id
+                        ) ORDER BY dishes.id), '[]'::json)
+                        FROM dishes WHERE dishes.submenu_id = submenus.id
+                    )
+                ) ORDER BY submenus.id), '[]'::json)
+                FROM submenus WHERE submenus.menu_id = menus.id
+            )
+        )
+        FROM menus
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('menu_snapshots')
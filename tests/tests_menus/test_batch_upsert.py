@@ -0,0 +1,65 @@
+"""Пакетное создание и изменение меню, подменю и блюд."""
+from http import HTTPStatus
+
+import pytest
+from httpx import AsyncClient
+
+from app.api.menus.routers.dish_routers import read_all_dishes, upsert_dishes
+from app.api.menus.routers.menu_routers import delete_menu, read_menu, upsert_menus
+from app.api.menus.routers.submenu_routers import read_submenu, upsert_submenus
+from app.config import BATCH_MAX_SIZE
+from app.main import app
+from tests.tests_menus.service import reverse
+
+
+class TestBatchUpsert:
+    @pytest.mark.asyncio
+    async def test_upsert_batches(self) -> None:
+        """Пакеты создают новые записи, изменяют существующие и обновляют закешированные ответы."""
+        async with AsyncClient(app=app, base_url='http://test') as client:
+            response = await client.post(reverse(upsert_menus),
+                                         json=[{'title': 'Batch menu', 'description': 'Batch'}])
+            assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
+            menu_id = response.json()[0]['id']
+            try:
+                submenus_url = reverse(upsert_submenus, menu_id=menu_id)
+                response = await client.post(submenus_url, json=[
+                    {'title': f'Batch submenu {index}', 'description': 'Batch'} for index in range(3)
+                ])
+                assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
+                submenu_ids = [submenu['id'] for submenu in response.json()]
+                assert len(submenu_ids) == 3, 'Созданы не все подменю'
+                assert (await client.get(reverse(read_menu, menu_id=menu_id))).json()['submenus_count'] == 3, \
+                    'Счетчик подменю не учел пакет'
+
+                submenu_id = submenu_ids[0]
+                dishes_url = reverse(upsert_dishes, menu_id=menu_id, submenu_id=submenu_id)
+                response = await client.post(dishes_url, json=[
+                    {'title': f'Batch dish {index}', 'description': 'Batch', 'price': '10.00'} for index in range(5)
+                ])
+                dishes = response.json()
+                assert len(dishes) == 5, 'Созданы не все блюда'
+                read_dishes_url = reverse(read_all_dishes, menu_id=menu_id, submenu_id=submenu_id)
+                assert len((await client.get(read_dishes_url)).json()) == 5, 'Список блюд не учел пакет'
+
+                response = await client.post(dishes_url, json=[
+                    {'id': dishes[0]['id'], 'title': 'Updated dish', 'description': 'Batch', 'price': '20.00'},
+                    {'title': 'New dish', 'description': 'Batch', 'price': '30.00'},
+                ])
+                assert [dish['title'] for dish in response.json()] == ['Updated dish', 'New dish'], \
+                    'Пакет не изменил существующее блюдо или не создал новое'
+                titles = {dish['title'] for dish in (await client.get(read_dishes_url)).json()}
+                assert 'Updated dish' in titles and 'New dish' in titles, \
+                    'Закешированный список блюд не обновился после пакета'
+                submenu = (await client.get(reverse(read_submenu, menu_id=menu_id, submenu_id=submenu_id))).json()
+                assert submenu['dishes_count'] == 6, 'Счетчик блюд не учел пакет'
+
+                response = await client.post(reverse(upsert_submenus, menu_id='unknown-menu'),
+                                             json=[{'title': 'Orphan submenu', 'description': 'Batch'}])
+                assert response.status_code == HTTPStatus.NOT_FOUND, 'Подменю создано в несуществующем меню'
+                response = await client.post(submenus_url, json=[
+                    {'title': 'Batch submenu', 'description': 'Batch'}
+                ] * (BATCH_MAX_SIZE + 1))
+                assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY, 'Пакет больше BATCH_MAX_SIZE принят'
+            finally:
+                await client.delete(reverse(delete_menu, menu_id=menu_id))
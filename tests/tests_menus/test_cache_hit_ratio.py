@@ -0,0 +1,147 @@
+"""
+Доля попаданий в кеш при смешанной нагрузке чтения и записи.
+
+Через приложение проверяется, что в каждом семействе ключей есть попадания в кеш
+(см. benchmarks/cache_hit_ratio.py).
+
+Для CacheRepository после каждого изменения (создание и изменение блюд, изменение
+подменю и меню) читаются все представления меню, при промахе значение записывается
+в кеш, как это делают сервисы. Точная инвалидация по CACHE_DEPENDENCIES сравнивается
+с прежними правилами, по которым любое изменение внутри меню инвалидировало
+весь кеш этого меню.
+"""
+import random
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from httpx import AsyncClient
+
+from app.config import CACHE_TTL
+from app.db.cache import CacheBatch, CacheRepository
+from app.db.cache_keys import (
+    dish_link,
+    full_menu_link,
+    get_menu_generation_key,
+    menu_link,
+    menus_link,
+    submenu_link,
+    submenus_link,
+)
+from app.db.database_connect import get_redis
+from app.main import app
+from benchmarks.cache_hit_ratio import measure_hit_ratios
+
+MENUS_COUNT = 3
+SUBMENUS_COUNT = 3
+DISHES_COUNT = 3
+WRITES_COUNT = 30
+
+
+class CoarseCacheRepository(CacheRepository):
+    """Прежние правила: любое изменение внутри меню инвалидирует весь кеш меню."""
+
+    def add_dependents(self,
+                       batch: CacheBatch,
+                       entity: str,
+                       action: str,
+                       **ids: str) -> None:
+        batch.delete(menus_link(), full_menu_link())
+        batch.incr(get_menu_generation_key(ids['menu_id']))
+
+
+def build_tree() -> dict[str, dict[str, list[str]]]:
+    """Дерево ID: меню -> подменю -> блюда."""
+    return {
+        str(uuid.uuid4()): {
+            str(uuid.uuid4()): [str(uuid.uuid4()) for _ in range(DISHES_COUNT)]
+            for _ in range(SUBMENUS_COUNT)
+        }
+        for _ in range(MENUS_COUNT)
+    }
+
+
+def make_dish(dish_id: str) -> SimpleNamespace:
+    return SimpleNamespace(id=dish_id, title='Dish', description='Dish', price='10.00')
+
+
+async def read_all(cache_repo: CacheRepository,
+                   tree: dict[str, dict[str, list[str]]]) -> tuple[int, int]:
+    """Чтение всех представлений с записью в кеш при промахе."""
+    hits = total = 0
+    links = {
+        menus_link(): [],
+        full_menu_link(): [],
+    }
+    for menu_id, submenus in tree.items():
+        links[menu_link(menu_id)] = SimpleNamespace(
+            id=menu_id, title='Menu', description='Menu', submenus_count=0, dishes_count=0
+        )
+        links[submenus_link(menu_id)] = []
+        for submenu_id, dishes in submenus.items():
+            links[submenu_link(menu_id, submenu_id)] = SimpleNamespace(
+                id=submenu_id, title='Submenu', description='Submenu', dishes_count=0
+            )
+            for dish_id in dishes:
+                links[dish_link(menu_id, submenu_id, dish_id)] = make_dish(dish_id)
+    for (link, value), cache in zip(links.items(), await cache_repo.get_many_cache(*links)):
+        total += 1
+        if cache is not None:
+            hits += 1
+        else:
+            await cache_repo.set_cache(link, value)
+    for menu_id, submenus in tree.items():
+        for submenu_id, dishes in submenus.items():
+            total += 1
+            if await cache_repo.get_all_dishes_cache(menu_id, submenu_id) is not None:
+                hits += 1
+            else:
+                await cache_repo.set_all_dishes_cache(
+                    submenu_id, [make_dish(dish_id) for dish_id in dishes], menu_id
+                )
+    return hits, total
+
+
+async def run_workload(cache_repo: CacheRepository) -> float:
+    """Доля попаданий в кеш при чередовании изменений и чтения всех представлений."""
+    tree = build_tree()
+    rng = random.Random(0)
+    await read_all(cache_repo, tree)
+    hits = total = 0
+    for _ in range(WRITES_COUNT):
+        menu_id = rng.choice(list(tree))
+        submenu_id = rng.choice(list(tree[menu_id]))
+        dishes = tree[menu_id][submenu_id]
+        action = rng.choice(['create_dish', 'update_dish', 'update_dish', 'update_submenu', 'update_menu'])
+        if action == 'create_dish':
+            dishes.append(str(uuid.uuid4()))
+            await cache_repo.create_new_dish_cache(make_dish(dishes[-1]), submenu_id, menu_id)
+        elif action == 'update_dish':
+            await cache_repo.update_dish_cache(make_dish(rng.choice(dishes)), menu_id, submenu_id)
+        elif action == 'update_submenu':
+            await cache_repo.update_submenu_cache(menu_id, submenu_id)
+        else:
+            await cache_repo.update_menu_cache(menu_id)
+        round_hits, round_total = await read_all(cache_repo, tree)
+        hits += round_hits
+        total += round_total
+    return hits / total
+
+
+class TestCacheHitRatio:
+    @pytest.mark.asyncio
+    async def test_precise_invalidation_hit_ratio(self) -> None:
+        """Точная инвалидация сохраняет в кеше больше записей, чем инвалидация всего меню."""
+        precise_ratio = await run_workload(CacheRepository(redis_cacher=get_redis()))
+        coarse_ratio = await run_workload(CoarseCacheRepository(redis_cacher=get_redis()))
+        assert precise_ratio > coarse_ratio, \
+            f'Доля попаданий {precise_ratio:.2%} не выше, чем при инвалидации всего меню ({coarse_ratio:.2%})'
+        assert precise_ratio > 0.9, f'Доля попаданий при точной инвалидации {precise_ratio:.2%} не выше 90%'
+
+    @pytest.mark.asyncio
+    async def test_every_key_family_hits(self) -> None:
+        """В каждом семействе ключей есть попадания в кеш при смеси запросов к приложению."""
+        async with AsyncClient(app=app, base_url='http://test') as client:
+            hit_ratios = await measure_hit_ratios(client)
+        assert set(hit_ratios) == set(CACHE_TTL), f'Обращения не ко всем семействам ключей: {hit_ratios}'
+        assert all(ratio > 0 for ratio in hit_ratios.values()), f'Нет попаданий в семействе ключей: {hit_ratios}'
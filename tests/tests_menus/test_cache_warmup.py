@@ -0,0 +1,75 @@
+"""Прогрев кеша через эндпоинт администрирования."""
+import asyncio
+from http import HTTPStatus
+
+import pytest
+from fastapi import HTTPException
+from httpx import AsyncClient
+
+from app.api.menus.routers.admin_routers import warm_up
+from app.api.menus.routers.dish_routers import create_dish
+from app.api.menus.routers.menu_routers import create_menus, delete_menu
+from app.api.menus.routers.submenu_routers import create_submenus
+from app.api.menus.services.cache_warmup_service import warm_up_cache
+from app.api.menus.services.menu_service import AsyncMenuService
+from app.db.cache import CacheRepository
+from app.db.database_connect import get_redis
+from app.main import app
+from tests.tests_menus.service import reverse
+
+
+class TestCacheWarmup:
+    @pytest.mark.asyncio
+    async def test_warm_up_hot_views(self) -> None:
+        """После прогрева список меню, меню, списки подменю и блюд и полное меню есть в кеше."""
+        cache_repo = CacheRepository(redis_cacher=get_redis())
+        async with AsyncClient(app=app, base_url='http://test') as client:
+            response = await client.post(reverse(create_menus),
+                                         json={'title': 'Warmup menu', 'description': 'Warmup'})
+            menu_id = response.json()['id']
+            response = await client.post(reverse(create_submenus, menu_id=menu_id),
+                                         json={'title': 'Warmup submenu', 'description': 'Warmup'})
+            submenu_id = response.json()['id']
+            await client.post(reverse(create_dish, menu_id=menu_id, submenu_id=submenu_id),
+                              json={'title': 'Warmup dish', 'description': 'Warmup', 'price': '10.00'})
+            try:
+                await cache_repo.delete_all_cache()
+
+                response = await client.post(reverse(warm_up), params={'concurrency': 2})
+                assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
+                assert response.json()['warmed'] >= 5, 'Прогреты не все представления'
+
+                assert await cache_repo.get_all_menus_cache() is not None, 'Списка меню нет в кеше'
+                assert await cache_repo.get_menu_cache(menu_id) is not None, 'Меню нет в кеше'
+                assert await cache_repo.get_all_submenus_cache(menu_id) is not None, 'Списка подменю нет в кеше'
+                assert await cache_repo.get_all_dishes_cache(menu_id, submenu_id) is not None, \
+                    'Списка блюд нет в кеше'
+                assert await cache_repo.get_full_restaurant_menu() is not None, 'Полного меню нет в кеше'
+            finally:
+                await client.delete(reverse(delete_menu, menu_id=menu_id))
+
+    @pytest.mark.asyncio
+    async def test_warm_up_skips_deleted(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Меню, удаленное во время прогрева (ответ 404), пропускается, остальное прогревается."""
+        async def load_deleted_menu(service: AsyncMenuService, menu_id: str) -> None:
+            raise HTTPException(HTTPStatus.NOT_FOUND, detail='menu not found')
+
+        async with AsyncClient(app=app, base_url='http://test') as client:
+            response = await client.post(reverse(create_menus),
+                                         json={'title': 'Warmup menu', 'description': 'Warmup'})
+            menu_id = response.json()['id']
+            try:
+                warmed = await warm_up_cache()
+                monkeypatch.setattr(AsyncMenuService, 'load_menu', load_deleted_menu)
+                assert await warm_up_cache() < warmed, 'Ненайденные меню посчитаны прогретыми'
+                assert await CacheRepository(redis_cacher=get_redis()).get_all_menus_cache() is not None, \
+                    'Прогрев прерван ответом 404'
+            finally:
+                await client.delete(reverse(delete_menu, menu_id=menu_id))
+
+    @pytest.mark.asyncio
+    async def test_warm_up_runs_once(self) -> None:
+        """Одновременные прогревы (например, всех воркеров при запуске) выполняет только один."""
+        results = await asyncio.gather(warm_up_cache(), warm_up_cache())
+        assert sorted(results)[0] == 0 and sorted(results)[1] > 0, \
+            'Одновременные прогревы выполнены оба или ни один'
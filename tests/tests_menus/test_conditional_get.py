@@ -0,0 +1,73 @@
+"""Условные GET-запросы: ETag, If-None-Match и Cache-Control."""
+from http import HTTPStatus
+
+import pytest
+from httpx import AsyncClient
+
+from app.api.menus.routers.menu_routers import (
+    create_menus,
+    delete_menu,
+    get_full_restaurant_menu,
+    read_menu,
+    update_menu,
+)
+from app.config import HTTP_CACHE_CONTROL
+from app.db.cache import CacheRepository
+from app.db.cache_keys import menu_link
+from app.db.database_connect import get_redis
+from app.main import app
+from tests.tests_menus.service import reverse
+
+
+class TestConditionalGet:
+    @pytest.mark.asyncio
+    async def test_not_modified(self) -> None:
+        """Совпадающий If-None-Match получает 304 без тела, после изменения - новый ETag."""
+        async with AsyncClient(app=app, base_url='http://test') as client:
+            response = await client.post(reverse(create_menus),
+                                         json={'title': 'Conditional GET menu', 'description': 'ETag'})
+            menu_id = response.json()['id']
+            try:
+                response = await client.get(reverse(get_full_restaurant_menu))
+                assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
+                assert response.headers['cache-control'] == HTTP_CACHE_CONTROL, 'Нет заголовка Cache-Control'
+                etag = response.headers['etag']
+
+                response = await client.get(reverse(get_full_restaurant_menu), headers={'If-None-Match': etag})
+                assert response.status_code == HTTPStatus.NOT_MODIFIED, 'Статус ответа не 304'
+                assert response.content == b'', 'У ответа 304 есть тело'
+                assert response.headers['etag'] == etag, 'ETag ответа 304 отличается'
+
+                await client.patch(reverse(update_menu, menu_id=menu_id),
+                                   json={'title': 'Conditional GET menu updated', 'description': 'ETag'})
+                response = await client.get(reverse(get_full_restaurant_menu), headers={'If-None-Match': etag})
+                assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200 после изменения меню'
+                assert response.headers['etag'] != etag, 'ETag не изменился после изменения меню'
+            finally:
+                await client.delete(reverse(delete_menu, menu_id=menu_id))
+
+    @pytest.mark.asyncio
+    async def test_not_modified_from_cached_etag(self) -> None:
+        """ETag готового ответа хранится рядом с записью кеша и удаляется вместе с ней."""
+        cache_repo = CacheRepository(redis_cacher=get_redis())
+        async with AsyncClient(app=app, base_url='http://test') as client:
+            response = await client.post(reverse(create_menus),
+                                         json={'title': 'Cached ETag menu', 'description': 'ETag'})
+            menu_id = response.json()['id']
+            try:
+                etag = (await client.get(reverse(read_menu, menu_id=menu_id))).headers['etag']
+                assert await cache_repo.get_etag(menu_link(menu_id)) == etag, \
+                    'ETag в кеше отличается от ETag ответа'
+
+                response = await client.get(reverse(read_menu, menu_id=menu_id), headers={'If-None-Match': etag})
+                assert response.status_code == HTTPStatus.NOT_MODIFIED, 'Статус ответа не 304'
+                assert response.headers['etag'] == etag, 'ETag ответа 304 отличается'
+                assert response.headers['cache-control'] == HTTP_CACHE_CONTROL, 'Нет заголовка Cache-Control'
+
+                await client.patch(reverse(update_menu, menu_id=menu_id),
+                                   json={'title': 'Cached ETag menu updated', 'description': 'ETag'})
+                assert await cache_repo.get_etag(menu_link(menu_id)) is None, 'ETag не удален при изменении меню'
+                response = await client.get(reverse(read_menu, menu_id=menu_id), headers={'If-None-Match': etag})
+                assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200 после изменения меню'
+            finally:
+                await client.delete(reverse(delete_menu, menu_id=menu_id))
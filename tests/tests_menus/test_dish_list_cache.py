@@ -0,0 +1,40 @@
+"""Закешированный список блюд подменю (хеш Redis)."""
+import json
+import uuid
+from types import SimpleNamespace
+from typing import cast
+
+import pytest
+
+from app.db.cache import CacheRepository
+from app.db.database_connect import get_redis
+from app.db.repositories.dish_repository import DishRow
+
+# Больше порога listpack в Redis (hash-max-listpack-entries = 128), хеш хранится хеш-таблицей
+DISHES_COUNT = 300
+
+
+def make_dish(dish_id: str) -> DishRow:
+    return cast(DishRow, SimpleNamespace(id=dish_id, title='Dish', description='Dish', price='10.00'))
+
+
+class TestDishListCache:
+    @pytest.mark.asyncio
+    async def test_large_list_ordered_by_id(self) -> None:
+        """Большой список блюд из кеша упорядочен по ID, в т.ч. после добавления блюда."""
+        cache_repo = CacheRepository(redis_cacher=get_redis())
+        cache_repo.local_cacher = None
+        menu_id, submenu_id = str(uuid.uuid4()), str(uuid.uuid4())
+        dish_ids = [str(uuid.uuid4()) for _ in range(DISHES_COUNT)]
+        try:
+            await cache_repo.set_all_dishes_cache(submenu_id, [make_dish(dish_id) for dish_id in dish_ids], menu_id)
+            dish_ids.append(str(uuid.uuid4()))
+            await cache_repo.create_new_dish_cache(make_dish(dish_ids[-1]), submenu_id, menu_id)
+
+            dishes = await cache_repo.get_all_dishes_cache(menu_id, submenu_id)
+            assert dishes is not None, 'Списка блюд нет в кеше'
+            if isinstance(dishes, bytes):
+                dishes = json.loads(dishes)
+            assert [dish['id'] for dish in dishes] == sorted(dish_ids), 'Список блюд из кеша не упорядочен по ID'
+        finally:
+            await cache_repo.invalidate(menu_ids=[menu_id])
@@ -1,3 +1,4 @@
+import json
 from decimal import Decimal
 from http import HTTPStatus
 from typing import Any
@@ -5,6 +6,7 @@ from typing import Any
 import pytest
 from httpx import AsyncClient
 
+from app.api.menus.routers.admin_routers import rebuild_menu_snapshots
 from app.api.menus.routers.dish_routers import create_dish, delete_dish
 from app.api.menus.routers.menu_routers import (
     create_menus,
@@ -12,11 +14,25 @@ from app.api.menus.routers.menu_routers import (
     get_full_restaurant_menu,
 )
 from app.api.menus.routers.submenu_routers import create_submenus, delete_submenu
+from app.db.cache import RESPONSE_ADAPTERS
+from app.db.database_connect import LazySession
+from app.db.repositories.menu_repository import AsyncMenuRepository
 from tests.tests_menus.service import reverse
 
 pytest_plugins = 'tests.tests_menus.fixtures'
 
 
+def sort_menus(menus: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Меню, подменю и блюда в порядке ID для сравнения ответов."""
+    return sorted((
+        {**menu, 'submenus': sorted((
+            {**submenu, 'dishes': sorted(submenu['dishes'], key=lambda dish: dish['id'])}
+            for submenu in menu['submenus']
+        ), key=lambda submenu: submenu['id'])}
+        for menu in menus
+    ), key=lambda menu: menu['id'])
+
+
 class TestFullMenu:
     # Проверка на пустой список неактуальна, так как excel заполняет бд
     # @pytest.mark.asyncio
@@ -126,6 +142,48 @@ class TestFullMenu:
                 'Цена блюда не соответствует ожидаемой'
             assert dish['id'] == saved_data['dish']['id'], 'Идентификатора блюда не соответствует ожидаемому'
 
+    @pytest.mark.asyncio
+    async def test_full_base_stream(self, http_client: AsyncClient) -> None:
+        """Потоковый вывод базы (NDJSON) совпадает с обычным."""
+        async for client in http_client:
+            response = await client.get(reverse(get_full_restaurant_menu))
+            data = sort_menus(response.json())
+            response = await client.get(reverse(get_full_restaurant_menu), params={'stream': 'true'})
+            assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
+            assert response.headers['content-type'] == 'application/x-ndjson', 'Ответ не в формате NDJSON'
+            assert sort_menus([json.loads(line) for line in response.text.splitlines()]) == data, \
+                'Потоковый вывод отличается от обычного'
+
+    @pytest.mark.asyncio
+    async def test_full_base_json_from_db(self) -> None:
+        """JSON полного меню, собранный БД, совпадает с ответом из объектов моделей."""
+        adapter = RESPONSE_ADAPTERS['full_menu']
+        async with LazySession() as lazy_session:
+            menu_repo = AsyncMenuRepository(lazy_session)
+            menus = adapter.dump_python(
+                adapter.validate_python(await menu_repo.get_full_restaurant_menu(), from_attributes=True)
+            )
+            menus_json = json.loads(await menu_repo.get_full_restaurant_menu_json())
+        assert sort_menus(menus_json) == sort_menus(menus), 'JSON из БД не совпадает с ответом из объектов моделей'
+
+    @pytest.mark.asyncio
+    async def test_full_base_snapshot(self, http_client: AsyncClient) -> None:
+        """Снимки меню, обновленные при изменениях и пересобранные, совпадают с текущими данными."""
+        async for client in http_client:
+            async with LazySession() as lazy_session:
+                menu_repo = AsyncMenuRepository(lazy_session)
+                assert json.loads(await menu_repo.get_full_restaurant_menu_snapshot()) == \
+                    json.loads(await menu_repo.get_full_restaurant_menu_json()), 'Снимки меню не обновлены'
+
+            response = await client.post(reverse(rebuild_menu_snapshots))
+            assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
+            async with LazySession() as lazy_session:
+                menu_repo = AsyncMenuRepository(lazy_session)
+                assert response.json()['rebuilt'] == len(json.loads(await menu_repo.get_full_restaurant_menu_json())), \
+                    'Пересобраны снимки не всех меню'
+                assert json.loads(await menu_repo.get_full_restaurant_menu_snapshot()) == \
+                    json.loads(await menu_repo.get_full_restaurant_menu_json()), 'Снимки меню пересобраны неверно'
+
     @pytest.mark.asyncio
     async def test_delete_dish(self,
                                saved_data: dict[str, Any],
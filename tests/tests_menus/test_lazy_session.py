@@ -0,0 +1,41 @@
+"""Попадания в кеш не берут соединения из пула БД."""
+from http import HTTPStatus
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event
+
+from app.api.menus.routers.menu_routers import create_menus, delete_menu, read_menu
+from app.db.database_connect import engine
+from app.main import app
+from tests.tests_menus.service import reverse
+
+HITS_COUNT = 20
+
+
+class TestLazySession:
+    @pytest.mark.asyncio
+    async def test_cache_hits_skip_pool(self) -> None:
+        """Запросы, обслуженные из кеша через эндпоинт, не создают сессию БД."""
+        checkouts = []
+
+        def on_checkout(*args) -> None:
+            checkouts.append(args)
+
+        async with AsyncClient(app=app, base_url='http://test') as client:
+            response = await client.post(reverse(create_menus),
+                                         json={'title': 'Lazy session menu', 'description': 'Pool'})
+            menu_id = response.json()['id']
+            try:
+                await client.get(reverse(read_menu, menu_id=menu_id))
+                event.listen(engine.sync_engine.pool, 'checkout', on_checkout)
+                try:
+                    for _ in range(HITS_COUNT):
+                        # Параметр запроса проводит запрос мимо ResponseCacheMiddleware до эндпоинта
+                        response = await client.get(reverse(read_menu, menu_id=menu_id), params={'hit': 1})
+                        assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
+                finally:
+                    event.remove(engine.sync_engine.pool, 'checkout', on_checkout)
+                assert checkouts == [], 'Попадание в кеш взяло соединение из пула'
+            finally:
+                await client.delete(reverse(delete_menu, menu_id=menu_id))
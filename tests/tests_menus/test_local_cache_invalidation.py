@@ -0,0 +1,48 @@
+"""Сообщения об инвалидации локальных кешей воркеров."""
+import asyncio
+import json
+import uuid
+from types import SimpleNamespace
+from typing import cast
+
+import pytest
+
+from app.config import CACHE_INVALIDATION_CHANNEL
+from app.db.cache import CacheRepository
+from app.db.cache_keys import dishes_link, menu_link
+from app.db.database_connect import get_redis
+from app.db.local_cache import LocalCache
+from app.db.repositories.dish_repository import DishRow
+
+
+async def read_published_keys(pubsub) -> list[str]:
+    """Ключи из следующего сообщения канала инвалидации."""
+    while True:
+        message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1)
+        if message is not None:
+            return json.loads(message['data'])
+        await asyncio.sleep(0)
+
+
+class TestLocalCacheInvalidation:
+    @pytest.mark.asyncio
+    async def test_overwritten_keys_published(self) -> None:
+        """Перезапись записи и списка блюд публикует их ключи для остальных воркеров."""
+        cache_repo = CacheRepository(redis_cacher=get_redis())
+        cache_repo.local_cacher = LocalCache(max_entries=100, max_bytes=1 << 20, ttl=60)
+        menu_id, submenu_id = str(uuid.uuid4()), str(uuid.uuid4())
+        async with get_redis().pubsub() as pubsub:
+            await pubsub.subscribe(CACHE_INVALIDATION_CHANNEL)
+
+            menu = SimpleNamespace(id=menu_id, title='Menu', description='Menu', submenus_count=0, dishes_count=0)
+            await cache_repo.set_cache(menu_link(menu_id), menu)
+            menu_key, = await cache_repo.get_keys(menu_link(menu_id))
+            assert menu_key in await asyncio.wait_for(read_published_keys(pubsub), 5), \
+                'Ключ перезаписанной записи не опубликован'
+
+            dish = SimpleNamespace(id=str(uuid.uuid4()), title='Dish', description='Dish', price='1.00')
+            await cache_repo.set_all_dishes_cache(submenu_id, [cast(DishRow, dish)], menu_id)
+            dishes_key, = await cache_repo.get_keys(dishes_link(menu_id, submenu_id))
+            assert await asyncio.wait_for(read_published_keys(pubsub), 5) == [dishes_key], \
+                'Ключ перестроенного списка блюд не опубликован'
+        await cache_repo.invalidate(menu_ids=[menu_id])
@@ -0,0 +1,58 @@
+"""Счетчики подменю и блюд, поддерживаемые триггерами БД."""
+import pytest
+from httpx import AsyncClient
+
+from app.api.menus.routers.dish_routers import create_dish, delete_dish
+from app.api.menus.routers.menu_routers import create_menus, delete_menu, read_menu
+from app.api.menus.routers.submenu_routers import (
+    create_submenus,
+    delete_submenu,
+    read_submenu,
+)
+from app.main import app
+from tests.tests_menus.service import reverse
+
+
+async def read_counts(client: AsyncClient, menu_id: str, submenu_id: str) -> tuple[int, int, int]:
+    """Счетчики меню (подменю, блюда) и подменю (блюда)."""
+    menu = (await client.get(reverse(read_menu, menu_id=menu_id))).json()
+    submenu = (await client.get(reverse(read_submenu, menu_id=menu_id, submenu_id=submenu_id))).json()
+    return menu['submenus_count'], menu['dishes_count'], submenu['dishes_count']
+
+
+class TestMenuCounters:
+    @pytest.mark.asyncio
+    async def test_counters_follow_changes(self) -> None:
+        """Создание и удаление подменю и блюд меняют счетчики меню и подменю."""
+        async with AsyncClient(app=app, base_url='http://test') as client:
+            response = await client.post(reverse(create_menus),
+                                         json={'title': 'Counters menu', 'description': 'Counters'})
+            menu_id = response.json()['id']
+            try:
+                submenu_ids = []
+                for index in range(2):
+                    response = await client.post(reverse(create_submenus, menu_id=menu_id),
+                                                 json={'title': f'Counters submenu {index}', 'description': 'Counters'})
+                    submenu_ids.append(response.json()['id'])
+                dish_ids = []
+                for index in range(3):
+                    response = await client.post(
+                        reverse(create_dish, menu_id=menu_id, submenu_id=submenu_ids[0]),
+                        json={'title': f'Counters dish {index}', 'description': 'Counters', 'price': '10.00'}
+                    )
+                    dish_ids.append(response.json()['id'])
+                await client.post(reverse(create_dish, menu_id=menu_id, submenu_id=submenu_ids[1]),
+                                  json={'title': 'Counters dish 3', 'description': 'Counters', 'price': '10.00'})
+                assert await read_counts(client, menu_id, submenu_ids[0]) == (2, 4, 3), \
+                    'Счетчики после создания неверны'
+
+                await client.delete(reverse(delete_dish, menu_id=menu_id, submenu_id=submenu_ids[0],
+                                            dish_id=dish_ids[0]))
+                assert await read_counts(client, menu_id, submenu_ids[0]) == (2, 3, 2), \
+                    'Счетчики после удаления блюда неверны'
+
+                await client.delete(reverse(delete_submenu, menu_id=menu_id, submenu_id=submenu_ids[1]))
+                assert await read_counts(client, menu_id, submenu_ids[0]) == (1, 2, 2), \
+                    'Счетчики после удаления подменю неверны'
+            finally:
+                await client.delete(reverse(delete_menu, menu_id=menu_id))
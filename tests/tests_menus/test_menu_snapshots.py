@@ -0,0 +1,97 @@
+"""Снимки меню при одновременных изменениях одного меню."""
+import asyncio
+import json
+
+import pytest
+from httpx import AsyncClient
+
+from app.api.menus.routers.dish_routers import create_dish
+from app.api.menus.routers.menu_routers import create_menus, delete_menu
+from app.api.menus.routers.submenu_routers import create_submenus
+from app.db.database_connect import LazySession
+from app.db.repositories.dish_repository import AsyncDishRepository
+from app.db.repositories.menu_repository import AsyncMenuRepository
+from app.db.repositories.submenu_repository import AsyncSubmenuRepository
+from app.main import app
+from app.models.schemas.menus.dish_schemas import DishSchema
+from app.models.schemas.menus.submenu_schemas import SubmenuSchema
+from tests.tests_menus.service import reverse
+
+CONCURRENT_UPDATES = 4
+ROUNDS = 3
+
+
+async def update_dish(dish_id: str, title: str) -> None:
+    """Изменение блюда в отдельной сессии (отдельной транзакции)."""
+    async with LazySession() as lazy_session:
+        await AsyncDishRepository(lazy_session).update_dish(
+            dish_id, DishSchema(title=title, description='Snapshots', price='10.00')
+        )
+
+
+async def create_submenu(menu_id: str, title: str) -> None:
+    """Создание подменю в отдельной сессии (отдельной транзакции)."""
+    async with LazySession() as lazy_session:
+        await AsyncSubmenuRepository(lazy_session).create_submenu(
+            menu_id, SubmenuSchema(title=title, description='Snapshots')
+        )
+
+
+async def read_menu_snapshot(menu_id: str) -> dict:
+    """Снимок меню."""
+    async with LazySession() as lazy_session:
+        menus = json.loads(await AsyncMenuRepository(lazy_session).get_full_restaurant_menu_snapshot())
+    return next(menu for menu in menus if menu['id'] == menu_id)
+
+
+async def read_dish_titles(menu_id: str) -> list[str]:
+    """Названия блюд меню из снимка меню."""
+    menu = await read_menu_snapshot(menu_id)
+    return sorted(dish['title'] for submenu in menu['submenus'] for dish in submenu['dishes'])
+
+
+class TestMenuSnapshots:
+    @pytest.mark.asyncio
+    async def test_concurrent_updates_are_kept(self) -> None:
+        """Одновременные изменения разных блюд одного меню все попадают в снимок."""
+        async with AsyncClient(app=app, base_url='http://test') as client:
+            response = await client.post(reverse(create_menus),
+                                         json={'title': 'Snapshots menu', 'description': 'Snapshots'})
+            menu_id = response.json()['id']
+            try:
+                response = await client.post(reverse(create_submenus, menu_id=menu_id),
+                                             json={'title': 'Snapshots submenu', 'description': 'Snapshots'})
+                submenu_id = response.json()['id']
+                dish_ids = []
+                for index in range(CONCURRENT_UPDATES):
+                    response = await client.post(reverse(create_dish, menu_id=menu_id, submenu_id=submenu_id),
+                                                 json={'title': f'Snapshots dish {index}', 'description': 'Snapshots',
+                                                       'price': '10.00'})
+                    dish_ids.append(response.json()['id'])
+
+                for round_number in range(ROUNDS):
+                    titles = [f'Round {round_number} dish {index}' for index in range(CONCURRENT_UPDATES)]
+                    await asyncio.gather(*[update_dish(dish_id, title) for dish_id, title in zip(dish_ids, titles)])
+                    assert await read_dish_titles(menu_id) == sorted(titles), \
+                        'Снимок меню потерял одновременное изменение'
+            finally:
+                await client.delete(reverse(delete_menu, menu_id=menu_id))
+
+    @pytest.mark.asyncio
+    async def test_concurrent_submenu_creates(self) -> None:
+        """Одновременное создание подменю одного меню не блокируется взаимно и попадает в снимок."""
+        async with AsyncClient(app=app, base_url='http://test') as client:
+            response = await client.post(reverse(create_menus),
+                                         json={'title': 'Snapshots menu', 'description': 'Snapshots'})
+            menu_id = response.json()['id']
+            try:
+                titles = [f'Snapshots submenu {index}' for index in range(CONCURRENT_UPDATES)]
+                await asyncio.gather(*[create_submenu(menu_id, title) for title in titles])
+                menu = await read_menu_snapshot(menu_id)
+                assert sorted(submenu['title'] for submenu in menu['submenus']) == titles, \
+                    'Снимок меню потерял одновременно созданное подменю'
+                async with LazySession() as lazy_session:
+                    menu_info = await AsyncMenuRepository(lazy_session).read_menu(menu_id)
+                assert menu_info.submenus_count == CONCURRENT_UPDATES, 'Счетчик подменю не учел все подменю'
+            finally:
+                await client.delete(reverse(delete_menu, menu_id=menu_id))
@@ -0,0 +1,52 @@
+"""Кеширование ответов 404 для несуществующих ID."""
+import uuid
+from http import HTTPStatus
+
+import pytest
+from httpx import AsyncClient
+
+from app.api.menus.routers.menu_routers import create_menus, delete_menu, read_menu
+from app.db.cache import CacheRepository
+from app.db.cache_keys import menu_link
+from app.db.database_connect import get_redis
+from app.main import app
+from tests.tests_menus.service import reverse
+
+
+class TestNotFoundCache:
+    @pytest.mark.asyncio
+    async def test_not_found_cleared_by_create(self) -> None:
+        """Ответ 404 кешируется, а созданное с этим ID меню сразу доступно."""
+        cache_repo = CacheRepository(redis_cacher=get_redis())
+        menu_id = str(uuid.uuid4())
+        async with AsyncClient(app=app, base_url='http://test') as client:
+            response = await client.get(reverse(read_menu, menu_id=menu_id))
+            assert response.status_code == HTTPStatus.NOT_FOUND, 'Статус ответа не 404'
+            assert await cache_repo.get_not_found_cache(menu_link(menu_id)) == 'menu not found', \
+                'Ответ 404 не закеширован'
+
+            response = await client.get(reverse(read_menu, menu_id=menu_id))
+            assert response.status_code == HTTPStatus.NOT_FOUND, 'Статус ответа не 404'
+            assert response.json() == {'detail': 'menu not found'}, 'Ответ из кеша отличается от ответа БД'
+
+            response = await client.post(reverse(create_menus),
+                                         json={'id': menu_id, 'title': f'Menu {menu_id}', 'description': 'Not found'})
+            assert response.status_code == HTTPStatus.CREATED, 'Статус ответа не 201'
+            try:
+                assert await cache_repo.get_not_found_cache(menu_link(menu_id)) is None, \
+                    'Запись 404 не удалена при создании меню'
+                response = await client.get(reverse(read_menu, menu_id=menu_id))
+                assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
+            finally:
+                await client.delete(reverse(delete_menu, menu_id=menu_id))
+
+    @pytest.mark.asyncio
+    async def test_late_not_found_cleared_by_cache_task(self) -> None:
+        """Ответ 404, записанный чтением после создания меню, удаляет фоновая задача кеша."""
+        cache_repo = CacheRepository(redis_cacher=get_redis())
+        menu_id = str(uuid.uuid4())
+        # Чтение, начатое до создания меню, записывает 404 уже после ответа на создание
+        await cache_repo.set_not_found_cache(menu_link(menu_id), 'menu not found')
+        await cache_repo.upsert_menus_cache(menu_ids=[menu_id])
+        assert await cache_repo.get_not_found_cache(menu_link(menu_id)) is None, \
+            'Фоновая задача кеша не удалила запись 404 созданного меню'
@@ -0,0 +1,71 @@
+"""Постраничное чтение списков по ключу (limit и cursor)."""
+from http import HTTPStatus
+
+import pytest
+from httpx import AsyncClient
+
+from app.api.menus.routers.dish_routers import create_dish, read_all_dishes, update_dish
+from app.api.menus.routers.menu_routers import create_menus, delete_menu
+from app.api.menus.routers.submenu_routers import (
+    create_submenus,
+    delete_submenu,
+    read_all_submenus,
+)
+from app.db.cache import NEXT_CURSOR_HEADER
+from app.main import app
+from tests.tests_menus.service import reverse
+
+
+async def read_pages(client: AsyncClient, url: str, limit: int) -> list[list[dict]]:
+    """Чтение списка страницами по курсору из заголовка ответа."""
+    pages = []
+    params = {'limit': limit}
+    while True:
+        response = await client.get(url, params=params)
+        assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
+        pages.append(response.json())
+        if NEXT_CURSOR_HEADER not in response.headers:
+            return pages
+        params = {'limit': limit, 'cursor': response.headers[NEXT_CURSOR_HEADER]}
+
+
+class TestPagination:
+    @pytest.mark.asyncio
+    async def test_pages_follow_changes(self) -> None:
+        """Страницы покрывают список без повторов и обновляются после изменения списка."""
+        async with AsyncClient(app=app, base_url='http://test') as client:
+            response = await client.post(reverse(create_menus),
+                                         json={'title': 'Pagination menu', 'description': 'Pagination'})
+            menu_id = response.json()['id']
+            try:
+                submenu_ids = []
+                for index in range(5):
+                    response = await client.post(reverse(create_submenus, menu_id=menu_id),
+                                                 json={'title': f'Pagination submenu {index}',
+                                                       'description': 'Pagination'})
+                    submenu_ids.append(response.json()['id'])
+                submenus_url = reverse(read_all_submenus, menu_id=menu_id)
+
+                pages = await read_pages(client, submenus_url, limit=2)
+                assert [len(page) for page in pages] == [2, 2, 1], 'Размеры страниц неверны'
+                assert [submenu['id'] for page in pages for submenu in page] == sorted(submenu_ids), \
+                    'Страницы не покрывают список в порядке ID'
+
+                await client.delete(reverse(delete_submenu, menu_id=menu_id, submenu_id=submenu_ids[0]))
+                pages = await read_pages(client, submenus_url, limit=2)
+                assert [submenu['id'] for page in pages for submenu in page] == sorted(submenu_ids[1:]), \
+                    'Закешированные страницы не обновились после удаления подменю'
+
+                submenu_id = submenu_ids[1]
+                dishes_url = reverse(read_all_dishes, menu_id=menu_id, submenu_id=submenu_id)
+                response = await client.post(reverse(create_dish, menu_id=menu_id, submenu_id=submenu_id),
+                                             json={'title': 'Pagination dish', 'description': 'Pagination',
+                                                   'price': '10.00'})
+                dish_id = response.json()['id']
+                assert (await client.get(dishes_url, params={'limit': 1})).json()[0]['title'] == 'Pagination dish'
+                await client.patch(reverse(update_dish, menu_id=menu_id, submenu_id=submenu_id, dish_id=dish_id),
+                                   json={'title': 'Updated dish', 'description': 'Pagination', 'price': '10.00'})
+                assert (await client.get(dishes_url, params={'limit': 1})).json()[0]['title'] == 'Updated dish', \
+                    'Закешированная страница не обновилась после изменения блюда'
+            finally:
+                await client.delete(reverse(delete_menu, menu_id=menu_id))
@@ -0,0 +1,25 @@
+"""Состояние пулов соединений с БД и Redis."""
+from http import HTTPStatus
+
+import pytest
+from httpx import AsyncClient
+
+from app.api.menus.routers.admin_routers import read_pool_stats
+from app.config import DB_POOL_SIZE, REDIS_MAX_CONNECTIONS
+from app.main import app
+from tests.tests_menus.service import reverse
+
+
+class TestPoolStats:
+    @pytest.mark.asyncio
+    async def test_pool_stats(self) -> None:
+        """Эндпоинт возвращает выданные, свободные и ожидающие соединения пулов."""
+        async with AsyncClient(app=app, base_url='http://test') as client:
+            response = await client.get(reverse(read_pool_stats))
+        assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
+        stats = response.json()
+        assert stats['database']['pool_size'] == DB_POOL_SIZE, 'Размер пула БД не из настроек'
+        assert stats['redis']['max_connections'] == REDIS_MAX_CONNECTIONS, 'Размер пула Redis не из настроек'
+        for pool in ('database', 'redis'):
+            assert {'checked_out', 'idle', 'waiting'} <= set(stats[pool]), f'Нет счетчиков пула {pool}'
+            assert stats[pool]['waiting'] == 0, f'Запросы ожидают соединение из пула {pool}'
@@ -0,0 +1,72 @@
+"""Маршрутизация чтения на реплику и read-your-writes."""
+import uuid
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.config import SQLALCHEMY_DATABASE_URL
+from app.db.cache import CacheRepository
+from app.db.cache_keys import menu_link
+from app.db.database_connect import (
+    LazySession,
+    async_session_maker,
+    create_engine,
+    get_lazy_session,
+    get_redis,
+    read_from_primary,
+)
+
+replica_session_maker = sessionmaker(class_=AsyncSession,
+                                     expire_on_commit=False,
+                                     bind=create_engine(SQLALCHEMY_DATABASE_URL))
+
+
+class TestReadReplica:
+    @pytest.mark.asyncio
+    async def test_reads_go_to_replica_until_write(self) -> None:
+        """Чтение идет с реплики, после изменения в том же запросе - с основной БД."""
+        token = read_from_primary.set(False)
+        try:
+            async with LazySession(async_session_maker, replica_session_maker) as lazy_session:
+                assert lazy_session.read_session.bind is replica_session_maker.kw['bind'], \
+                    'Чтение до изменения идет не с реплики'
+                assert lazy_session.session.bind is async_session_maker.kw['bind'], \
+                    'Изменение идет не в основную БД'
+                assert lazy_session.read_session is lazy_session.session, \
+                    'Чтение после изменения идет не с основной БД'
+        finally:
+            read_from_primary.reset(token)
+
+    @pytest.mark.asyncio
+    async def test_read_your_writes_is_per_request(self) -> None:
+        """Чтение с основной БД после изменения не переходит на следующий запрос."""
+        sessions = get_lazy_session()
+        lazy_session = await sessions.__anext__()
+        assert lazy_session.session is not None
+        assert read_from_primary.get(), 'После изменения чтение идет не с основной БД'
+        with pytest.raises(StopAsyncIteration):
+            await sessions.__anext__()
+        assert not read_from_primary.get(), 'Чтение с основной БД осталось после запроса'
+
+    @pytest.mark.asyncio
+    async def test_cache_loads_read_from_primary_after_write(self) -> None:
+        """Загрузка в кеш читает с реплики, а недавно измененных данных - с основной БД."""
+        cache_repo = CacheRepository(redis_cacher=get_redis())
+        cache_repo.read_replica = True
+        link = menu_link(str(uuid.uuid4()))
+        token = read_from_primary.set(False)
+        try:
+            async with LazySession(async_session_maker, replica_session_maker) as lazy_session:
+                async def load():
+                    return lazy_session.read_session.bind
+
+                assert await cache_repo.load_for_cache(link, load) is replica_session_maker.kw['bind'], \
+                    'Загрузка в кеш неизмененных данных читает не с реплики'
+                await cache_repo.invalidate(links=[link])
+                assert await cache_repo.load_for_cache(link, load) is async_session_maker.kw['bind'], \
+                    'Загрузка в кеш недавно измененных данных читает с реплики'
+                assert lazy_session.read_session.bind is replica_session_maker.kw['bind'], \
+                    'Чтение после загрузки в кеш не вернулось на реплику'
+        finally:
+            read_from_primary.reset(token)
@@ -0,0 +1,47 @@
+"""Отдача закешированных GET-ответов из ResponseCacheMiddleware."""
+from http import HTTPStatus
+
+import pytest
+from httpx import AsyncClient
+
+from app.api.menus.routers.menu_routers import (
+    create_menus,
+    delete_menu,
+    read_menu,
+    update_menu,
+)
+from app.api.menus.services.menu_service import AsyncMenuService
+from app.main import app
+from tests.tests_menus.service import reverse
+
+
+def broken_menu_service() -> AsyncMenuService:
+    raise AssertionError('Запрос дошел до эндпоинта')
+
+
+class TestResponseCacheMiddleware:
+    @pytest.mark.asyncio
+    async def test_cached_get_skips_endpoint(self) -> None:
+        """Попадание в кеш отдается без вызова эндпоинта, изменение меню инвалидирует ответ."""
+        async with AsyncClient(app=app, base_url='http://test') as client:
+            response = await client.post(reverse(create_menus),
+                                         json={'title': 'Middleware menu', 'description': 'ASGI'})
+            menu_id = response.json()['id']
+            try:
+                response = await client.get(reverse(read_menu, menu_id=menu_id))
+                assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
+
+                app.dependency_overrides[AsyncMenuService] = broken_menu_service
+                try:
+                    response = await client.get(reverse(read_menu, menu_id=menu_id))
+                finally:
+                    del app.dependency_overrides[AsyncMenuService]
+                assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
+                assert response.json()['title'] == 'Middleware menu', 'Ответ из кеша отличается'
+
+                await client.patch(reverse(update_menu, menu_id=menu_id),
+                                   json={'title': 'Middleware menu updated', 'description': 'ASGI'})
+                response = await client.get(reverse(read_menu, menu_id=menu_id))
+                assert response.json()['title'] == 'Middleware menu updated', 'Ответ не инвалидирован'
+            finally:
+                await client.delete(reverse(delete_menu, menu_id=menu_id))
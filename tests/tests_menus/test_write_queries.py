@@ -0,0 +1,89 @@
+"""Количество запросов к БД при создании и изменении меню, подменю и блюд."""
+from contextlib import contextmanager
+from typing import Iterator
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+
+from app.db.database_connect import LazySession, engine
+from app.db.repositories.dish_repository import AsyncDishRepository
+from app.db.repositories.menu_repository import AsyncMenuRepository
+from app.db.repositories.submenu_repository import AsyncSubmenuRepository
+from app.models.schemas.menus.dish_schemas import DishSchema
+from app.models.schemas.menus.menu_schemas import MenuSchema
+from app.models.schemas.menus.submenu_schemas import SubmenuSchema
+
+# Запрос изменения, блокировка меню и обновление снимка меню (см. app.db.repositories.menu_snapshot)
+WRITE_STATEMENTS = 3
+
+
+@contextmanager
+def count_queries() -> Iterator[dict[str, int]]:
+    """Подсчет запросов и commit основной БД внутри блока."""
+    counts = {'statements': 0, 'commits': 0}
+
+    def on_execute(*args) -> None:
+        counts['statements'] += 1
+
+    def on_commit(*args) -> None:
+        counts['commits'] += 1
+
+    event.listen(engine.sync_engine, 'before_cursor_execute', on_execute)
+    event.listen(engine.sync_engine, 'commit', on_commit)
+    try:
+        yield counts
+    finally:
+        event.remove(engine.sync_engine, 'before_cursor_execute', on_execute)
+        event.remove(engine.sync_engine, 'commit', on_commit)
+
+
+class TestWriteQueries:
+    @pytest.mark.asyncio
+    async def test_writes_use_single_statement(self) -> None:
+        """Создание и изменение - один запрос с RETURNING, блокировка и обновление снимка и commit."""
+        async with LazySession() as lazy_session:
+            menu_repo = AsyncMenuRepository(lazy_session)
+            submenu_repo = AsyncSubmenuRepository(lazy_session)
+            dish_repo = AsyncDishRepository(lazy_session)
+
+            with count_queries() as counts:
+                menu = await menu_repo.create_menu(MenuSchema(title='Queries menu', description='Queries'))
+            assert counts == {'statements': WRITE_STATEMENTS, 'commits': 1}, 'Лишние запросы при создании меню'
+            try:
+                with count_queries() as counts:
+                    updated_menu = await menu_repo.update_menu(
+                        menu.id, MenuSchema(title='Updated menu', description='Queries')
+                    )
+                assert counts == {'statements': WRITE_STATEMENTS, 'commits': 1}, 'Лишние запросы при изменении меню'
+                assert updated_menu.title == 'Updated menu', 'Изменение меню не вернуло новые данные'
+
+                with count_queries() as counts:
+                    submenu = await submenu_repo.create_submenu(
+                        menu.id, SubmenuSchema(title='Queries submenu', description='Queries')
+                    )
+                    await submenu_repo.update_submenu(
+                        submenu.id, SubmenuSchema(title='Updated submenu', description='Queries')
+                    )
+                assert counts == {'statements': 2 * WRITE_STATEMENTS, 'commits': 2}, \
+                    'Лишние запросы при создании и изменении подменю'
+
+                with count_queries() as counts:
+                    dish = await dish_repo.create_dish(
+                        menu.id, submenu.id, DishSchema(title='Queries dish', description='Queries', price='10.00')
+                    )
+                    updated_dish = await dish_repo.update_dish(
+                        dish.id, DishSchema(title='Updated dish', description='Queries', price='20.00')
+                    )
+                assert counts == {'statements': 2 * WRITE_STATEMENTS, 'commits': 2}, \
+                    'Лишние запросы при создании и изменении блюда'
+                assert (updated_dish.price, updated_dish.submenu_id) == ('20.00', submenu.id), \
+                    'Изменение блюда не вернуло новые данные'
+
+                with count_queries() as counts:
+                    with pytest.raises(HTTPException) as error:
+                        await dish_repo.update_dish('unknown-dish', DishSchema(title='Dish', price='1.00'))
+                assert error.value.status_code == 404, 'Изменение несуществующего блюда не вернуло 404'
+                assert counts == {'statements': 1, 'commits': 0}, 'Лишние запросы при изменении несуществующего блюда'
+            finally:
+                await menu_repo.delete_menu(menu.id)